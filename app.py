@@ -4,486 +4,174 @@
 """
 最強糾察員 v6.3 
 """
-import streamlit as st
-import random
-from dataclasses import dataclass, field
-from typing import List, Optional
-from pathlib import Path
+import os
+import secrets
+import time
+from collections import deque
+from typing import NamedTuple, Optional
 
-# ══════════════════════════════════════════════════════════════════
-#  常數
-# ══════════════════════════════════════════════════════════════════
-FOOD_CATS = {
-    "蔬菜":     {"pts": 5, "emoji": "🥦", "bg": "#e8f5e9", "border": "#66bb6a"},
-    "水果":     {"pts": 5, "emoji": "🍎", "bg": "#fce4ec", "border": "#ef9a9a"},
-    "雞肉":     {"pts": 4, "emoji": "🍗", "bg": "#fff3e0", "border": "#ffb74d"},
-    "海鮮":     {"pts": 4, "emoji": "🐟", "bg": "#e1f5fe", "border": "#4fc3f7"},
-    "蛋豆類":   {"pts": 3, "emoji": "🥚", "bg": "#fffde7", "border": "#f9cc4a"},
-    "米飯麵食": {"pts": 3, "emoji": "🍚", "bg": "#efebe9", "border": "#a1887f"},
-    "乳品":     {"pts": 2, "emoji": "🥛", "bg": "#e3f2fd", "border": "#90caf9"},
-    "堅果":     {"pts": 2, "emoji": "🥜", "bg": "#f1f8e9", "border": "#aed581"},
-    "油炸點心": {"pts": 1, "emoji": "🍟", "bg": "#f5f5f5", "border": "#bdbdbd"},
-}
+import streamlit as st
 
-FUNC_CARDS = {
-    "抽牌+2":   {"emoji": "✨", "bg": "#f3e5f5", "border": "#ce93d8",
-                 "desc": "立即多抽 2 張牌"},
-    "偷1張":    {"emoji": "🤫", "bg": "#fce4ec", "border": "#ef9a9a",
-                 "desc": "隨機從一位玩家偷 1 張手牌"},
-    "丟1張":    {"emoji": "💥", "bg": "#fff3e0", "border": "#ffb74d",
-                 "desc": "指定一位玩家，隨機棄置其 1 張手牌"},
-    "順時針交換":{"emoji": "🔄", "bg": "#e0f2f1", "border": "#80cbc4",
-                 "desc": "所有玩家手牌順時針傳遞"},
-    "暫停":     {"emoji": "⛔", "bg": "#ede7f6", "border": "#b39ddb",
-                 "desc": "指定一位玩家跳過下回合"},
+import bots
+import codec
+import endgame
+import profiler
+import replay
+import storage
+import tables
+import winprob
+from history import History, field
+from profiler import timed
+from styles import inject
+from engine import (
+    FOOD_CATS, BALANCED_BONUS, IMBALANCE_PENALTY, Card, CATS, EMOJIS, BGS, BORDERS, DESCS,
+    init_game, action_draw, skip_draw, action_place, action_pass, ack_first_plate, action_discard,
+    action_use_func, resolve_discard_hand, resolve_pause, cancel_pending, confirm_draw,
+    end_transition,
+)
+
+# INSPECTOR_PROFILE=1 時引擎行動也計時（未開啟時 timed 原樣回傳）
+(init_game, action_draw, skip_draw, action_place, action_pass, ack_first_plate, action_discard,
+ action_use_func, resolve_discard_hand, resolve_pause, cancel_pending, confirm_draw, end_transition) = (
+    timed(f.__name__)(f) for f in (
+        init_game, action_draw, skip_draw, action_place, action_pass, ack_first_plate, action_discard,
+        action_use_func, resolve_discard_hand, resolve_pause, cancel_pending, confirm_draw, end_transition))
+
+# ── 設定檔：規則組與畫面差異；app(6)/(7)/(8).py 只是指定設定檔的入口，共用這一份程式 ──
+class Profile(NamedTuple):
+    ruleset:       str                      # engine.RULESETS
+    draw_css:      Optional[str] = None     # 抽牌頁按鈕樣式（static/）
+    draw_wrap:     Optional[str] = None     # 抽牌鈕前的標記 class（樣式表以它定位）
+    draw_compact:  bool = False             # 抽牌頁改為一行資訊列，不列手牌
+    merge_actions: bool = False             # 放入餐盤 / 使用功能牌合併成一顆鈕
+
+PROFILES = {
+    "full": Profile("full"),
+    "v6":   Profile("basic", "draw-6.css", "draw-btn"),
+    "v7":   Profile("basic", "draw-7.css", draw_compact=True),
+    "v8":   Profile("basic", "draw-8.css", "draw-page-btn", draw_compact=True, merge_actions=True),
 }
 
-INIT_HAND         = 5
-FOOD_PER_CAT      = 6
-FUNC_PER_TYPE     = 5
-BALANCED_BONUS    =  10  
-IMBALANCE_PENALTY = -10
-
-P_COLORS = [
-    {"header": "#FF6B6B", "light": "#fff5f5", "text": "#7d2020"},
-    {"header": "#4ECDC4", "light": "#f0fffe", "text": "#004d47"},
-    {"header": "#f5c842", "light": "#fffdf0", "text": "#7a6000"},
-    {"header": "#A29BFE", "light": "#f5f4ff", "text": "#3a2e8c"},
-]
-
-# ══════════════════════════════════════════════════════════════════
-#  資料模型
-# ══════════════════════════════════════════════════════════════════
-@dataclass
-class Card:
-    kind: str
-    cat:  str
-    cid:  int
-    img:  Optional[str] = None
-
-    @property
-    def emoji(self): return FOOD_CATS[self.cat]["emoji"] if self.kind == "food" else FUNC_CARDS[self.cat]["emoji"]
-    @property
-    def bg(self): return FOOD_CATS[self.cat]["bg"] if self.kind == "food" else FUNC_CARDS[self.cat]["bg"]
-    @property
-    def border(self): return FOOD_CATS[self.cat]["border"] if self.kind == "food" else FUNC_CARDS[self.cat]["border"]
-    @property
-    def pts(self): return FOOD_CATS[self.cat]["pts"] if self.kind == "food" else 0
-    @property
-    def desc(self): return f"+{self.pts} 分" if self.kind == "food" else FUNC_CARDS[self.cat]["desc"]
-
-@dataclass
-class Player:
-    name:  str
-    color: dict
-    hand:  List[Card] = field(default_factory=list)
-    plate: List[Card] = field(default_factory=list)
-    skip_next: bool   = False
-
-    def plate_score(self):
-        if not self.plate: return 0
-        total = sum(c.pts for c in self.plate)
-        cats  = [c.cat for c in self.plate]
-        cat_set = set(cats)
-        
-        has_veg     = bool(cat_set & {"蔬菜", "水果"})
-        has_protein = bool(cat_set & {"雞肉", "海鮮", "蛋豆類"})
-        has_carb    = bool(cat_set & {"米飯麵食"})
-        if has_veg and has_protein and has_carb:
-            total += BALANCED_BONUS
-            
-        for cat in FOOD_CATS:
-            cnt = cats.count(cat)
-            if cnt >= 3:
-                total += IMBALANCE_PENALTY
-        return total
-
-    def is_balanced(self):
-        cats = {c.cat for c in self.plate}
-        return (bool(cats & {"蔬菜","水果"}) and
-                bool(cats & {"雞肉","海鮮","蛋豆類"}) and
-                bool(cats & {"米飯麵食"}))
-
-# ══════════════════════════════════════════════════════════════════
-#  遊戲引擎
-# ══════════════════════════════════════════════════════════════════
-def build_deck():
-    cards, cid = [], 0
-    for cat in FOOD_CATS:
-        for _ in range(FOOD_PER_CAT):
-            cards.append(Card("food", cat, cid)); cid += 1
-    for cat in FUNC_CARDS:
-        for _ in range(FUNC_PER_TYPE):
-            cards.append(Card("func", cat, cid)); cid += 1
-    random.shuffle(cards)
-    return cards
-
-def init_game(names: List[str], mode: str, mode_val: int):
-    deck = build_deck()
-    players = [Player(n, P_COLORS[i]) for i, n in enumerate(names)]
-    for p in players:
-        for _ in range(INIT_HAND):
-            if deck: p.hand.append(deck.pop())
-    return dict(
-        players=players, deck=deck, discard=[],
-        turn=0, phase="draw_screen", over=False,
-        mode=mode, mode_val=mode_val,
-        last_round=False, last_starter=None, countdown_turns=None,
-        msg="", msg_type="info", events=[], round_count=0,
-        pending_hand_idx=None, showing_transition=True, transition_to=0,
-        last_drawn_card=None, alert_msg="",
-    )
-
-def check_emperor(gs, player_idx):
-    p = gs["players"][player_idx]
-    if len(p.hand) == 0 and not gs.get("last_round") and gs.get("countdown_turns") is None:
-        gs["last_round"] = True
-        gs["last_starter"] = player_idx
-        gs["events"].append(f"👑 帝王條款發動！{p.name} 打出了最後一張手牌，進入最後一輪！")
-
-def check_end(gs) -> tuple:
-    players = gs["players"]
-    mode    = gs["mode"]
-
-    if gs.get("countdown_turns") is not None:
-        if gs["countdown_turns"] <= 0:
-            return True, "最後倒數結束，結算最高分數！"
-
-    if gs.get("last_round"):
-        nxt = (gs["turn"] + 1) % len(players)
-        if nxt == gs["last_starter"]:
-            return True, "帝王條款 / 最後一輪結束，結算分數！"
-
-    if mode == "allcards" and not gs["deck"]:
-        return True, "牌堆已抽完，結算最高分數！"
-
-    if mode == "rounds":
-        if gs["round_count"] >= gs["mode_val"] * len(players):
-            return True, f"已完成 {gs['mode_val']} 回合！"
-
-    if mode == "score":
-        for p in players:
-            if p.plate_score() >= gs["mode_val"]:
-                return True, f"🎉 {p.name} 率先達到 {gs['mode_val']} 分！"
-        if not gs["deck"] and all(len(p.hand) == 0 for p in players):
-            return True, "牌堆與手牌皆空，但無人達標，以目前最高分結算！"
-
-    return False, ""
-
-def advance_turn(gs):
-    if gs.get("countdown_turns") is not None:
-        gs["countdown_turns"] -= 1
-
-    over, reason = check_end(gs)
-    if over:
-        gs["over"], gs["msg"], gs["msg_type"], gs["phase"] = True, reason, "success", "over"
-        return
-
-    players = gs["players"]
-    n = len(players)
-    gs["round_count"] += 1
-
-    nxt = (gs["turn"] + 1) % n
-    if players[nxt].skip_next:
-        players[nxt].skip_next = False
-        gs["events"].append(f"⏸️ {players[nxt].name} 被暫停，跳過本回合！")
-        if gs.get("countdown_turns") is not None: 
-            gs["countdown_turns"] -= 1  
-        nxt = (nxt + 1) % n
-
-    gs["turn"]  = nxt
-    gs["phase"] = "draw_screen"
-    gs["pending_hand_idx"] = None
-    gs["last_drawn_card"]  = None
-    gs["showing_transition"] = True
-    gs["transition_to"]      = nxt
-    gs["msg"]                = ""
-
-# ── 行動函式 ─────────────────────────────────────────────────────
-def action_draw(gs):
-    p = gs["players"][gs["turn"]]
-    if gs["deck"]:
-        c = gs["deck"].pop()
-        p.hand.append(c)
-        gs["last_drawn_card"] = len(p.hand) - 1
-        gs["msg"], gs["msg_type"] = f"🃏 抽到了 {c.emoji} {c.cat}", "info"
-    else:
-        gs["last_drawn_card"] = None
-        gs["msg"], gs["msg_type"] = "牌堆已空，請直接進行行動！", "warning"
-    gs["phase"] = "action"
-    st.session_state.sel = None
-
-def action_place(gs, hand_idx):
-    p = gs["players"][gs["turn"]]
-    card = p.hand.pop(hand_idx)
-    p.plate.append(card)
-    gs["msg"], gs["msg_type"] = f"🍽️ 將 {card.emoji} {card.cat} 放入餐盤（+{card.pts}分）", "success"
-    
-    should_alert = False
-    if p.is_balanced():
-        if gs["mode"] == "first_plate" and gs.get("countdown_turns") is None:
-            # ⭐ 核心修正：+1 保證換人時不會吃到贏家未來的回合扣打，讓每個人都有完整 N 輪
-            gs["countdown_turns"] = (gs["mode_val"] * len(gs["players"])) + 1
-            gs["events"].append(f"🚨 {p.name} 首位達成均衡餐盤！進入最後 {gs['mode_val']} 輪倒數！")
-            gs["alert_msg"] = f"玩家 {p.name} 率先完成了均衡餐盤！遊戲正式進入最後 {gs['mode_val']} 輪倒數！"
-            gs["phase"] = "alert_first_plate"
-            should_alert = True
-        else:
-            gs["events"].append(f"🌟 {p.name} 達成均衡餐盤！額外 +{BALANCED_BONUS} 分！")
-            
-    if p.plate.count(card.cat) == 3:
-        gs["events"].append(f"⚠️ {p.name} 的 {card.cat} 達到 3 張，扣 10 分！")
-        
-    st.session_state.sel = None
-    
-    if should_alert:
-        return  
-
-    check_emperor(gs, gs["turn"])
-    advance_turn(gs)
-
-def action_discard(gs, hand_idx):
-    p = gs["players"][gs["turn"]]
-    card = p.hand.pop(hand_idx)
-    gs["discard"].append(card)
-    gs["msg"], gs["msg_type"] = f"🗑️ 棄置 {card.emoji} {card.cat}", "info"
-    st.session_state.sel = None
-    check_emperor(gs, gs["turn"])
-    advance_turn(gs)
-
-def action_use_func(gs, hand_idx):
-    p    = gs["players"][gs["turn"]]
-    card = p.hand[hand_idx]
-    func = card.cat
-    players = gs["players"]
-
-    if func == "抽牌+2":
-        p.hand.pop(hand_idx)
-        gs["discard"].append(card)
-        if not gs["deck"]:
-            gs["msg"], gs["msg_type"] = "✨ 抽牌+2！但牌堆已空無牌可抽，卡片失效！", "error"
-            check_emperor(gs, gs["turn"])
-            advance_turn(gs)
-            return
-
-        drawn = []
-        for _ in range(2):
-            if gs["deck"]:
-                c = gs["deck"].pop()
-                p.hand.append(c)
-                drawn.append(f"{c.emoji}{c.cat}")
-        gs["msg"], gs["msg_type"] = f"✨ 抽牌+2！抽到：{'、'.join(drawn)}", "success"
-        st.session_state.sel = None
-        gs["phase"] = "confirm_draw"
-        check_emperor(gs, gs["turn"])
-
-    elif func == "偷1張":
-        targets = [(i, pl) for i, pl in enumerate(players) if i != gs["turn"] and pl.hand]
-        p.hand.pop(hand_idx)
-        gs["discard"].append(card)
-        if not targets:
-            gs["msg"], gs["msg_type"] = "🤫 偷1張！但對手皆無手牌，卡片失效！", "error"
-            check_emperor(gs, gs["turn"])
-            advance_turn(gs)
-            return
-            
-        ti, tp    = random.choice(targets)
-        stolen    = random.choice(tp.hand)
-        tp.hand.remove(stolen)
-        p.hand.append(stolen)
-        gs["msg"], gs["msg_type"] = f"🤫 隨機偷到 {tp.name} 的 {stolen.emoji}{stolen.cat}！", "success"
-        gs["events"].append(f"😱 {p.name} 偷了 {tp.name} 的牌！")
-        st.session_state.sel = None
-        check_emperor(gs, gs["turn"])
-        advance_turn(gs)
-
-    elif func == "順時針交換":
-        p.hand.pop(hand_idx)
-        gs["discard"].append(card)
-        saved = [pl.hand[:] for pl in players]
-        for i, pl in enumerate(players): pl.hand = saved[(i - 1) % len(players)]
-        gs["msg"], gs["msg_type"] = "🔄 所有玩家手牌順時針交換！", "warning"
-        gs["events"].append("🔄 手牌大輪轉！")
-        st.session_state.sel = None
-        check_emperor(gs, gs["turn"])
-        advance_turn(gs)
-
-    elif func == "丟1張":
-        has_targets = any(pl.hand for i, pl in enumerate(players) if i != gs["turn"]) or len(p.hand) > 1
-        if not has_targets:
-            p.hand.pop(hand_idx)
-            gs["discard"].append(card)
-            gs["msg"], gs["msg_type"] = "💥 丟1張！全場已無牌可丟，卡片失效！", "error"
-            check_emperor(gs, gs["turn"])
-            advance_turn(gs)
-            return
-
-        gs["phase"]            = "pending_discard_hand"
-        gs["pending_hand_idx"] = hand_idx
-        gs["msg"], gs["msg_type"] = "💥 請選擇一位玩家，隨機棄置其 1 張手牌", "warning"
-        st.session_state.sel = None
-
-    elif func == "暫停":
-        gs["phase"]            = "pending_pause"
-        gs["pending_hand_idx"] = hand_idx
-        gs["msg"], gs["msg_type"] = "⛔ 請選擇要暫停的玩家", "warning"
-        st.session_state.sel = None
-
-def resolve_discard_hand(gs, target_idx):
-    p         = gs["players"][gs["turn"]]
-    func_card = p.hand.pop(gs["pending_hand_idx"])
-    gs["discard"].append(func_card)
-    
-    target    = gs["players"][target_idx]
-    if target.hand:
-        discarded = random.choice(target.hand)
-        target.hand.remove(discarded)
-        gs["discard"].append(discarded)
-        gs["msg"] = f"💥 成功隨機棄置了 {target.name} 的 1 張手牌！"
-        gs["events"].append(f"💥 {p.name} 棄置了 {target.name} 的手牌！")
-    else:
-        gs["msg"] = f"💥 {target.name} 手上已經沒有牌可以棄置了！"
-        
-    gs["msg_type"] = "success"
-    gs["pending_hand_idx"] = None
-    st.session_state.sel = None
-    check_emperor(gs, gs["turn"])
-    advance_turn(gs)
-
-def resolve_pause(gs, target_idx):
-    p         = gs["players"][gs["turn"]]
-    func_card = p.hand.pop(gs["pending_hand_idx"])
-    gs["discard"].append(func_card)
-    target             = gs["players"][target_idx]
-    target.skip_next   = True
-    gs["msg"], gs["msg_type"] = f"⛔ {target.name} 下回合將被暫停！", "warning"
-    gs["events"].append(f"⛔ {target.name} 下回合被暫停！")
-    gs["pending_hand_idx"] = None
+def current_profile() -> Profile:
+    return PROFILES[st.session_state.get("profile", "full")]
+
+# 引擎行動回傳 UI 提示（session_state 鍵值），在此寫回，並存一個可復原的版本
+def ui(hint):
+    st.session_state.update(hint)
+    if "hist" in st.session_state: st.session_state.hist.commit(st.session_state.gs)
+    if (t := current_table()) is not None: t.bump()
+
+# ── 牌桌存檔：網址帶 ?table=<key>，換人時背景寫入，伺服器重啟後由此還原 ──
+@st.cache_resource
+def table_store():
+    return storage.open_store(os.environ.get("INSPECTOR_STORE", "sqlite:tables.db"))
+
+def attach_store(gs, key):
+    store = table_store()
+    if store is None: return
+    gs["checkpoint"] = lambda g: store.put(key, codec.encode(g))
+    gs["checkpoint"](gs)
+
+def restore_table():
+    key, store = st.query_params.get("table"), table_store()
+    data = store.get(key) if key and store else None
+    if not data: return None
+    try: gs = codec.decode(data)
+    except codec.CodecError: return None
+    attach_store(gs, key)
+    return gs
+
+# ── 多裝置同桌：網址帶 ?join=<key>&seat=<座位>&me=<裝置>，牌桌放在行程共用的登錄表 ──
+POLL_SEC = 1.5
+
+@st.cache_resource
+def table_registry():
+    return tables.Registry(table_store())
+
+def current_table():
+    key = st.query_params.get("join")
+    return table_registry().get(key) if key else None
+
+def my_seat(t):
+    seat, me = st.query_params.get("seat"), st.query_params.get("me")
+    if seat is None or me is None or not seat.isdigit(): return None
+    seat = int(seat)
+    return seat if seat < len(t.gs["players"]) and t.claim(seat, me) else None
+
+def take_seat(key, seat):
+    st.query_params.update(join=key, seat=str(seat), me=st.query_params.get("me") or secrets.token_urlsafe(6))
+
+# ── 電腦玩家：單機由網址 ?bots=<座位>:<種類>,… 記住（重啟還原後仍由電腦代打），同桌記在牌桌上 ──
+SETUP_BOTS = ("heuristic", "mcts", "greedy")
+
+def url_bots():
+    spec = st.query_params.get("bots") or ""
+    return {int(s): bots.make_bot(n) for s, n in (x.split(":") for x in spec.split(",") if x) if n in bots.BOTS}
+
+def play_bots(gs, seat_bots):
+    # 輪到電腦就一路代打到真人回合或終局，只存一個版本
+    if gs["over"] or gs["turn"] not in seat_bots: return
+    bots.run_bots(gs, seat_bots)
     st.session_state.sel = None
-    check_emperor(gs, gs["turn"])
-    advance_turn(gs)
+    ui({})
 
-# ══════════════════════════════════════════════════════════════════
-#  CSS
-# ══════════════════════════════════════════════════════════════════
-CSS = """
-<style>
-@import url('https://fonts.googleapis.com/css2?family=Nunito:wght@400;600;700;800;900&family=Fredoka+One&display=swap');
+def join_link(key):
+    return f"{(st.context.url or '').split('?')[0]}?join={key}"
 
-html, body, p, div, span, h1, h2, h3, h4, h5, h6, label, input, button, a, li, ul, ol, strong, b, i, em, mark, small, del, ins, sub, sup {
-    color: #000000 !important; 
-    font-family: 'Nunito', sans-serif;
-}
+# ── 每次點擊的伺服器耗時（整頁重跑 vs. 片段重跑），網址加 ?perf=1 顯示 ──
+def perf_record(kind, t0):
+    log = st.session_state.setdefault("perf", {"full": deque(maxlen=200), "fragment": deque(maxlen=200)})
+    log[kind].append((time.perf_counter() - t0) * 1000)
 
-.stApp {
-    background: linear-gradient(135deg, #a0a5aa 0%, #cfd4d8 20%, #8a9095 50%, #c4c9cd 80%, #767b80 100%);
-    background-attachment: fixed;
-}
-
-div[data-baseweb="base-input"], div[data-baseweb="input"] {
-    background-color: #ffffff !important; border: 2px solid #555 !important; border-radius: 8px !important;
-}
-input {
-    background-color: transparent !important; color: #000000 !important; font-weight: 900 !important;
-    -webkit-text-fill-color: #000000 !important;
-}
-
-summary {
-    background-color: rgba(255, 255, 255, 0.85) !important; border-radius: 10px !important;
-    border: 2px solid #888 !important; margin-bottom: 8px !important;
-}
-summary p { font-weight: 900 !important; font-size: 1.15rem !important; }
-summary svg { fill: #000000 !important; color: #000000 !important; }
-
-.main-title {
-    font-family: 'Fredoka One', cursive; font-size: 2.8rem; text-align: center;
-    background: linear-gradient(135deg, #cc2e2e, #b87100, #1b857e, #554dbe); 
-    background-size: 200% auto; -webkit-background-clip: text; -webkit-text-fill-color: transparent;
-    animation: rainbowSlide 5s linear infinite; margin: 0; line-height: 1.2;
-}
-@keyframes rainbowSlide { to { background-position: 200% center; } }
-.sub-title { text-align: center; font-size: .9rem; font-weight: 900; letter-spacing: 2px; margin-top: 2px; }
-
-.card {
-    border-radius: 16px; padding: 14px 8px 12px; text-align: center; border: 3px solid #ccc;
-    cursor: pointer; transition: transform .2s cubic-bezier(.34,1.56,.64,1), box-shadow .2s ease;
-    box-shadow: 0 4px 10px rgba(0,0,0,.2); position: relative; user-select: none; overflow: hidden;
-    margin-top: 15px; margin-bottom: 10px;
-}
-.card:hover { transform: translateY(-8px) scale(1.05); box-shadow: 0 12px 26px rgba(0,0,0,.3); z-index: 10; }
-.card-selected {
-    transform: translateY(-10px) scale(1.07) !important;
-    box-shadow: 0 0 0 4px #FFD700, 0 12px 26px rgba(0,0,0,.4) !important;
-    border-color: #FFD700 !important; background-color: #FFFDE7 !important; 
-}
-.card-selected::before { content: '⭐'; position: absolute; top: 4px; right: 5px; font-size: 1.1rem; }
-.card-emoji { font-size: 2.2rem; line-height: 1.1; margin-bottom: 5px; } 
-.card-name  { font-size: 0.9rem; font-weight: 900; margin-bottom: 3px; }
-.card-desc  { font-size: 0.75rem; font-weight: 900; }
-
-.plate-area {
-    background: rgba(255, 255, 255, 0.75); border: 3px solid #888; border-top: none;       
-    border-radius: 0 0 14px 14px; padding: 10px; min-height: 90px;
-    backdrop-filter: blur(4px); margin-bottom: 10px;
-}
-.plate-balanced {
-    border-color: #2e7d32 !important; background: rgba(67,160,71,.2) !important;
-    box-shadow: 0 0 18px rgba(67,160,71,.4) !important; animation: balGlow 2s ease infinite;
-}
-@keyframes balGlow { 0%,100% { box-shadow: 0 0 10px rgba(67,160,71,.3); } 50% { box-shadow: 0 0 24px rgba(67,160,71,.6); } }
-
-.player-header {
-    border-radius: 12px 12px 0 0; padding: 10px 12px; font-weight: 900; font-size: 1rem; 
-    display: flex; align-items: center; gap: 7px; 
-}
-.active-glow { animation: activeGlow 1.8s ease infinite; }
-@keyframes activeGlow { 0%,100% { box-shadow: 0 0 0 3px #FFD700; } 50% { box-shadow: 0 0 0 6px #FFD700, 0 4px 24px rgba(255,215,0,.6); } }
-
-.msg-box {
-    border-radius: 12px; padding: 12px 16px; font-weight: 900; font-size: 1.1rem; text-align: center;
-    animation: msgPop .3s cubic-bezier(.34,1.56,.64,1); margin: 8px 0; border: 3px solid rgba(0,0,0,0.2);
-}
-@keyframes msgPop { from { opacity: 0; transform: scale(.92) translateY(-5px); } to { opacity: 1; transform: scale(1) translateY(0); } }
-
-.event-item {
-    border-radius: 8px; padding: 8px 12px; font-weight: 900; font-size: .95rem; 
-    background: #FFF9C4; border-left: 4px solid #FFC107; margin-bottom: 6px; animation: slideIn .3s ease;
-}
-@keyframes slideIn { from { opacity: 0; transform: translateX(-10px); } to { opacity: 1; transform: translateX(0); } }
-
-.stButton > button {
-    background-color: #ffffff !important; border: 3px solid #777 !important; border-radius: 14px !important;
-    padding: 8px 10px !important; transition: transform .15s ease, box-shadow .15s ease, background-color .2s !important;
-}
-.stButton > button p { font-size: 1.15rem !important; font-weight: 900 !important; }
-.stButton > button:hover { background-color: #FFFDE7 !important; border-color: #FFD700 !important; transform: translateY(-3px) !important; box-shadow: 0 6px 18px rgba(0,0,0,.2) !important; }
-div[data-testid="stButton"] > button[kind="primary"] { background: linear-gradient(135deg, #FF6B6B, #FF8E53) !important; border: 3px solid #D64545 !important; box-shadow: 0 4px 12px rgba(230,92,92,.4) !important; }
-div[data-testid="stButton"] > button[kind="primary"] p { font-size: 1.25rem !important; text-shadow: none !important; }
-.element-container { margin-bottom: 8px !important; }
-div[data-testid="stVerticalBlock"] { gap: 10px; }
-</style>
-"""
+def perf_summary():
+    log = st.session_state.get("perf", {})
+    parts = [f"{name} 平均 {sum(v) / len(v):.1f} ms（{len(v)} 次）" for name, v in
+             (("整頁重跑", log.get("full", ())), ("選牌片段", log.get("fragment", ()))) if v]
+    return "⏱️ " + " ／ ".join(parts) if parts else "⏱️ 尚無紀錄"
 
 def msg_html(text, mtype="info"):
     bg = {"info": "#dbeafe", "success": "#dcfce7", "warning": "#fef9c3", "error": "#fee2e2"}.get(mtype, "#dbeafe")
     return f'<div class="msg-box" style="background:{bg};">{text}</div>'
 
+def hint_html(gs):
+    # 殘局精算提示（只用輪到的人看得到的資訊；不是殘局或算不完時不顯示）；endgame 依局面快取，重跑不會重算
+    found = endgame.hint(gs)
+    if not found: return None
+    (op, *args), v = found
+    players = gs["players"]
+    if op == "n": what = "跳過本回合"
+    else:
+        c = players[gs["turn"]].hand[args[0]]
+        what = f'{"放入" if op == "p" else "丟掉" if op == "x" else "使用"} {c.emoji} {c.cat}'
+        if len(args) > 1 and args[1] is not None: what += f" → {players[args[1]].name}"
+    return msg_html(f"💡 殘局精算：{what}（期望最終 {v:.1f} 分）", "info")
+
 def score_html(score): return f'<span class="score-badge" style="display:inline-block; background:#FFD700; border:2px solid #b89b00; font-weight:900; padding:2px 10px; border-radius:20px;">⭐ {score} 分</span>'
 
-def render_card(card: Card, selected=False, small=False) -> str:
+def _card_html(code, selected, small) -> str:
     sel_cls = "card-selected" if selected else ""
     e_sz = "1.7rem" if small else "2.2rem"
-    return f'<div class="card {sel_cls}" style="background:{card.bg};border-color:{card.border};"><div class="card-emoji" style="font-size:{e_sz};">{card.emoji}</div><div class="card-name">{card.cat}</div><div class="card-desc">{card.desc}</div></div>'
+    return f'<div class="card {sel_cls}" style="background:{BGS[code]};border-color:{BORDERS[code]};"><div class="card-emoji" style="font-size:{e_sz};">{EMOJIS[code]}</div><div class="card-name">{CATS[code]}</div><div class="card-desc">{DESCS[code]}</div></div>'
+
+# 14 類 ×（選取 / 未選）×（大 / 小）= 56 個固定片段，載入時一次產生，索引 code*4 + selected*2 + small
+CARD_HTML = tuple(_card_html(code, sel, small) for code in range(len(CATS)) for sel in (False, True) for small in (False, True))
+
+@timed("render_card")
+def render_card(card: Card, selected=False, small=False) -> str:
+    return CARD_HTML[card.code * 4 + selected * 2 + small]
 
+@timed("render_ranking")
 def render_ranking(players, ci, gs):
     ranked  = sorted(enumerate(players), key=lambda x: x[1].plate_score(), reverse=True)
     max_sc  = max((p.plate_score() for p in players), default=1) or 1
     medals  = ["🥇","🥈","🥉","4️⃣"]
+    odds    = winprob.estimate(gs)          # 旁觀者視角的勝率，未收斂時每次重跑追加約 10 ms 模擬
     for ri, (pi, p) in enumerate(ranked):
         sc  = p.plate_score()
         pct = max(5, int(sc / max_sc * 100)) if sc > 0 else 5
         bg = f"background:#ffffff; border:3px solid {p.color['header']};"
-        st.markdown(f'<div style="{bg} display:flex; align-items:center; gap:9px; padding:8px 12px; border-radius:12px; margin-bottom:8px; box-shadow:0 2px 6px rgba(0,0,0,0.15);"><span style="font-size: 1.3rem;">{medals[ri]}</span><span style="flex:1; font-size: 1.05rem; font-weight: 900;">{"▶ " if pi==ci else ""}{p.name}{" ✅" if p.is_balanced() else ""}{" ⏸️" if p.skip_next else ""}</span><div style="flex: 1; background: #ddd; border-radius: 6px; height: 12px; overflow: hidden; border:1px solid #aaa;"><div style="height: 100%; border-radius: 6px; width:{pct}%; background:{p.color["header"]};"></div></div>{score_html(sc)}</div>', unsafe_allow_html=True)
+        win = f'<span style="font-size:0.85rem; font-weight:900; white-space:nowrap;">🎯 {odds[pi]:.0%}</span>' if odds else ""
+        st.markdown(f'<div style="{bg} display:flex; align-items:center; gap:9px; padding:8px 12px; border-radius:12px; margin-bottom:8px; box-shadow:0 2px 6px rgba(0,0,0,0.15);"><span style="font-size: 1.3rem;">{medals[ri]}</span><span style="flex:1; font-size: 1.05rem; font-weight: 900;">{"▶ " if pi==ci else ""}{p.name}{" ✅" if p.is_balanced() else ""}{" ⏸️" if p.skip_next else ""}</span><div style="flex: 1; background: #ddd; border-radius: 6px; height: 12px; overflow: hidden; border:1px solid #aaa;"><div style="height: 100%; border-radius: 6px; width:{pct}%; background:{p.color["header"]};"></div></div>{win}{score_html(sc)}</div>', unsafe_allow_html=True)
 
     if gs["mode"] == "score":
         st.markdown(f'<div style="font-size:1rem;text-align:center;font-weight:900;margin-top:10px;">🏁 目標：{gs["mode_val"]} 分</div>', unsafe_allow_html=True)
@@ -495,15 +183,24 @@ def render_ranking(players, ci, gs):
 # ══════════════════════════════════════════════════════════════════
 #  設定頁
 # ══════════════════════════════════════════════════════════════════
+NAME_MAX = 20                   # 玩家名稱字數上限（存檔時名稱以 2 位元組長度編碼，見 codec.py）
+
+@timed("page_setup")
 def page_setup():
-    st.markdown(CSS, unsafe_allow_html=True)
     st.markdown('<div class="main-title">🥗 最強糾察員</div><div class="sub-title">NUTRITION BATTLE CARD GAME</div><br>', unsafe_allow_html=True)
     col_l, col_r = st.columns([1.1, 1])
 
     with col_l:
         st.markdown("### 👥 玩家設定")
         num = st.slider("玩家人數", 2, 4, 2, key="setup_num")
-        names = [st.text_input(f"玩家 {i+1} 名稱", value=["玩家一 🔴", "玩家二 🟦", "玩家三 🟡", "玩家四 🟣"][i]).strip() or f"玩家{i+1}" for i in range(num)]
+        kinds = ["human"] + list(SETUP_BOTS)
+        names, seat_bots = [], {}
+        for i in range(num):
+            cn, ck = st.columns([2.2, 1])
+            with cn: names.append(st.text_input(f"玩家 {i+1} 名稱", max_chars=NAME_MAX, value=["玩家一 🔴", "玩家二 🟦", "玩家三 🟡", "玩家四 🟣"][i]).strip() or f"玩家{i+1}")
+            with ck: kind = st.selectbox("操作", kinds, key=f"setup_bot_{i}", format_func=lambda k: "👤 真人" if k == "human" else bots.BOTS[k].label)
+            if kind != "human": seat_bots[i] = kind
+        multi = st.toggle("📱 多裝置同桌（每人用自己的手機加入，不必傳遞裝置）", key="setup_multi")
 
         st.markdown("---")
         st.markdown("### 🎮 遊戲模式")
@@ -534,14 +231,24 @@ def page_setup():
     with c2:
         if st.button("🎮 開始遊戲！", use_container_width=True, type="primary"):
             if len(set(names)) < len(names): st.error("玩家名稱不能重複！"); return
-            st.session_state.gs = init_game(names, mode_key, mode_val)
+            if multi:
+                t = table_registry().create(names, mode_key, mode_val, seat_bots, current_profile().ruleset)
+                humans = [i for i in range(num) if i not in seat_bots]
+                st.session_state.pop("hist", None); take_seat(t.key, humans[0] if humans else 0)
+                st.session_state.sel = None; st.session_state.page = "game"; st.rerun()
+            st.session_state.gs = init_game(names, mode_key, mode_val, ruleset=current_profile().ruleset)
+            st.session_state.hist = History(st.session_state.gs)
+            st.query_params["table"] = key = secrets.token_urlsafe(6)
+            if seat_bots: st.query_params["bots"] = ",".join(f"{i}:{k}" for i, k in seat_bots.items())
+            else: st.query_params.pop("bots", None)
+            attach_store(st.session_state.gs, key)
             st.session_state.sel = None; st.session_state.page = "game"; st.rerun()
 
 # ══════════════════════════════════════════════════════════════════
 #  過場、抽牌與警報頁
 # ══════════════════════════════════════════════════════════════════
+@timed("page_transition")
 def page_transition():
-    st.markdown(CSS, unsafe_allow_html=True)
     gs = st.session_state.gs
     p = gs["players"][gs["transition_to"]]
     st.session_state.sel = None
@@ -551,54 +258,127 @@ def page_transition():
         gs["events"].clear()
         st.markdown(f'<div style="border-radius:24px; padding:36px 24px; text-align:center; background:#ffffff; border:5px solid #FFD700; box-shadow: 0 10px 30px rgba(0,0,0,0.3);"><div style="font-size:1.5rem;font-weight:900;margin-bottom:12px;">👇 請將裝置交給</div><div style="font-family:\'Fredoka One\',cursive; font-size:4.5rem; color:{p.color["header"]} !important;">{p.name}</div><div style="font-size:1.4rem;font-weight:900;margin:16px 0 10px;">準備開始你的回合！</div></div><br>', unsafe_allow_html=True)
         if st.button(f"✅ 我是 {p.name}，準備好了！", use_container_width=True, type="primary"):
-            gs["showing_transition"] = False; st.rerun()
-
+            ui(end_transition(gs)); st.rerun()
+        hist = st.session_state.get("hist")
+        back = hist and hist.last(lambda s: field(s, "phase") == "action" and not field(s, "showing_transition"))
+        if back:
+            prev = gs["players"][field(hist.versions[back], "turn")]
+            if st.button(f"↩️ {prev.name} 按錯了？退回 {prev.name} 的行動", use_container_width=True):
+                hist.restore(gs, back)
+                if gs.get("checkpoint"): gs["checkpoint"](gs)
+                st.rerun()
+
+@timed("page_alert_first_plate")
 def page_alert_first_plate():
-    st.markdown(CSS, unsafe_allow_html=True)
     gs = st.session_state.gs
     st.markdown(f'<div style="border-radius:24px; padding:50px 24px; text-align:center; background:#ffccbc; border:10px solid #d84315; box-shadow:0 10px 30px rgba(0,0,0,0.5); margin-top:5vh;"><div style="font-size:6rem; margin-bottom:20px;">🚨</div><div style="font-family:\'Fredoka One\',cursive; font-size:3.5rem; font-weight:900; margin-bottom:20px;">均衡餐盤達成！</div><div style="font-size:1.8rem; font-weight:900; background:#fff9c4; border: 4px solid #fbc02d; padding: 30px; border-radius: 16px;">{gs.get("alert_msg", "")}</div></div><br><br>', unsafe_allow_html=True)
     c1, c2, c3 = st.columns([1,2,1])
     with c2:
         if st.button("✅ 收到！全軍備戰，繼續遊戲！", use_container_width=True, type="primary"):
-            gs["phase"] = "action"
-            check_emperor(gs, gs["turn"])
-            advance_turn(gs)
-            st.rerun()
+            ui(ack_first_plate(gs)); st.rerun()
 
+@timed("page_draw")
 def page_draw():
-    st.markdown(CSS, unsafe_allow_html=True)
     gs, ci = st.session_state.gs, st.session_state.gs["turn"]
-    cur = gs["players"][ci]
+    cur, prof = gs["players"][ci], current_profile()
     st.markdown('<div class="main-title" style="font-size:2rem;">🥗 最強糾察員</div><br>', unsafe_allow_html=True)
     c1, c2, c3 = st.columns([1, 2.2, 1])
     with c2:
-        st.markdown(f'<div style="border-radius:24px; padding:36px 24px; text-align:center; background:#ffffff; border:5px solid #90CAF9; box-shadow:0 10px 30px rgba(0,0,0,0.2);"><div style="font-family:\'Fredoka One\',cursive; font-size:3rem;">🎴 {cur.name} 的回合</div><div style="font-size:1.3rem; font-weight:900; margin-bottom:20px;">牌堆剩餘 <b>{len(gs["deck"])}</b> 張</div></div><br>', unsafe_allow_html=True)
+        if prof.draw_compact: st.markdown(f'<div style="border-radius:14px; padding:10px 20px; background:#ffffff; border:3px solid #90CAF9; box-shadow:0 4px 12px rgba(0,0,0,0.15); display:flex; justify-content:space-between; align-items:center; margin-bottom:12px;"><span style="font-family:\'Fredoka One\',cursive; font-size:1.5rem;">🎴 {cur.name} 的回合</span><span style="font-size:1rem; font-weight:900; background:#e3f2fd; border-radius:8px; padding:4px 12px; border:2px solid #90CAF9;">牌堆剩餘 <b>{len(gs["deck"])}</b> 張</span></div>', unsafe_allow_html=True)
+        else: st.markdown(f'<div style="border-radius:24px; padding:36px 24px; text-align:center; background:#ffffff; border:5px solid #90CAF9; box-shadow:0 10px 30px rgba(0,0,0,0.2);"><div style="font-family:\'Fredoka One\',cursive; font-size:3rem;">🎴 {cur.name} 的回合</div><div style="font-size:1.3rem; font-weight:900; margin-bottom:20px;">牌堆剩餘 <b>{len(gs["deck"])}</b> 張</div></div><br>', unsafe_allow_html=True)
         if gs["deck"]:
-            if st.button("🃏  抽  一  張  牌", use_container_width=True, type="primary"): action_draw(gs); st.rerun()
+            if prof.draw_css: inject(prof.draw_css)
+            if prof.draw_wrap: st.markdown(f'<div class="{prof.draw_wrap}">', unsafe_allow_html=True)
+            if st.button("🃏  抽  一  張  牌", use_container_width=True, type="primary"): ui(action_draw(gs)); st.rerun()
+            if prof.draw_wrap: st.markdown('</div>', unsafe_allow_html=True)
         else:
             st.markdown(msg_html("牌堆已空！直接進入行動階段", "warning"), unsafe_allow_html=True)
-            if st.button("⚡ 直接行動", use_container_width=True, type="primary"): gs["phase"] = "action"; st.rerun()
+            if st.button("⚡ 直接行動", use_container_width=True, type="primary"): ui(skip_draw(gs)); st.rerun()
         
-        st.markdown(f'<div style="font-size:1.2rem;font-weight:900;margin-bottom:10px;text-align:center;background:rgba(255,255,255,0.8);border-radius:8px;padding:5px;">📋 目前手牌（{len(cur.hand)} 張）</div>', unsafe_allow_html=True)
-        if cur.hand:
-            hc = st.columns(min(len(cur.hand), 6) or 1)
-            for i, card in enumerate(cur.hand):
-                with hc[i % 6]: st.markdown(render_card(card, small=True), unsafe_allow_html=True)
+        if not prof.draw_compact:                # 精簡版抽牌頁不列手牌
+            st.markdown(f'<div style="font-size:1.2rem;font-weight:900;margin-bottom:10px;text-align:center;background:rgba(255,255,255,0.8);border-radius:8px;padding:5px;">📋 目前手牌（{len(cur.hand)} 張）</div>', unsafe_allow_html=True)
+            if cur.hand:
+                hc = st.columns(min(len(cur.hand), 6) or 1)
+                for i, card in enumerate(cur.hand):
+                    with hc[i % 6]: st.markdown(render_card(card, small=True), unsafe_allow_html=True)
     with c3:
         st.markdown("**📊 目前排名**")
         render_ranking(gs["players"], ci, gs)
 
+# ══════════════════════════════════════════════════════════════════
+#  手牌 / 選牌 / 行動面板（片段重跑：選牌只重跑此區）
+# ══════════════════════════════════════════════════════════════════
+def _toggle_sel(i):
+    st.session_state.sel = None if st.session_state.get("sel") == i else i
+
+@st.fragment
+@timed("hand_panel")
+def hand_panel():
+    t = current_table()
+    if t is None: return _hand_panel(st.session_state.gs)
+    with t.lock:
+        if my_seat(t) != t.gs["turn"]: st.rerun()
+        _hand_panel(t.gs)
+
+def _hand_panel(gs):
+    t0 = time.perf_counter()
+    ci, phase = gs["turn"], gs["phase"]
+    cur = gs["players"][ci]
+
+    sel = st.session_state.get("sel", None)
+    if sel is not None and (not cur.hand or sel >= len(cur.hand)): st.session_state.sel = sel = None
+
+    st.markdown(f'<div style="font-size:1.3rem; font-weight:900; background:#ffffff; border-radius:12px; padding:8px 16px; display:inline-block; border:4px solid {cur.color["header"]}; margin-bottom:20px; box-shadow:0 4px 10px rgba(0,0,0,0.15);">🎴 {cur.name} 的手牌（{len(cur.hand)} 張）</div>', unsafe_allow_html=True)
+
+    if cur.hand:
+        n_cols = min(len(cur.hand), 6) or 1
+        hcols  = st.columns(n_cols)
+        last_drawn = gs.get("last_drawn_card")
+        for i, card in enumerate(cur.hand):
+            with hcols[i % n_cols]:
+                is_sel, is_new = (sel == i), (last_drawn is not None and i == last_drawn)
+                if is_new: st.markdown('<div style="text-align:center;font-size:.9rem;font-weight:900;margin-bottom:6px;background:#bbdefb;border:2px solid #1976d2;border-radius:6px;">🆕 剛抽到</div>', unsafe_allow_html=True)
+                st.markdown(render_card(card, selected=is_sel), unsafe_allow_html=True)
+                if phase == "action":
+                    st.button("⭐ 已選" if is_sel else "選擇", key=f"hsel_{i}", use_container_width=True, on_click=_toggle_sel, args=(i,))
+    else:
+        st.info("手牌為空")
+        if phase == "action" and st.button("⏭️ 跳過本回合", use_container_width=True): ui(action_pass(gs)); st.rerun()
+
+    sel_card = cur.hand[sel] if (sel is not None and sel < len(cur.hand)) else None
+    if sel_card and phase == "action":
+        st.markdown(f'<div style="background:{sel_card.bg};border:4px solid {sel_card.border};border-radius:16px;padding:16px;font-weight:900;font-size:1.25rem;text-align:center;margin:15px 0;box-shadow:0 6px 15px rgba(0,0,0,0.15);">{sel_card.emoji} <b>{sel_card.cat}</b> — {sel_card.desc}</div>', unsafe_allow_html=True)
+
+    if phase == "action":
+        if not sel_card: st.markdown(msg_html("👆 請先點選一張手牌，再選擇下方行動", "info"), unsafe_allow_html=True)
+        else:
+            can_place, can_func = sel_card.kind == "food", sel_card.kind == "func"
+            if current_profile().merge_actions:
+                ac = st.columns(2)
+                with ac[0]:
+                    if can_func:
+                        if st.button("✨ 使用功能牌", use_container_width=True, type="primary"): ui(action_use_func(gs, sel)); st.rerun()
+                    elif st.button("🍽️ 放入餐盤", use_container_width=True, type="primary"): ui(action_place(gs, sel)); st.rerun()
+            else:
+                ac = st.columns(3)
+                with ac[0]:
+                    if st.button(f"🍽️ 放入餐盤", disabled=not can_place, use_container_width=True, type="primary"): ui(action_place(gs, sel)); st.rerun()
+                with ac[1]:
+                    if st.button("✨ 使用功能牌" if can_func else "（請選功能牌）", disabled=not can_func, use_container_width=True, type="primary"): ui(action_use_func(gs, sel)); st.rerun()
+            with ac[-1]:
+                if st.button("🗑️ 丟掉不用", use_container_width=True): ui(action_discard(gs, sel)); st.rerun()
+
+    if not st.session_state.get("_full_run"): perf_record("fragment", t0)
+    if st.query_params.get("perf"): st.caption(perf_summary())
+
 # ══════════════════════════════════════════════════════════════════
 #  行動主頁
 # ══════════════════════════════════════════════════════════════════
+@timed("page_action")
 def page_action():
-    st.markdown(CSS, unsafe_allow_html=True)
     gs, ci, phase = st.session_state.gs, st.session_state.gs["turn"], st.session_state.gs["phase"]
     players, cur = gs["players"], gs["players"][ci]
 
-    sel = st.session_state.get("sel", None)
-    if sel is not None and (not cur.hand or sel >= len(cur.hand)): st.session_state.sel = sel = None
-
     h1, h2, h3 = st.columns([3, 1, 1])
     with h1:
         st.markdown('<div class="main-title" style="font-size:1.8rem;text-align:left;">🥗 最強糾察員</div>', unsafe_allow_html=True)
@@ -608,6 +388,7 @@ def page_action():
     with h3: st.markdown(f'<div style="background:#ffffff;border:4px solid #ef5350;border-radius:12px;padding:8px;text-align:center;font-weight:900;box-shadow:0 2px 6px rgba(0,0,0,0.1);">棄牌<br><span style="font-size:1.8rem;">{gs["discard"][-1].emoji if gs["discard"] else "—"}</span></div>', unsafe_allow_html=True)
 
     if gs["msg"]: st.markdown(msg_html(gs["msg"], gs["msg_type"]), unsafe_allow_html=True)
+    if (hint := hint_html(gs)): st.markdown(hint, unsafe_allow_html=True)
     st.markdown("---")
 
     left, right = st.columns([1, 2.8])
@@ -637,25 +418,7 @@ def page_action():
                 st.markdown("</div>" + (f'<div style="text-align:center;font-weight:900;color:#1b5e20 !important;background:#c8e6c9;border-radius:6px;border:2px solid #4caf50;">✅ 均衡 +{BALANCED_BONUS}</div>' if p.is_balanced() else "") + "</div>", unsafe_allow_html=True)
 
         st.markdown("---")
-        st.markdown(f'<div style="font-size:1.3rem; font-weight:900; background:#ffffff; border-radius:12px; padding:8px 16px; display:inline-block; border:4px solid {cur.color["header"]}; margin-bottom:20px; box-shadow:0 4px 10px rgba(0,0,0,0.15);">🎴 {cur.name} 的手牌（{len(cur.hand)} 張）</div>', unsafe_allow_html=True)
-
-        if cur.hand:
-            n_cols = min(len(cur.hand), 6) or 1
-            hcols  = st.columns(n_cols)
-            last_drawn = gs.get("last_drawn_card")
-            for i, card in enumerate(cur.hand):
-                with hcols[i % n_cols]:
-                    is_sel, is_new = (sel == i), (last_drawn is not None and i == last_drawn)
-                    if is_new: st.markdown('<div style="text-align:center;font-size:.9rem;font-weight:900;margin-bottom:6px;background:#bbdefb;border:2px solid #1976d2;border-radius:6px;">🆕 剛抽到</div>', unsafe_allow_html=True)
-                    st.markdown(render_card(card, selected=is_sel), unsafe_allow_html=True)
-                    if phase == "action":
-                        if st.button("⭐ 已選" if is_sel else "選擇", key=f"hsel_{i}", use_container_width=True):
-                            st.session_state.sel = i if not is_sel else None; st.rerun()
-        else: st.info("手牌為空")
-
-        sel_card = cur.hand[sel] if (sel is not None and sel < len(cur.hand)) else None
-        if sel_card and phase == "action":
-            st.markdown(f'<div style="background:{sel_card.bg};border:4px solid {sel_card.border};border-radius:16px;padding:16px;font-weight:900;font-size:1.25rem;text-align:center;margin:15px 0;box-shadow:0 6px 15px rgba(0,0,0,0.15);">{sel_card.emoji} <b>{sel_card.cat}</b> — {sel_card.desc}</div>', unsafe_allow_html=True)
+        hand_panel()
 
     st.markdown("---")
     
@@ -666,12 +429,12 @@ def page_action():
             with tc[idx]:
                 st.markdown(f'<div style="background:#ffffff;border:4px solid {tp.color["header"]};border-radius:16px;padding:16px;text-align:center;font-weight:900;font-size:1.2rem;margin-bottom:12px;box-shadow:0 4px 10px rgba(0,0,0,0.1);">{tp.name}<br><span style="color:#c62828 !important;font-size:1.1rem;">現有手牌: {len(tp.hand)} 張</span></div>', unsafe_allow_html=True)
                 if st.button(f"💥 丟棄 {tp.name}", key=f"dh_{idx}", use_container_width=True, type="primary", disabled=(len(tp.hand)==0)):
-                    resolve_discard_hand(gs, idx); st.rerun()
-        if st.button("取消", use_container_width=True): gs["phase"] = "action"; gs["pending_hand_idx"] = None; st.rerun()
+                    ui(resolve_discard_hand(gs, idx)); st.rerun()
+        if st.button("取消", use_container_width=True): ui(cancel_pending(gs)); st.rerun()
 
     elif phase == "confirm_draw":
         st.markdown(msg_html("✨ 抽牌完畢！請看一眼確認你新抽到的手牌後，點擊下方按鈕結束回合", "success"), unsafe_allow_html=True)
-        if st.button("✅ 我確認完畢，換下一位", use_container_width=True, type="primary"): advance_turn(gs); st.rerun()
+        if st.button("✅ 我確認完畢，換下一位", use_container_width=True, type="primary"): ui(confirm_draw(gs)); st.rerun()
 
     elif phase == "pending_pause":
         st.markdown(msg_html("👇 選擇要讓哪位玩家下回合暫停", "warning"), unsafe_allow_html=True)
@@ -680,25 +443,64 @@ def page_action():
         for idx, (ti, tp) in enumerate(targets):
             with tc[idx]:
                 st.markdown(f'<div style="background:#ffffff;border:4px solid {tp.color["header"]};border-radius:16px;padding:16px;text-align:center;font-weight:900;font-size:1.2rem;margin-bottom:12px;box-shadow:0 4px 10px rgba(0,0,0,0.1);">{tp.name}{"（已暫停）" if tp.skip_next else ""}<br><span style="color:#c62828 !important;">{tp.plate_score()} 分</span></div>', unsafe_allow_html=True)
-                if st.button(f"⛔ 暫停 {tp.name}", key=f"pause_{ti}", use_container_width=True, type="primary"): resolve_pause(gs, ti); st.rerun()
+                if st.button(f"⛔ 暫停 {tp.name}", key=f"pause_{ti}", use_container_width=True, type="primary"): ui(resolve_pause(gs, ti)); st.rerun()
 
-    elif phase == "action":
-        if not sel_card: st.markdown(msg_html("👆 請先點選一張手牌，再選擇下方行動", "info"), unsafe_allow_html=True)
-        else:
-            can_place, can_func = sel_card.kind == "food", sel_card.kind == "func"
-            ac = st.columns(3)
-            with ac[0]:
-                if st.button(f"🍽️ 放入餐盤", disabled=not can_place, use_container_width=True, type="primary"): action_place(gs, sel); st.rerun()
-            with ac[1]:
-                if st.button("✨ 使用功能牌" if can_func else "（請選功能牌）", disabled=not can_func, use_container_width=True, type="primary"): action_use_func(gs, sel); st.rerun()
-            with ac[2]:
-                if st.button("🗑️ 丟掉不用", use_container_width=True): action_discard(gs, sel); st.rerun()
+
+# ══════════════════════════════════════════════════════════════════
+#  多裝置同桌：選座位與等待頁
+# ══════════════════════════════════════════════════════════════════
+@timed("page_join")
+def page_join(t):
+    gs = t.gs
+    st.markdown('<div class="main-title">🥗 最強糾察員</div><div class="sub-title">選擇你的座位</div><br>', unsafe_allow_html=True)
+    c1, c2, c3 = st.columns([1, 2, 1])
+    with c2:
+        me = st.query_params.get("me")
+        for i, p in enumerate(gs["players"]):
+            taken = t.seats.get(i) not in (None, me) or i in t.bots
+            note = "（電腦）" if i in t.bots else "（已有人加入）" if taken else ""
+            if st.button(f"🪑 我是 {p.name}{note}", key=f"seat_{i}", use_container_width=True, disabled=taken):
+                take_seat(t.key, i); st.rerun()
+        st.caption("邀請其他玩家開啟：")
+        st.code(join_link(t.key), language=None)
+
+@st.fragment(run_every=POLL_SEC)
+def wait_poll(key, seen):
+    # 只比對版本號，不持鎖；有人行動才整頁重跑
+    t = table_registry().get(key)
+    if t is None or t.version != seen: st.rerun()
+
+@timed("page_wait")
+def page_wait(t, seat):
+    gs = t.gs
+    players, ci, me = gs["players"], gs["turn"], gs["players"][seat]
+    cur = players[ci]
+    st.markdown(f'<div style="border-radius:24px; padding:28px 24px; text-align:center; background:#ffffff; border:5px solid {cur.color["header"]}; box-shadow:0 10px 30px rgba(0,0,0,0.2);"><div style="font-size:1.3rem;font-weight:900;">⏳ 等待</div><div style="font-family:\'Fredoka One\',cursive; font-size:3rem; color:{cur.color["header"]} !important;">{cur.name}</div><div style="font-size:1.2rem;font-weight:900;">行動中…</div></div><br>', unsafe_allow_html=True)
+    for ev in t.news + gs["events"]: st.markdown(f'<div class="event-item">📢 {ev}</div>', unsafe_allow_html=True)
+    left, right = st.columns([1, 2.2])
+    with left:
+        st.markdown("**📊 目前排名**")
+        render_ranking(players, ci, gs)
+    with right:
+        st.markdown(f"**🍽️ {me.name} 的餐盤**")
+        if me.plate:
+            cc = st.columns(min(len(me.plate), 6))
+            for j, c in enumerate(me.plate):
+                with cc[j % 6]: st.markdown(render_card(c, small=True), unsafe_allow_html=True)
+        else: st.markdown("<div style='text-align:center;padding:25px 0;font-weight:900;'>🈳 空</div>", unsafe_allow_html=True)
+        st.markdown(f"**🎴 我的手牌（{len(me.hand)} 張）**")
+        if me.hand:
+            hc = st.columns(min(len(me.hand), 6))
+            for i, c in enumerate(me.hand):
+                with hc[i % 6]: st.markdown(render_card(c, small=True), unsafe_allow_html=True)
+    with st.expander("📱 邀請其他玩家"): st.code(join_link(t.key), language=None)
+    wait_poll(t.key, t.version)
 
 # ══════════════════════════════════════════════════════════════════
 #  結果頁
 # ══════════════════════════════════════════════════════════════════
+@timed("page_result")
 def page_result():
-    st.markdown(CSS, unsafe_allow_html=True)
     gs = st.session_state.gs
     for p in gs["players"]: p.score = p.plate_score()
     ranked, medals = sorted(gs["players"], key=lambda p: p.score, reverse=True), ["🥇","🥈","🥉","4️⃣"]
@@ -735,19 +537,65 @@ def page_result():
     c1, c2, c3 = st.columns([1, 2, 1])
     with c2:
         if st.button("🔄 返回主畫面", use_container_width=True, type="primary"):
+            key, store = st.query_params.pop("table", None), table_store()
+            if key and store: store.delete(key)
+            if (key := st.query_params.get("join")): table_registry().drop(key)
+            for k in ("join", "seat", "me", "bots"): st.query_params.pop(k, None)
             st.session_state.page = "setup"; del st.session_state.gs; st.rerun()
+        if gs.get("seed") is not None:
+            st.download_button("📜 下載對局紀錄（可重播）", replay.dumps(gs), f"game-{gs['seed']}.log", "text/plain", use_container_width=True)
 
-def main():
+def main(profile=None):
     st.set_page_config(page_title="最強糾察員", page_icon="🥗", layout="wide", initial_sidebar_state="collapsed")
+    inject()
+    # 入口檔指定的設定檔優先，其次網址 ?profile=
+    name = profile or st.query_params.get("profile", "full")
+    st.session_state.profile = name if name in PROFILES else "full"
+    t0 = time.perf_counter()
+    st.session_state._full_run = True
+    try:
+        route()
+    finally:
+        st.session_state._full_run = False
+        perf_record("full", t0)
+    profiler.panel()
+
+@timed("rerun")
+def route():
     if "page" not in st.session_state: st.session_state.page = "setup"
     if "sel"  not in st.session_state: st.session_state.sel  = None
+    if (t := current_table()) is not None:
+        with t.lock: route_table(t)
+        return
     gs = st.session_state.get("gs")
+    if gs is None and (gs := restore_table()):
+        st.session_state.gs, st.session_state.hist, st.session_state.page = gs, History(gs), "game"
     if st.session_state.page == "setup": page_setup(); return
     if not gs: st.session_state.page = "setup"; st.rerun(); return
+    play_bots(gs, url_bots())
     if gs.get("over") or gs.get("phase") == "over": page_result(); return
     if gs.get("showing_transition"): page_transition(); return
     if gs.get("phase") == "alert_first_plate": page_alert_first_plate(); return
     if gs.get("phase", "draw_screen") == "draw_screen": page_draw()
     else: page_action()
 
+# 多裝置同桌：整次重跑持有牌桌鎖，同桌各裝置的點擊依序套用
+def route_table(t):
+    st.session_state.gs = gs = t.gs
+    st.session_state.page = "game"
+    play_bots(gs, t.bots)
+    seat = my_seat(t)
+    if seat is None: page_join(t); return
+    if gs["over"]: page_result(); return
+    if seat != gs["turn"]: page_wait(t, seat); return
+    if gs["showing_transition"]:
+        # 各自看自己的手機，不需要交棒畫面
+        t.news = list(gs["events"]); gs["events"].clear()
+        st.session_state.sel = None
+        ui(end_transition(gs))
+    for ev in t.news: st.markdown(f'<div class="event-item">📢 {ev}</div>', unsafe_allow_html=True)
+    if gs["phase"] == "alert_first_plate": page_alert_first_plate()
+    elif gs["phase"] == "draw_screen": page_draw()
+    else: page_action()
+
 if __name__ == "__main__": main()
@@ -0,0 +1,280 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — NumPy 向量化批次模擬
+
+數千局同時以陣列保存（牌堆順序、各玩家手牌 / 餐盤的類別張數、暫停旗標…），
+每一步讓所有未結束的對局同步走一個回合。策略為 simulate.py 的 catgreedy /
+catgreedy-rand：只依類別決策，因此能與純量核心逐局比對。
+
+    python batch.py -n 100000 -p 3 -m allcards
+    python batch.py --check 3000        # 與純量核心逐局比對；改動規則或模擬器後合併前必跑
+"""
+import argparse
+import random
+import sys
+import time
+from typing import NamedTuple
+
+import numpy as np
+
+from simulate import (DEFAULT_MODE_VAL, DRAW_N, DRAWS, DROP, GROUPS, MODES, NF, PAUSE, PTS, STEAL, SWAP,
+                      CAT_NAMES, Result, Rules, Stats, format_report, make_policies, play)
+
+NC        = len(CAT_NAMES)
+PTS_A     = np.array(PTS, dtype=np.int32)
+END_CODES = ("countdown", "last_round", "deck_empty", "rounds", "score", "exhausted")
+BATCH_POLICIES = {"catgreedy": False, "catgreedy-rand": True}  # 名稱 → 是否打隨機牌
+
+GROUP_M = np.zeros((len(GROUPS), NF), dtype=np.float32)          # 均衡分類 × 食物類別（0/1，以矩陣乘法彙總）
+for _g, _cats in enumerate(GROUPS): GROUP_M[_g, list(_cats)] = 1
+
+def _groups_held(plates):
+    # (A, NF) 餐盤張數 → (A, 分類數) 各均衡分類是否已有
+    return (plates > 0).astype(np.float32) @ GROUP_M.T > 0
+
+NONE, PLACE, DISCARD, FUNC, PASS = -1, 0, 1, 2, 3
+
+class BatchResult(NamedTuple):
+    scores: np.ndarray  # (G, P)
+    end:    np.ndarray  # (G,) END_CODES 索引
+    rounds: np.ndarray
+    turns:  np.ndarray
+
+    def results(self):
+        for g in range(len(self.end)):
+            yield Result(self.scores[g].tolist(), END_CODES[self.end[g]], int(self.rounds[g]), int(self.turns[g]))
+
+def random_decks(games, rules, gen):
+    base = np.array(rules.base_deck(), dtype=np.int8)
+    return gen.permuted(np.broadcast_to(base, (games, len(base))), axis=1)
+
+def _pick_weighted(counts, u):
+    # 依張數權重抽一個類別：counts (A, C)，u ∈ [0,1)
+    cum = counts.cumsum(1)
+    r = (u * cum[:, -1]).astype(np.int64)
+    return (cum > r[:, None]).argmax(1)
+
+# ══════════════════════════════════════════════════════════════════
+#  批次引擎
+# ══════════════════════════════════════════════════════════════════
+def play_batch(decks, n, mode, mode_val, rules, random_cards=False, gen=None) -> BatchResult:
+    G, D = decks.shape
+    gen  = gen or np.random.default_rng()
+    ar   = np.arange(G)
+    deck = np.ascontiguousarray(decks, dtype=np.int8)
+    ptr  = np.full(G, D, dtype=np.int64)
+    hand = np.zeros((G, n, NC), dtype=np.int16)
+    for p in range(n):
+        for _ in range(rules.init_hand):
+            m = ptr > 0; g = ar[m]
+            hand[g, p, deck[g, ptr[g] - 1]] += 1; ptr[g] -= 1
+    plate  = np.zeros((G, n, NF), dtype=np.int16)
+    score  = np.zeros((G, n), dtype=np.int32)
+    bal    = np.zeros((G, n), dtype=bool)
+    skip   = np.zeros((G, n), dtype=bool)
+    turn   = np.zeros(G, dtype=np.int64)
+    rounds = np.zeros(G, dtype=np.int64)
+    turns  = np.zeros(G, dtype=np.int64)
+    has_cd = np.zeros(G, dtype=bool); cd = np.zeros(G, dtype=np.int64)
+    last_round = np.zeros(G, dtype=bool); starter = np.full(G, -1, dtype=np.int64)
+    end    = np.full(G, -1, dtype=np.int8)
+    roll   = np.roll(np.arange(n), 1)               # 順時針：新手牌 i = 舊手牌 i-1
+    bonus, penalty = rules.bonus, rules.penalty
+
+    def draw(m):
+        m = m & (ptr > 0); g = ar[m]
+        hand[g, turn[g], deck[g, ptr[g] - 1]] += 1; ptr[g] -= 1
+
+    active = np.ones(G, dtype=bool)
+    while active.any():
+        turns += active
+        draw(active)
+
+        # ── 策略（catgreedy）：全部向量化 ─────────────────────────
+        H, PL = hand[ar, turn], plate[ar, turn]
+        hsize = H.sum(1)
+        food  = H[:, :NF] > 0
+        has_food = food.any(1)
+        missing = ~_groups_held(PL)
+        one_missing = missing.sum(1) == 1
+        completing  = one_missing[:, None] & (missing.astype(np.float32) @ GROUP_M > 0)
+        delta  = PTS_A + penalty * (PL == 2) + bonus * completing
+        best_k = np.where(food, delta, -(1 << 20)).argmax(1)
+        best_v = delta[ar, best_k]
+        worst_k = np.where(food, delta, 1 << 20).argmin(1)
+        prev_size = hand[ar, (turn - 1) % n].sum(1)
+
+        op  = np.where(active, NONE, PASS); k = np.zeros(G, dtype=np.int64)
+        def choose(cond, o, cat):
+            nonlocal op, k
+            m = (op == NONE) & cond
+            op = np.where(m, o, op); k = np.where(m, cat, k)
+        choose(hsize == 0, PASS, 0)
+        for f in DRAWS: choose((H[:, f] > 0) & (ptr > 0), FUNC, f)
+        choose(has_food & (best_v > 0), PLACE, best_k)
+        for f in ((STEAL, PAUSE, DROP) if random_cards else (PAUSE,)):
+            if f is not None: choose(H[:, f] > 0, FUNC, f)
+        if SWAP is not None: choose((H[:, SWAP] > 0) & (prev_size >= hsize), FUNC, SWAP)
+        choose(has_food, DISCARD, worst_k)
+        choose(np.ones(G, dtype=bool), DISCARD, (H[:, NF:] > 0).argmax(1) + NF)
+
+        # ── 套用行動 ───────────────────────────────────────────
+        m = op == PLACE; g = ar[m]; t = turn[g]; c = k[m]
+        hand[g, t, c] -= 1; plate[g, t, c] += 1
+        score[g, t] += PTS_A[c] + penalty * (plate[g, t, c] == 3)
+        now_bal = _groups_held(plate[g, t]).all(1)
+        newly = now_bal & ~bal[g, t]
+        score[g[newly], t[newly]] += bonus; bal[g, t] |= now_bal
+        if mode == "first_plate":
+            s = now_bal & ~has_cd[g]
+            has_cd[g[s]] = True; cd[g[s]] = mode_val * n + 1
+
+        m = op == DISCARD; g = ar[m]
+        hand[g, turn[g], k[m]] -= 1
+
+        func = op == FUNC
+        for f in DRAWS:
+            m = func & (k == f); g = ar[m]
+            hand[g, turn[g], f] -= 1
+            for _ in range(DRAW_N[f]): draw(m)
+
+        m = func & (k == PAUSE); g = ar[m]
+        if len(g):
+            key = np.where(skip[g], 0, 1 << 20) + score[g]
+            key[np.arange(len(g)), turn[g]] = -(1 << 30)
+            skip[g, key.argmax(1)] = True
+            hand[g, turn[g], PAUSE] -= 1
+
+        m = func & (k == SWAP); g = ar[m]
+        if len(g):
+            hand[g, turn[g], SWAP] -= 1
+            hand[g] = hand[g][:, roll]
+
+        if random_cards:
+            m = func & (k == STEAL); g = ar[m]
+            if len(g):
+                t = turn[g]
+                sizes = hand[g].sum(2)
+                valid = sizes > 0; valid[np.arange(len(g)), t] = False
+                hand[g, t, STEAL] -= 1
+                nt = valid.sum(1); ok = nt > 0
+                g, t, valid, nt = g[ok], t[ok], valid[ok], nt[ok]
+                j = (gen.random(len(g)) * nt).astype(np.int64)
+                ti = (valid.cumsum(1) > j[:, None]).argmax(1)
+                c = _pick_weighted(hand[g, ti], gen.random(len(g)))
+                hand[g, ti, c] -= 1; hand[g, t, c] += 1
+
+            m = func & (k == DROP); g = ar[m]
+            if len(g):
+                t = turn[g]; rows = np.arange(len(g))
+                sizes = hand[g].sum(2)
+                others = sizes.copy(); others[rows, t] = -1
+                live = (others > 0).any(1)
+                ti = np.where(live, others.argmax(1), t)
+                has_targets = live | (sizes[rows, t] > 1)
+                hand[g, t, DROP] -= 1
+                g, ti = g[has_targets], ti[has_targets]
+                nonempty = hand[g, ti].sum(1) > 0
+                g, ti = g[nonempty], ti[nonempty]
+                c = _pick_weighted(hand[g, ti], gen.random(len(g)))
+                hand[g, ti, c] -= 1
+
+        # ── 帝王條款與換人 ─────────────────────────────────────
+        emp = active & (hand[ar, turn].sum(1) == 0) & ~last_round & ~has_cd
+        last_round |= emp; starter = np.where(emp, turn, starter)
+
+        cd -= active & has_cd
+        nxt = (turn + 1) % n
+        code = np.full(G, -1, dtype=np.int8)
+        def finish(cond, c):
+            nonlocal code
+            code = np.where((code < 0) & active & cond, c, code)
+        finish(has_cd & (cd <= 0), 0)
+        finish(last_round & (nxt == starter), 1)
+        if mode == "allcards": finish(ptr == 0, 2)
+        if mode == "rounds":   finish(rounds >= mode_val * n, 3)
+        if mode == "score":
+            finish(score.max(1) >= mode_val, 4)
+            finish((ptr == 0) & (hand.sum((1, 2)) == 0), 5)
+        ended = code >= 0
+        end = np.where(ended, code, end); active &= ~ended
+
+        rounds += active
+        sk = active & skip[ar, nxt]
+        skip[ar[sk], nxt[sk]] = False
+        cd -= sk & has_cd
+        turn = np.where(active, np.where(sk, (nxt + 1) % n, nxt), turn)
+
+    return BatchResult(score, end, rounds, turns)
+
+# ══════════════════════════════════════════════════════════════════
+#  等價檢查：與 simulate.py 純量核心（其本身已與 engine.py 逐局比對）對照
+# ══════════════════════════════════════════════════════════════════
+def check(games, n, mode, mode_val, rules, seed=0):
+    gen   = np.random.default_rng(seed)
+    decks = random_decks(games, rules, gen)
+    # catgreedy 不打隨機牌 → 完全決定性，必須逐局相同；
+    # 另以輕懲罰規則重跑一次，讓策略真的放下第 3 張同類，覆蓋失衡懲罰分支
+    for r in (rules, rules._replace(penalty=-2)):
+        batch = play_batch(decks, n, mode, mode_val, r, random_cards=False, gen=gen)
+        for g, br in enumerate(batch.results()):
+            pols = make_policies(["catgreedy"], n, r, None)
+            ref  = play(decks[g].tolist(), n, mode, mode_val, pols, None, r)
+            if br != ref:
+                raise AssertionError(f"{mode} {r} game {g}: batch={br} scalar={ref}")
+
+    # catgreedy-rand 含隨機偷 / 棄牌 → 亂數流不同，比對分佈（平均分數在 5 個標準誤內）
+    batch = play_batch(decks, n, mode, mode_val, rules, random_cards=True, gen=gen)
+    rng = random.Random(seed)
+    pols = make_policies(["catgreedy-rand"], n, rules, rng)
+    ref = np.array([play(decks[g].tolist(), n, mode, mode_val, pols, rng, rules).scores
+                    for g in range(games)])
+    diff = batch.scores.mean(0) - ref.mean(0)
+    se = np.sqrt(batch.scores.var(0) / games + ref.var(0) / games) + 1e-9
+    if (np.abs(diff) > 5 * se).any():
+        raise AssertionError(f"{mode} catgreedy-rand 平均分數偏差 {diff}（標準誤 {se}）")
+    return games
+
+# ══════════════════════════════════════════════════════════════════
+#  批次統計
+# ══════════════════════════════════════════════════════════════════
+def run(games, n, mode, mode_val, policy="catgreedy", rules=None, seed=0, batch_size=20000):
+    rules = rules or Rules.current()
+    gen   = np.random.default_rng(seed)
+    stats = Stats(n)
+    t0 = time.perf_counter()
+    for start in range(0, games, batch_size):
+        decks = random_decks(min(batch_size, games - start), rules, gen)
+        for r in play_batch(decks, n, mode, mode_val, rules, BATCH_POLICIES[policy], gen).results():
+            stats.add(r)
+    elapsed = time.perf_counter() - t0
+    return stats.summary(
+        players=n, mode=mode, mode_val=mode_val, rules=rules._asdict(), policies=[policy] * n,
+        seconds=elapsed, games_per_sec=games / elapsed if elapsed else float("inf"),
+    )
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 向量化批次模擬")
+    ap.add_argument("-n", "--games", type=int, default=100000)
+    ap.add_argument("-p", "--players", type=int, default=2, choices=(2, 3, 4))
+    ap.add_argument("-m", "--mode", choices=MODES + ("all",), default="all")
+    ap.add_argument("--mode-val", type=int)
+    ap.add_argument("--policy", choices=list(BATCH_POLICIES), default="catgreedy")
+    ap.add_argument("--batch-size", type=int, default=20000)
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", type=int, metavar="GAMES", help="與純量核心比對後結束")
+    args = ap.parse_args(argv)
+
+    rules = Rules.current()
+    for mode in (MODES if args.mode == "all" else (args.mode,)):
+        mode_val = args.mode_val if args.mode_val is not None else DEFAULT_MODE_VAL[mode]
+        if args.check:
+            check(args.check, args.players, mode, mode_val, rules, args.seed)
+            print(f"✅ {mode}({mode_val}) × {args.players} 人：{args.check} 局與純量核心一致")
+            continue
+        print(format_report(run(args.games, args.players, mode, mode_val, args.policy, rules,
+                                args.seed, args.batch_size)))
+
+if __name__ == "__main__":
+    sys.exit(main())
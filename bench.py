@@ -0,0 +1,303 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 效能基準套件
+
+固定 seed 準備好局面，逐項量測引擎行動、結束判定、計分、卡牌 / 排名 HTML 產生與整局模擬；
+每項跑 REPEAT 輪取最快一輪（排除雜訊），以「每次操作微秒」記錄，並記下各輪的離散程度（中位 / 最快 − 1）。
+基準存成 JSON，--compare 與基準比對，超過容忍度（整局項目至少 50%，離散程度較大的項目改用基準量到的離散程度）即標示變慢並以結束碼 1 回報（可接在 CI 上）。
+
+    python bench.py                               # 全部項目
+    python bench.py -k engine.action -k render    # 只跑名稱含這些字的項目
+    python bench.py --save bench_baseline.json    # 存基準
+    python bench.py --compare bench_baseline.json --tolerance 0.25
+"""
+import argparse
+import copy
+import json
+import logging
+import platform
+import random
+import statistics
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Tuple
+
+import engine
+import replay
+from simulate import DRAWS, DROP, MODES, DEFAULT_MODE_VAL, PAUSE, STEAL, SWAP
+
+REPEAT = 5
+SEED   = 20240601
+GAMES  = 20                    # 整局項目固定玩這幾局（seed 不隨 --scale 改變），次數是整組重複幾遍
+
+CASES: Dict[str, Tuple[Callable, int]] = {}      # 名稱 → (量測函式(次數) → 總秒數, 次數)
+TOLERANCE: Dict[str, float] = {}                   # 名稱 → 該項最少的容忍度（整局項目受對局長短與排程影響較大）
+
+def case(name, number, tolerance=0.0):
+    def deco(fn):
+        CASES[name] = (fn, number)
+        if tolerance: TOLERANCE[name] = tolerance
+        return fn
+    return deco
+
+# ══════════════════════════════════════════════════════════════════
+#  準備局面（固定 seed 隨機打到指定階段，再深拷貝成 n 份）
+# ══════════════════════════════════════════════════════════════════
+_POOL = {}
+
+def _positions(players=3, mode="rounds"):
+    # 一批隨機對局中每個「待行動」局面（快取，各項共用）
+    key = (players, mode)
+    if key not in _POOL:
+        out, rng = [], random.Random(SEED)
+        for g in range(40):
+            gs = engine.init_game([f"P{i+1}" for i in range(players)], mode, DEFAULT_MODE_VAL[mode], seed=SEED + g)
+            while not gs["over"]:
+                if gs["phase"] == "action" and not gs["showing_transition"] and gs["players"][gs["turn"]].hand:
+                    out.append(copy.deepcopy(gs))
+                replay.random_step(gs, rng)
+        _POOL[key] = out
+    return _POOL[key]
+
+def _states(n, pred=lambda gs: True, prep=None, players=3, mode="rounds"):
+    base = [gs for gs in _positions(players, mode) if pred(gs)]
+    out = []
+    for i in range(n):
+        gs = copy.deepcopy(base[i % len(base)])
+        if prep: prep(gs)
+        out.append(gs)
+    return out
+
+def _give(code):
+    # 把牌堆 / 棄牌堆裡一張指定類別的牌換進輪到的人手牌第 0 張
+    def prep(gs):
+        hand = gs["players"][gs["turn"]].hand
+        for pile in (gs["deck"], gs["discard"], *[p.hand for p in gs["players"] if p.hand is not hand]):
+            j = next((j for j, c in enumerate(pile) if c.code == code), None)
+            if j is not None:
+                pile[j], hand[0] = hand[0], pile[j]; return
+    return prep
+
+def _timed(states, fn):
+    t0 = time.perf_counter()
+    for gs in states: fn(gs)
+    return time.perf_counter() - t0
+
+def _food_idx(gs): return next(i for i, c in enumerate(gs["players"][gs["turn"]].hand) if c.kind == "food")
+def _has_food(gs): return any(c.kind == "food" for c in gs["players"][gs["turn"]].hand)
+
+# ══════════════════════════════════════════════════════════════════
+#  引擎
+# ══════════════════════════════════════════════════════════════════
+@case("engine.build_deck", 2000)
+def _(n):
+    rng = random.Random(SEED)
+    t0 = time.perf_counter()
+    for _ in range(n): engine.build_deck(rng)
+    return time.perf_counter() - t0
+
+@case("engine.init_game", 2000)
+def _(n):
+    t0 = time.perf_counter()
+    for i in range(n): engine.init_game(["A", "B", "C"], "rounds", 5, seed=i)
+    return time.perf_counter() - t0
+
+@case("engine.action_draw", 2000)
+def _(n):
+    def prep(gs): gs["phase"] = "draw_screen"
+    return _timed(_states(n, prep=prep), engine.action_draw)
+
+@case("engine.skip_draw", 2000)
+def _(n):
+    def prep(gs): gs["phase"] = "draw_screen"
+    return _timed(_states(n, prep=prep), engine.skip_draw)
+
+@case("engine.action_place", 2000)
+def _(n): return _timed(_states(n, _has_food), lambda gs: engine.action_place(gs, _food_idx(gs)))
+
+@case("engine.action_discard", 2000)
+def _(n): return _timed(_states(n), lambda gs: engine.action_discard(gs, 0))
+
+@case("engine.action_pass", 2000)
+def _(n):
+    def prep(gs): gs["players"][gs["turn"]].hand.clear()
+    return _timed(_states(n, prep=prep), engine.action_pass)
+
+# 各效果取第一種牌量測；登錄表沒有的效果不列
+for _name, _code in (("draw2", next(iter(DRAWS), None)), ("steal", STEAL), ("swap", SWAP), ("drop", DROP), ("pause", PAUSE)):
+    if _code is None: continue
+    def _make(code):
+        return lambda n: _timed(_states(n, prep=_give(code)), lambda gs: engine.action_use_func(gs, 0))
+    case(f"engine.action_use_func.{_name}", 2000)(_make(_code))
+
+@case("engine.resolve_discard_hand", 2000)
+def _(n):
+    states = _states(n, prep=_give(DROP))
+    for gs in states: engine.action_use_func(gs, 0)
+    return _timed(states, lambda gs: engine.resolve_discard_hand(gs, (gs["turn"] + 1) % len(gs["players"])))
+
+@case("engine.resolve_pause", 2000)
+def _(n):
+    states = _states(n, prep=_give(PAUSE))
+    for gs in states: engine.action_use_func(gs, 0)
+    return _timed(states, lambda gs: engine.resolve_pause(gs, (gs["turn"] + 1) % len(gs["players"])))
+
+@case("engine.cancel_pending", 2000)
+def _(n):
+    states = _states(n, prep=_give(PAUSE))
+    for gs in states: engine.action_use_func(gs, 0)
+    return _timed(states, engine.cancel_pending)
+
+@case("engine.confirm_draw", 2000)
+def _(n):
+    states = _states(n, prep=_give(DRAWS[0]))
+    for gs in states: engine.action_use_func(gs, 0)
+    return _timed(states, engine.confirm_draw)
+
+@case("engine.ack_first_plate", 2000)
+def _(n):
+    def prep(gs): gs["phase"] = "alert_first_plate"
+    return _timed(_states(n, prep=prep, mode="first_plate"), engine.ack_first_plate)
+
+@case("engine.end_transition", 5000)
+def _(n):
+    def prep(gs): gs["showing_transition"] = True
+    return _timed(_states(n, prep=prep), engine.end_transition)
+
+@case("engine.check_end", 20000)
+def _(n):
+    states = _states(200)
+    t0 = time.perf_counter()
+    for i in range(n): engine.check_end(states[i % 200])
+    return time.perf_counter() - t0
+
+@case("engine.advance_turn", 2000)
+def _(n): return _timed(_states(n), engine.advance_turn)
+
+@case("engine.plate_score", 50000)
+def _(n):
+    players = [p for gs in _states(200) for p in gs["players"]]
+    k = len(players)
+    t0 = time.perf_counter()
+    for i in range(n): players[i % k].plate_score()
+    return time.perf_counter() - t0
+
+# ══════════════════════════════════════════════════════════════════
+#  畫面 HTML（不經 Streamlit 執行環境，st.markdown 只做最少的事）
+# ══════════════════════════════════════════════════════════════════
+def _app():
+    # 不在執行環境內，每次 st.* 都會警告 missing ScriptRunContext；關掉以免量到寫 log 的時間
+    import app
+    logging.getLogger("streamlit.runtime.scriptrunner_utils.script_run_context").disabled = True
+    return app
+
+@case("render.card_html", 20000)
+def _(n):
+    app, codes = _app(), range(len(engine.CATS))
+    t0 = time.perf_counter()
+    for i in range(n): app._card_html(i % len(codes), bool(i & 1), bool(i & 2))
+    return time.perf_counter() - t0
+
+@case("render.render_card", 100000)
+def _(n):
+    app = _app()
+    cards = [c for gs in _states(20) for p in gs["players"] for c in p.hand]
+    k = len(cards)
+    t0 = time.perf_counter()
+    for i in range(n): app.render_card(cards[i % k], bool(i & 1), bool(i & 2))
+    return time.perf_counter() - t0
+
+@case("render.render_ranking", 2000)
+def _(n):
+    import winprob
+    app, states = _app(), _states(20, players=4)
+    for gs in states:                           # 勝率快取先算滿，只量排名 HTML 本身
+        while winprob.estimate(gs, budget=1.0) is None: pass
+    t0 = time.perf_counter()
+    for i in range(n):
+        gs = states[i % 20]
+        app.render_ranking(gs["players"], gs["turn"], gs)
+    return time.perf_counter() - t0
+
+# ══════════════════════════════════════════════════════════════════
+#  整局模擬（簡單電腦，每種模式 × 2–4 人）
+# ══════════════════════════════════════════════════════════════════
+def _game_case(mode, players):
+    # 每遍都玩同樣 GAMES 局；回傳值除以 GAMES，讓「每次操作」仍是一局
+    def run(n):
+        import bots
+        t0 = time.perf_counter()
+        for _ in range(n):
+            for g in range(GAMES):
+                gs = engine.init_game([f"P{i+1}" for i in range(players)], mode, DEFAULT_MODE_VAL[mode], seed=SEED + g)
+                bots.run_bots(gs, {s: bots.make_bot("greedy", random.Random(g)) for s in range(players)})
+        return (time.perf_counter() - t0) / GAMES
+    return run
+
+for _mode in MODES:
+    for _n in (2, 3, 4):
+        case(f"game.{_mode}.{_n}p", 10, tolerance=0.5)(_game_case(_mode, _n))
+
+# ══════════════════════════════════════════════════════════════════
+#  執行 / 存基準 / 比對
+# ══════════════════════════════════════════════════════════════════
+def run(patterns=(), repeat=REPEAT, scale=1.0, out=print):
+    """回傳 (各項每次操作微秒, 各項離散程度)。"""
+    results, spread = {}, {}
+    for name, (fn, number) in CASES.items():
+        if patterns and not any(p in name for p in patterns): continue
+        number = max(1, int(number * scale))
+        times = [fn(number) for _ in range(repeat)]
+        results[name], spread[name] = min(times) / number * 1e6, statistics.median(times) / min(times) - 1
+        out(f"  {name:<36} {results[name]:>12,.2f} µs   ±{spread[name]:5.1%}")
+    return results, spread
+
+def meta():
+    # 有未提交的修改時標 -dirty（基準常與程式改動一起提交，量到的是 HEAD 加上工作區）
+    try: rev = subprocess.run(["git", "describe", "--always", "--dirty"], capture_output=True, text=True).stdout.strip()
+    except OSError: rev = ""
+    return dict(python=platform.python_version(), machine=platform.machine(), platform=platform.platform(),
+                commit=rev, seed=SEED, games=GAMES, repeat=REPEAT, unit="us/op")
+
+def compare(results, baseline, tolerance, spread=None):
+    """回傳變慢的項目清單；並印出每項與基準的比例。
+    各項容忍度取 tolerance、該項的 TOLERANCE 與基準量到的離散程度 spread 三者最大。"""
+    slower = []
+    for name, us in results.items():
+        base = baseline.get(name)
+        if base is None: print(f"  {name:<36} {us:>12,.2f} µs   （基準沒有此項）"); continue
+        ratio, tol = us / base, max(tolerance, TOLERANCE.get(name, 0.0), (spread or {}).get(name, 0.0))
+        flag = "⚠️ 變慢" if ratio > 1 + tol else "✅ 變快" if ratio < 1 - tol else ""
+        if ratio > 1 + tol: slower.append(name)
+        print(f"  {name:<36} {us:>12,.2f} µs   基準 {base:>12,.2f}   ×{ratio:5.2f} {flag}")
+    return slower
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 效能基準")
+    ap.add_argument("-k", action="append", default=[], metavar="SUBSTR", help="只跑名稱含此字串的項目（可重複）")
+    ap.add_argument("--save", metavar="JSON", help="把結果存成基準")
+    ap.add_argument("--compare", metavar="JSON", help="與基準比對，變慢超過容忍度時結束碼為 1")
+    ap.add_argument("--tolerance", type=float, default=0.25, help="容忍的變慢比例（預設 0.25）")
+    ap.add_argument("--repeat", type=int, default=REPEAT)
+    ap.add_argument("--scale", type=float, default=1.0, help="每項次數倍率（快速檢查可用 0.1）")
+    ap.add_argument("--list", action="store_true")
+    args = ap.parse_args(argv)
+    if args.list:
+        print("\n".join(CASES)); return 0
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as f: baseline = json.load(f)
+        results, _ = run(args.k, args.repeat, args.scale, out=lambda *_: None)
+        slower = compare(results, baseline["results"], args.tolerance, baseline.get("spread"))
+        print(f"{len(slower)} 項變慢超過 {args.tolerance:.0%}" + (f"：{', '.join(slower)}" if slower else ""))
+        return 1 if slower else 0
+    results, spread = run(args.k, args.repeat, args.scale)
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as f:
+            json.dump(dict(meta=meta(), results=results, spread=spread), f, ensure_ascii=False, indent=1, sort_keys=True)
+        print(f"已存基準：{args.save}（{len(results)} 項）")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
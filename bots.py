@@ -0,0 +1,165 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 電腦玩家
+
+每個電腦玩家實作 choose(gs, seat) → engine.legal_moves 之一，只看該座位看得到的資訊
+（自己的手牌、所有餐盤、各人手牌張數、牌堆張數）。BOTS 是設定頁可選的電腦玩家。
+
+    python bots.py --arena 2000              # 電腦玩家對戰勝率與每步決策時間
+    python bots.py --arena 500 --bots heuristic greedy greedy
+    python bots.py --arena 100 --bots mcts greedy --budget 0.2
+"""
+import argparse
+import random
+import sys
+import time
+
+import engine
+from mcts import MCTSBot, chase_table
+from simulate import DEFAULT_MODE_VAL, DRAWS, DROP, MODES, NF, PAUSE, SIM_CODE, STEAL, SWAP, delta_table
+
+def _counts(p):
+    cnt = [0] * NF
+    for c in p.plate: cnt[c.code] += 1
+    return tuple(cnt)
+
+class RandomBot:
+    name, label = "random", "🎲 隨機"
+
+    def __init__(self, rng=None): self.rng = rng or random.Random()
+
+    def choose(self, gs, seat):
+        return self.rng.choice(engine.legal_moves(gs))
+
+class HeuristicBot:
+    """放牌看分數變化（含均衡加成與第 3 張扣分），缺哪類補哪類；功能牌依局勢使用。"""
+    name, label = "heuristic", "🤖 電腦"
+
+    def __init__(self, rng=None): self.rng = rng or random.Random()
+
+    def food_values(self, cnt): return chase_table(cnt)
+
+    def choose(self, gs, seat):
+        legal = engine.legal_moves(gs)
+        if len(legal) == 1: return legal[0]
+        phase, players = gs["phase"], gs["players"]
+        scores = [p.plate_score() for p in players]
+        if phase == "pending_discard_hand":
+            # 丟最多手牌、分數最高的對手；沒有對手可丟才丟自己
+            cand = [m for m in legal if m[0] == "t" and m[1] != seat] or [m for m in legal if m[0] == "t"]
+            return max(cand, key=lambda m: (len(players[m[1]].hand), scores[m[1]])) if cand else ("c",)
+        if phase == "pending_pause":
+            return max(legal, key=lambda m: (not players[m[1]].skip_next, scores[m[1]]))
+        return self.act(gs, seat, legal, scores)
+
+    def act(self, gs, seat, legal, scores):
+        players, me = gs["players"], gs["players"][seat]
+        hand, n = me.hand, len(players)
+        vals = self.food_values(_counts(me))
+        places = [(vals[hand[i].code], i) for op, i in legal if op == "p"]
+        best, best_i = max(places) if places else (None, None)
+        funcs = {SIM_CODE[hand[i].code]: i for op, i in legal if op == "f"}
+        draw = next((k for k in DRAWS if k in funcs), None)
+        others = [i for i in range(n) if i != seat]
+        leader = max(scores[i] for i in others)
+        opp_cards = sum(len(players[i].hand) for i in others)
+
+        if best is not None and best >= engine.BALANCED_BONUS: return ("p", best_i)     # 完成均衡
+        if draw is not None and len(gs["deck"]) >= 2 and (best is None or best <= 3): return ("f", funcs[draw])
+        if PAUSE in funcs and leader >= scores[seat] and any(not players[i].skip_next for i in others):
+            return ("f", funcs[PAUSE])
+        if best is not None and best > 0: return ("p", best_i)
+        if STEAL in funcs and opp_cards: return ("f", funcs[STEAL])
+        if DROP in funcs and opp_cards: return ("f", funcs[DROP])
+        # 交換：拿到上家的手牌（張數多於自己打出後的手牌才划算）
+        if SWAP in funcs and len(players[(seat - 1) % n].hand) >= len(hand): return ("f", funcs[SWAP])
+        if PAUSE in funcs and any(not players[i].skip_next for i in others): return ("f", funcs[PAUSE])
+        if draw is not None and gs["deck"]: return ("f", funcs[draw])
+        # 丟最沒用的牌：分數變化最差的食物，或用不上的功能牌
+        junk = [(vals[c.code] if c.kind == "food" else 0, i) for i, c in enumerate(hand)]
+        if best is not None and best == max(v for v, _ in junk) and best >= 0: return ("p", best_i)
+        return ("x", min(junk)[1])
+
+class GreedyBot(HeuristicBot):
+    """基準：只看放牌的分數變化，功能牌照 simulate.GreedyPolicy 的順序。"""
+    name, label = "greedy", "🙂 簡單電腦"
+
+    def food_values(self, cnt):
+        return delta_table(cnt, engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY)
+
+    def act(self, gs, seat, legal, scores):
+        hand, players = gs["players"][seat].hand, gs["players"]
+        vals = self.food_values(_counts(gs["players"][seat]))
+        funcs = {SIM_CODE[hand[i].code]: i for op, i in legal if op == "f"}
+        places = [(vals[hand[i].code], i) for op, i in legal if op == "p"]
+        for k in DRAWS:
+            if k in funcs and gs["deck"]: return ("f", funcs[k])
+        if places and max(places)[0] > 0: return ("p", max(places)[1])
+        for k in (STEAL, PAUSE, DROP):
+            if k in funcs: return ("f", funcs[k])
+        if SWAP in funcs and len(players[(seat - 1) % len(players)].hand) >= len(hand): return ("f", funcs[SWAP])
+        return ("x", min(places)[1] if places else 0)
+
+BOTS = {b.name: b for b in (MCTSBot, HeuristicBot, GreedyBot, RandomBot)}
+
+def make_bot(name, rng=None):
+    return BOTS[name](rng)
+
+def run_bots(gs, bots, on_move=None) -> int:
+    """輪到電腦玩家時一路代打，直到輪到真人或終局；bots 為 {座位: 電腦玩家}，回傳走了幾步。"""
+    moves = 0
+    while not gs["over"] and gs["turn"] in bots:
+        move = bots[gs["turn"]].choose(gs, gs["turn"])
+        hint = engine.apply_move(gs, move)
+        if on_move: on_move(move, hint)
+        moves += 1
+    return moves
+
+# ══════════════════════════════════════════════════════════════════
+#  --arena：電腦玩家對戰（輪換座位），勝率與決策時間
+# ══════════════════════════════════════════════════════════════════
+def arena(games, names, mode="rounds", mode_val=None, seed=0, budget=None):
+    n = len(names)
+    mode_val = DEFAULT_MODE_VAL[mode] if mode_val is None else mode_val
+    wins, totals, think, decisions = [0.0] * n, [0] * n, [0.0] * n, [0] * n
+    for g in range(games):
+        rot = g % n                             # 座位輪換，抵銷先手優勢
+        order = [(i + rot) % n for i in range(n)]
+        rng = random.Random(seed * 7919 + g)
+        gs = engine.init_game([f"P{i+1}" for i in range(n)], mode, mode_val, seed=seed + g)
+        bots = {s: make_bot(names[order[s]], rng) for s in range(n)}
+        for b in bots.values():
+            if budget is not None and hasattr(b, "budget"): b.budget = budget
+        while not gs["over"]:
+            s = gs["turn"]
+            t0 = time.perf_counter()
+            move = bots[s].choose(gs, s)
+            think[order[s]] += time.perf_counter() - t0; decisions[order[s]] += 1
+            engine.apply_move(gs, move)
+        scores = [p.plate_score() for p in gs["players"]]
+        top = max(scores)
+        winners = [s for s in range(n) if scores[s] == top]
+        for s in range(n):
+            totals[order[s]] += scores[s]
+            if s in winners: wins[order[s]] += 1 / len(winners)
+    return [dict(bot=names[i], win=wins[i] / games, avg=totals[i] / games, ms=think[i] / max(decisions[i], 1) * 1e3)
+            for i in range(n)]
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 電腦玩家對戰")
+    ap.add_argument("--arena", type=int, default=1000, metavar="GAMES")
+    ap.add_argument("--bots", nargs="+", default=["heuristic", "greedy"], choices=list(BOTS))
+    ap.add_argument("--mode", choices=MODES, default="rounds")
+    ap.add_argument("--mode-val", type=int)
+    ap.add_argument("--budget", type=float, help="mcts 每步思考秒數（預設 0.2）")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    t0 = time.perf_counter()
+    rows = arena(args.arena, args.bots, args.mode, args.mode_val, args.seed, args.budget)
+    print(f"{args.arena} 局 {args.mode}，{len(args.bots)} 人（座位輪換），{time.perf_counter() - t0:.1f} 秒")
+    for i, r in enumerate(rows):
+        print(f"  座 {i+1} {r['bot']:<10} 勝率 {r['win']:6.1%}  平均 {r['avg']:5.1f} 分  每步 {r['ms']:.3f} ms")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,231 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 遊戲狀態二進位編碼
+
+把 init_game 產生的 gs 壓成幾百位元組的 bytes，供換人時存檔（engine 的 gs["checkpoint"]）：
+每張牌以 1 位元組的 cid 表示（cid 依 build_deck 順序，由標頭的每類張數換回類別），
+列舉欄位（模式、階段、訊息類型、結束代碼）各 1 位元組，對局紀錄每筆 1~3 位元組。
+標頭帶卡牌登錄表（cards.json）的雜湊，登錄表改過後舊資料會以 CodecError 拒絕，而不是把 cid 換成別的牌。
+
+亂數狀態預設不存（約 2.5 KB）：還原後由 seed 與紀錄長度重新推導亂數流，
+重播依紀錄中的亂數結果，不受影響；需要逐位元延續時傳 with_rng=True。
+
+    python codec.py --check 300
+"""
+import random
+import struct
+import sys
+import time
+import zlib
+from array import array
+
+import engine
+from engine import Card, Player, P_COLORS
+
+MAGIC, VERSION = b"SI", 3
+
+MODES     = ("rounds", "allcards", "score", "first_plate")
+PHASES    = ("draw_screen", "action", "pending_discard_hand", "pending_pause", "confirm_draw", "alert_first_plate", "over")
+MSG_TYPES = ("info", "success", "warning", "error")
+RULESETS  = tuple(engine.RULESETS)
+END_CODES = (None, "countdown", "last_round", "deck_empty", "rounds", "score", "exhausted")
+LOG_ARGC  = {"d": 0, "s": 0, "p": 1, "x": 1, "n": 0, "f": 1, "t": 1, "z": 1, "c": 0, "k": 0, "a": 0, "e": 0, "r": 2}
+
+F_OVER, F_LAST_ROUND, F_TRANSITION, F_SEED, F_COUNTDOWN, F_RNG = (1 << i for i in range(6))
+
+# magic, 版本, 旗標, 人數, 模式, mode_val, turn, phase, last_starter, countdown, round_count,
+# pending_hand_idx, transition_to, last_drawn_card, end_code, msg_type, 每類食物張數, 每種功能牌張數, seed, 規則組,
+# 登錄表雜湊
+HEAD    = struct.Struct("<2sBBBBHBBbhHbBbBBBBQBI")
+HEAD_V2 = struct.Struct("<2sBBBBHBBbhHbBbBBBBQB")    # 第 2 版沒有登錄表雜湊，玩家名稱長度 1 位元組
+HEAD_V1 = struct.Struct("<2sBBBBHBBbhHbBbBBBBQ")     # 第 1 版另外沒有規則組（皆為 full）
+HEADS   = {1: HEAD_V1, 2: HEAD_V2, VERSION: HEAD}
+U8, U16, U32 = struct.Struct("<B"), struct.Struct("<H"), struct.Struct("<I")
+
+# 類別編號 → (種類, 名稱) 的雜湊；card_table 只以張數為鍵，靠這個確認 cid 指的是同一批牌
+CARDS_HASH = zlib.crc32("\n".join(f"{k}:{c}" for k, c in zip(engine.KINDS, engine.CATS)).encode("utf-8"))
+
+class CodecError(ValueError):
+    pass
+
+# cid → 共用的 Card（Card 不可變，解碼時直接共用同一批物件）
+_TABLES = {}
+def card_table(food_per_cat, func_per_type):
+    key = (food_per_cat, func_per_type)
+    if key not in _TABLES:
+        cards, cid = [], 0
+        for code, kind in enumerate(engine.KINDS):
+            for _ in range(food_per_cat if kind == "food" else func_per_type):
+                cards.append(Card.from_code(code, cid)); cid += 1
+        _TABLES[key] = tuple(cards)
+    return _TABLES[key]
+
+def _cids(cards): return bytes([c.cid for c in cards])
+def _str(s, fmt=U16):
+    b = s.encode("utf-8")
+    if len(b) >= 1 << 8 * fmt.size: raise CodecError(f"字串過長（{len(b):,} 位元組）：{s[:20]}…")
+    return fmt.pack(len(b)) + b
+
+# ══════════════════════════════════════════════════════════════════
+#  編碼
+# ══════════════════════════════════════════════════════════════════
+def encode(gs, with_rng=False) -> bytes:
+    # 超出欄位範圍（倒數、回合數、mode_val、索引…）時 struct / bytes 會拋出各自的例外，統一轉成 CodecError
+    try:
+        return _encode(gs, with_rng)
+    except CodecError:
+        raise
+    except (struct.error, ValueError, OverflowError) as e:
+        raise CodecError(f"狀態欄位超出可編碼範圍：{e}") from e
+
+def _encode(gs, with_rng):
+    seed, cd = gs.get("seed"), gs.get("countdown_turns")
+    flags = ((F_OVER if gs["over"] else 0) | (F_LAST_ROUND if gs["last_round"] else 0)
+             | (F_TRANSITION if gs["showing_transition"] else 0) | (F_SEED if seed is not None else 0)
+             | (F_COUNTDOWN if cd is not None else 0) | (F_RNG if with_rng else 0))
+    if seed is not None and not 0 <= seed < 1 << 64: raise CodecError(f"seed 超出 64 位元：{seed}")
+    players = gs["players"]
+    out = [HEAD.pack(
+        MAGIC, VERSION, flags, len(players), MODES.index(gs["mode"]), gs["mode_val"], gs["turn"],
+        PHASES.index(gs["phase"]), -1 if gs["last_starter"] is None else gs["last_starter"], cd or 0,
+        gs["round_count"], -1 if gs["pending_hand_idx"] is None else gs["pending_hand_idx"], gs["transition_to"],
+        -1 if gs["last_drawn_card"] is None else gs["last_drawn_card"], END_CODES.index(gs["end_code"]),
+        MSG_TYPES.index(gs["msg_type"]), engine.FOOD_PER_CAT, engine.FUNC_PER_TYPE, seed or 0,
+        RULESETS.index(gs.get("ruleset", "full")), CARDS_HASH)]
+    for p in players:
+        out += [_str(p.name), bytes((P_COLORS.index(p.color), p.skip_next, len(p.hand))), _cids(p.hand),
+                U8.pack(len(p.plate)), _cids(p.plate)]
+    out += [U8.pack(len(gs["deck"])), _cids(gs["deck"]), U8.pack(len(gs["discard"])), _cids(gs["discard"]),
+            _str(gs["msg"]), _str(gs["alert_msg"]), U8.pack(len(gs["events"]))]
+    out += [_str(ev) for ev in gs["events"]]
+    log = gs["log"]
+    out.append(U16.pack(len(log)))
+    out.append(bytes([b for e in log for b in (ord(e[0]), *e[1:])]))
+    if with_rng:
+        ver, words, gauss = gs["rng"].getstate()
+        out += [U8.pack(ver), array("I", words).tobytes(), struct.pack("<?d", gauss is not None, gauss or 0.0)]
+    return b"".join(out)
+
+# ══════════════════════════════════════════════════════════════════
+#  解碼
+# ══════════════════════════════════════════════════════════════════
+def decode(data: bytes) -> dict:
+    try:
+        return _decode(memoryview(data))
+    except (struct.error, IndexError, KeyError) as e:
+        raise CodecError(f"狀態資料毀損：{e}") from e
+
+def _decode(mv):
+    magic, ver = bytes(mv[:2]), mv[2]
+    if magic != MAGIC: raise CodecError("不是遊戲狀態資料")
+    if ver not in HEADS: raise CodecError(f"不支援的版本 {ver}")
+    head = HEADS[ver]
+    (magic, ver, flags, n, mode, mode_val, turn, phase, last_starter, cd, round_count, pending, trans_to,
+     last_drawn, end_code, msg_type, per_cat, per_type, seed, *extra) = head.unpack_from(mv, 0)
+    if ver == VERSION and extra[1] != CARDS_HASH: raise CodecError("卡牌登錄表已變更，無法還原此狀態")
+    ruleset = RULESETS[extra[0]] if extra else "full"
+    table, pos = card_table(per_cat, per_type), head.size
+
+    def cards():
+        nonlocal pos
+        k = mv[pos]; pos += 1
+        got = [table[b] for b in mv[pos:pos + k]]; pos += k
+        return got
+
+    def text(fmt=U16):
+        nonlocal pos
+        k = fmt.unpack_from(mv, pos)[0]; pos += fmt.size
+        s = str(mv[pos:pos + k], "utf-8"); pos += k
+        return s
+
+    players = []
+    for _ in range(n):
+        name = text(U16 if ver == VERSION else U8)
+        color, skip = mv[pos], mv[pos + 1]; pos += 2
+        hand = cards()
+        players.append(Player(name, P_COLORS[color], hand, cards(), bool(skip)))
+    deck, discard = cards(), cards()
+    msg, alert = text(), text()
+    n_ev = mv[pos]; pos += 1
+    events = [text() for _ in range(n_ev)]
+    n_log = U16.unpack_from(mv, pos)[0]; pos += 2
+    log = []
+    for _ in range(n_log):
+        op = chr(mv[pos]); k = LOG_ARGC[op]
+        log.append((op, *mv[pos + 1:pos + 1 + k])); pos += 1 + k
+
+    seed = seed if flags & F_SEED else None
+    if flags & F_RNG:
+        words = array("I"); words.frombytes(mv[pos + 1:pos + 2501])
+        rver, words = mv[pos], tuple(words); pos += 2501
+        has_g, g = struct.unpack_from("<?d", mv, pos); pos += 9
+        rng = random.Random(); rng.setstate((rver, words, g if has_g else None))
+    else:
+        rng = random.Random(f"{seed}/{n_log}")
+    if pos != len(mv): raise CodecError(f"多出 {len(mv) - pos} 位元組")
+
+    return dict(
+        players=players, deck=deck, discard=discard,
+        turn=turn, phase=PHASES[phase], over=bool(flags & F_OVER),
+        mode=MODES[mode], mode_val=mode_val, ruleset=ruleset,
+        last_round=bool(flags & F_LAST_ROUND), last_starter=None if last_starter < 0 else last_starter,
+        countdown_turns=cd if flags & F_COUNTDOWN else None,
+        msg=msg, msg_type=MSG_TYPES[msg_type], events=events, round_count=round_count,
+        pending_hand_idx=None if pending < 0 else pending, showing_transition=bool(flags & F_TRANSITION),
+        transition_to=trans_to, last_drawn_card=None if last_drawn < 0 else last_drawn, alert_msg=alert,
+        end_code=END_CODES[end_code], rng=rng, seed=seed, log=log, checkpoint=None,
+    )
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：隨機對局每步編解碼比對，並量測大小與速度
+# ══════════════════════════════════════════════════════════════════
+def check(games, n=3, seed=0):
+    import replay
+    modes = MODES
+    vals  = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}
+    sizes, t_enc, t_dec, steps = [], 0.0, 0.0, 0
+    for g in range(games):
+        mode = modes[g % len(modes)]
+        gs = engine.init_game([f"玩家{i+1}" for i in range(n)], mode, vals[mode], seed=seed + g, ruleset=RULESETS[g % len(RULESETS)])
+        rng = random.Random(~(seed + g))
+        while True:
+            t0 = time.perf_counter(); data = encode(gs)
+            t1 = time.perf_counter(); back = decode(data)
+            t_enc += t1 - t0; t_dec += time.perf_counter() - t1; steps += 1
+            sizes.append(len(data))
+            if replay.state_key(back) != replay.state_key(gs) or back["log"] != gs["log"] or back["events"] != gs["events"] \
+                    or back["ruleset"] != gs["ruleset"] \
+                    or [p.plate_score() for p in back["players"]] != [p.plate_score() for p in gs["players"]]:
+                raise AssertionError(f"game {seed + g} step {steps}: 編解碼不一致")
+            if gs["over"]: break
+            replay.random_step(gs, rng)
+        full = decode(encode(gs, with_rng=True))
+        if full["rng"].getstate() != gs["rng"].getstate(): raise AssertionError(f"game {seed + g}: 亂數狀態不一致")
+    # 名稱超過 255 位元組仍可存；超過長度欄位上限、登錄表雜湊不符、數值欄位超出範圍都以 CodecError 拒絕
+    gs = engine.init_game(["糾" * 100, "玩家2"], "rounds", 5, seed=seed)
+    if decode(encode(gs))["players"][0].name != "糾" * 100: raise AssertionError("長名稱編解碼不一致")
+    data = encode(gs)
+    stale = data[:HEAD.size - 4] + U32.pack(CARDS_HASH ^ 1) + data[HEAD.size:]
+    gs["players"][0].name = "x" * (1 << 16)
+    over = engine.init_game(["玩家1", "玩家2"], "first_plate", 1, seed=seed)
+    over["countdown_turns"] = 1 << 15
+    for bad in (lambda: encode(gs), lambda: decode(stale), lambda: encode(over)):
+        try: bad()
+        except CodecError: continue
+        raise AssertionError("應以 CodecError 拒絕")
+    return steps, sum(sizes) / len(sizes), max(sizes), t_enc / steps * 1e6, t_dec / steps * 1e6
+
+def main(argv=None):
+    import argparse
+    ap = argparse.ArgumentParser(description="最強糾察員 狀態編碼")
+    ap.add_argument("--check", type=int, default=300, metavar="GAMES")
+    ap.add_argument("-p", "--players", type=int, default=3, choices=(2, 3, 4))
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    steps, avg, mx, enc, dec = check(args.check, args.players, args.seed)
+    print(f"✅ {args.check} 局 / {steps:,} 個狀態編解碼一致；平均 {avg:,.0f} B（最大 {mx:,} B），"
+          f"編碼 {enc:.1f} µs、解碼 {dec:.1f} µs")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,199 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 行動差異（推送協定）
+
+每個行動前後比對牌的位置與畫面欄位，產生最小差異清單，前端照著修補畫面即可，不必重送整頁：
+  ["m", cid, 來源, 目的]   牌移動；區域 d 牌堆、x 棄牌堆、h0..h3 手牌、p0..p3 餐盤，依目的區順序追加
+  ["s", 欄位, 值]          回合欄位改變（turn、phase …）；msg 等私人欄位只送輪到的人（終局後全體）
+  ["P", 座位, 欄位, 值]    玩家欄位改變（score、skip、balanced）
+  ["e", 文字]              新事件（通知，不屬於畫面狀態）
+for_seat() 把該座位看不到的移動（牌堆與他人手牌之間）遮成 None；board() / apply() 是前端的畫面模型。
+
+    python delta.py --check 300    # 隨機對局每步以差異修補各座位畫面，與完整畫面比對
+    python delta.py --bench 5      # 每步位元組：Streamlit 整頁重跑 vs. 差異協定（2 人與 4 人）
+"""
+import argparse
+import json
+import random
+import sys
+from typing import List
+
+import engine
+
+FIELDS  = ("turn", "phase", "over", "end_code", "round_count", "countdown_turns", "last_round")
+PRIVATE = ("msg", "msg_type", "last_drawn_card")     # 可能透露抽到的牌，只給輪到的人
+HIDDEN  = ("", "info", None)
+PFIELDS = ("score", "skip", "balanced")
+
+# ══════════════════════════════════════════════════════════════════
+#  產生差異
+# ══════════════════════════════════════════════════════════════════
+def zones(gs):
+    # 區域名 → 牌（保留順序）
+    z = {"d": gs["deck"], "x": gs["discard"]}
+    for i, p in enumerate(gs["players"]): z[f"h{i}"], z[f"p{i}"] = p.hand, p.plate
+    return z
+
+def _private(gs, seat, fields):
+    return fields if seat == gs["turn"] or gs["over"] else HIDDEN
+
+def snapshot(gs):
+    loc = {c.cid: name for name, cards in zones(gs).items() for c in cards}
+    priv = tuple(gs[k] for k in PRIVATE)
+    return (loc, tuple(gs[k] for k in FIELDS), [_private(gs, s, priv) for s in range(len(gs["players"]))],
+            tuple((p.plate_score(), p.skip_next, p.is_balanced()) for p in gs["players"]), list(gs["events"]))
+
+def diff(before, gs) -> List[list]:
+    loc0, f0, priv0, p0, ev0 = before
+    ops = [["m", c.cid, loc0[c.cid], name] for name, cards in zones(gs).items() for c in cards if loc0[c.cid] != name]
+    ops += [["s", k, v] for k, a, v in zip(FIELDS, f0, (gs[k] for k in FIELDS)) if a != v]
+    priv = tuple(gs[k] for k in PRIVATE)
+    for s, old in enumerate(priv0):
+        # 私人欄位附上座位，for_seat 只留給該座位
+        ops += [["s", k, v, s] for k, a, v in zip(PRIVATE, old, _private(gs, s, priv)) if a != v]
+    for i, (a, p) in enumerate(zip(p0, gs["players"])):
+        ops += [["P", i, k, v] for k, x, v in zip(PFIELDS, a, (p.plate_score(), p.skip_next, p.is_balanced())) if x != v]
+    ev = gs["events"]
+    new = ev[len(ev0):] if ev[:len(ev0)] == ev0 else ev         # 事件被清空過（換人）就全部算新的
+    return ops + [["e", t] for t in new]
+
+def track(gs, move):
+    """套用一個行動 (op, *args)，回傳 (UI 提示, 差異)。"""
+    before = snapshot(gs)
+    hint = engine.apply_move(gs, move)
+    return hint, diff(before, gs)
+
+def _visible(zone, seat): return zone[0] in "xp" or zone == f"h{seat}"
+
+def for_seat(ops, seat):
+    out = []
+    for op in ops:
+        if op[0] == "m" and not (_visible(op[2], seat) or _visible(op[3], seat)): op = ["m", None, op[2], op[3]]
+        elif op[0] == "s" and len(op) == 4:
+            if op[3] != seat: continue
+            op = op[:3]
+        out.append(op)
+    return out
+
+# ══════════════════════════════════════════════════════════════════
+#  前端畫面模型：看得到的區域是 cid 清單，看不到的只有張數
+# ══════════════════════════════════════════════════════════════════
+def board(gs, seat):
+    return {
+        "zones": {name: [c.cid for c in cards] if _visible(name, seat) else len(cards) for name, cards in zones(gs).items()},
+        "f": {**{k: gs[k] for k in FIELDS}, **dict(zip(PRIVATE, _private(gs, seat, tuple(gs[k] for k in PRIVATE))))},
+        "players": [{"name": p.name, "color": p.color["header"], "score": p.plate_score(), "skip": p.skip_next,
+                     "balanced": p.is_balanced()} for p in gs["players"]],
+    }
+
+def apply(b, ops):
+    z = b["zones"]
+    for op in ops:
+        kind = op[0]
+        if kind == "m":
+            _, cid, src, dst = op
+            if isinstance(z[src], list): z[src].remove(cid)
+            else: z[src] -= 1
+            if isinstance(z[dst], list): z[dst].append(cid)
+            else: z[dst] += 1
+        elif kind == "s": b["f"][op[1]] = op[2]
+        elif kind == "P": b["players"][op[1]][op[2]] = op[3]
+    return b
+
+def dumps(ops): return json.dumps(ops, ensure_ascii=False, separators=(",", ":"))
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：每步以差異修補各座位畫面，與完整畫面比對
+# ══════════════════════════════════════════════════════════════════
+def check(games, n=3, seed=0):
+    import replay
+    modes = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}
+    moves, sizes = 0, []
+    for g in range(games):
+        mode = list(modes)[g % len(modes)]
+        gs = engine.init_game([f"P{i+1}" for i in range(n)], mode, modes[mode], seed=seed + g)
+        rng = random.Random(~(seed + g))
+        boards, events = [board(gs, s) for s in range(n)], []
+        while not gs["over"]:
+            k = len(gs["log"])
+            before = snapshot(gs)
+            replay.random_step(gs, rng)
+            ops = diff(before, gs)
+            if not ops and gs["log"][k][0] not in "ce": raise AssertionError(f"game {seed + g}: {gs['log'][k]} 沒有產生差異")
+            for s in range(n):
+                mine = for_seat(ops, s)
+                apply(boards[s], mine)
+                if boards[s] != board(gs, s): raise AssertionError(f"game {seed + g} 第 {moves} 步 座位 {s}: 修補後畫面不同")
+                sizes.append(len(dumps(mine).encode()))
+            events += [op[1] for op in ops if op[0] == "e"]
+            moves += 1
+        if events != gs["events"]: raise AssertionError(f"game {seed + g}: 事件通知不一致")
+    return moves, sum(sizes) / len(sizes)
+
+# ══════════════════════════════════════════════════════════════════
+#  --bench：Streamlit 整頁重跑實際送出的 ForwardMsg 位元組 vs. 差異協定
+# ══════════════════════════════════════════════════════════════════
+def _count_streamlit_bytes():
+    # 所有元素訊息都經過 ScriptRunContext.enqueue
+    from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+    box, orig = [0], ScriptRunContext.enqueue
+    def counting(self, msg):
+        orig(self, msg)
+        box[0] += msg.ByteSize()
+    ScriptRunContext.enqueue = counting
+    return box
+
+def bench(games, n, seed=0, app=None):
+    import os
+    from streamlit.testing.v1 import AppTest
+    from pagebench import APP, click
+    app = app or APP
+    os.environ.setdefault("INSPECTOR_STORE", "none")
+    box = _count_streamlit_bytes()
+    rng = random.Random(seed)
+    st_bytes, diff_bytes, moves = 0, 0, 0
+    for _ in range(games):
+        at = AppTest.from_file(app, default_timeout=60).run()
+        at.slider(key="setup_num").set_value(n).run()
+        next(b for b in at.button if "開始遊戲" in b.label).click().run()
+        gs = at.session_state.gs
+        while not gs["over"]:
+            legal = engine.legal_moves(gs)
+            move = rng.choice(legal)
+            # 只計行動那一下（選牌在實際前端是片段重跑，不算進來，對整頁重跑有利）
+            if move[0] in "pfx" and at.session_state.sel != move[1]:
+                at.button(key=f"hsel_{move[1]}").click().run()
+            k, before = len(gs["log"]), snapshot(gs)
+            b0 = box[0]
+            click(at, move)
+            gs = at.session_state.gs
+            if tuple(gs["log"][k]) != tuple(move): raise AssertionError(f"點擊 {move} 卻記錄 {gs['log'][k]}")
+            st_bytes += box[0] - b0
+            ops = diff(before, gs)
+            # 差異協定：同桌每個座位各送一份（遮蔽後）；整頁重跑只送給這一台傳遞中的裝置
+            diff_bytes += sum(len(dumps(for_seat(ops, s)).encode()) for s in range(n))
+            moves += 1
+    return dict(moves=moves, st=st_bytes / moves, diff=diff_bytes / moves, diff_seat=diff_bytes / moves / n)
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 行動差異協定")
+    ap.add_argument("--check", type=int, metavar="GAMES")
+    ap.add_argument("--bench", type=int, metavar="GAMES", help="以 AppTest 實際點擊 GAMES 局，比較每步傳輸量")
+    ap.add_argument("--seed", type=int, default=0)
+    args = ap.parse_args(argv)
+    if args.check is None and args.bench is None: args.check = 300
+    if args.check:
+        for n in (2, 3, 4):
+            moves, avg = check(args.check, n, args.seed)
+            print(f"✅ {n} 人 {args.check} 局 / {moves:,} 步：各座位以差異修補後與完整畫面一致，每座位每步平均 {avg:.0f} B")
+    if args.bench:
+        import logging
+        logging.getLogger("streamlit").setLevel(logging.ERROR)
+        for n in (2, 4):
+            r = bench(args.bench, n, args.seed)
+            print(f"{n} 人 {r['moves']:,} 步：Streamlit 整頁重跑每步 {r['st']:,.0f} B ／ 差異協定每步 {r['diff']:,.0f} B"
+                  f"（每座位 {r['diff_seat']:,.0f} B），約 {r['st'] / r['diff']:,.0f} 倍")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 殘局求解（期望極大化 expectimax）
+
+全牌模式牌堆快抽完、或最先一盤的倒數開始後，剩下的局面樹夠小，可以精算：
+  行動節點：輪到的人選「自己期望最終分數最高」的行動（同分看與最高對手的分差）
+  機率節點：抽牌（牌堆視為多重集合，依各類張數）、偷1張 / 丟1張 的隨機結果
+狀態只記類別張數（手牌、餐盤、牌堆）、輪到誰、暫停旗標、倒數等，以此為轉置表鍵，
+轉置表以 LRU 淘汰、上限 TT_SIZE 筆，跨次呼叫共用（各求解器一把鎖，多個工作階段不會同時改同一張表）。
+看不到的對手手牌由提示端抽樣後平均；提示結果（含算不完的 None）依局面快取，同一局面重跑不再重算。
+
+    python endgame.py --check 40        # 隨機殘局：求解值與依最佳策略的蒙地卡羅平均比對
+    python endgame.py --bench 40        # 每次求解的節點數、時間與轉置表命中率
+"""
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Dict, List, NamedTuple, Optional, Tuple
+
+import engine
+from simulate import DRAW_N, DRAWS, DROP, GROUPS, NF, PAUSE, PTS, STEAL, SWAP, sim_codes
+
+TT_SIZE       = 200_000         # 轉置表上限（筆）
+NODE_LIMIT    = 40_000          # 單次求解新展開的節點上限，超過視為太大
+HINT_SEC      = 0.3             # 提示的求解時間上限（秒），超過就不給提示
+ENDGAME_DECK  = 3               # 全牌模式：牌堆剩這麼多張以下才求解
+ENDGAME_TURNS = 2               # 最先一盤：倒數剩這麼多回合以下才求解（剩 3 回合時中位數約 0.4 秒，多半算不完）
+HINT_SAMPLES  = 4               # 提示：對手手牌抽樣次數
+HINT_CACHE    = 256             # 提示快取（局面數）
+NC            = len(engine.CATS)
+PREFER        = {"p": 3, "n": 2, "x": 1, "f": 0}
+
+class TooBig(Exception):
+    pass
+
+class State(NamedTuple):
+    hands:  Tuple[Tuple[int, ...], ...]     # 各人手牌的類別張數
+    plates: Tuple[Tuple[int, ...], ...]     # 各人餐盤的食物類別張數
+    deck:   Tuple[int, ...]                 # 牌堆的類別張數
+    skip:   Tuple[bool, ...]
+    turn:   int
+    rounds: Optional[int]                   # 回合模式才需要
+    countdown: Optional[int]
+    last_starter: Optional[int]             # 帝王條款發動者（未發動為 None）
+
+@lru_cache(maxsize=1 << 16)
+def plate_score(cnt):
+    s = sum(PTS[k] * c for k, c in enumerate(cnt)) + engine.IMBALANCE_PENALTY * sum(c >= 3 for c in cnt)
+    return s + (engine.BALANCED_BONUS if all(any(cnt[k] for k in g) for g in GROUPS) else 0)
+
+def _counts(codes, size):
+    cnt = [0] * size
+    for k in codes: cnt[k] += 1
+    return tuple(cnt)
+
+def state_of(gs, hands=None, deck=None):
+    """由 gs（輪到的人已抽牌、行動中）建立狀態；hands / deck 為類別代碼清單，省略時用真實的牌。"""
+    players = gs["players"]
+    hands = hands if hands is not None else [sim_codes(p.hand) for p in players]
+    deck = deck if deck is not None else sim_codes(gs["deck"])
+    return State(tuple(_counts(h, NC) for h in hands), tuple(_counts([c.code for c in p.plate], NF) for p in players),
+                 _counts(deck, NC), tuple(p.skip_next for p in players), gs["turn"],
+                 gs["round_count"] if gs["mode"] == "rounds" else None, gs["countdown_turns"],
+                 gs["last_starter"] if gs["last_round"] else None)
+
+def state_of_sim(s):
+    return State(tuple(_counts(h, NC) for h in s.hands), tuple(tuple(c) for c in s.counts), _counts(s.deck, NC),
+                 tuple(s.skip), s.turn, s.round_count if s.mode == "rounds" else None, s.countdown,
+                 s.last_starter if s.last_round else None)
+
+def applicable(gs) -> bool:
+    if gs["over"] or gs["phase"] != "action" or gs["showing_transition"]: return False
+    return ((gs["mode"] == "allcards" and len(gs["deck"]) <= ENDGAME_DECK)
+            or (gs["mode"] == "first_plate" and gs["countdown_turns"] is not None and gs["countdown_turns"] <= ENDGAME_TURNS))
+
+# ══════════════════════════════════════════════════════════════════
+#  規則（類別張數版，與 mcts.Sim 相同）
+# ══════════════════════════════════════════════════════════════════
+def moves(st: State) -> List[tuple]:
+    me, h = st.turn, st.hands[st.turn]
+    held = sum(h)
+    if not held: return [("n",)]
+    out = []
+    for k in range(NC):
+        if not h[k]: continue
+        if k < NF: out.append(("p", k))
+        elif k == DROP:
+            live = [j for j in range(len(st.hands)) if sum(st.hands[j]) and (j != me or held > 1)]
+            out += [("f", k, j) for j in live] or [("f", k, None)]
+        elif k == PAUSE: out += [("f", k, j) for j in range(len(st.hands)) if j != me]
+        else: out.append(("f", k))
+        out.append(("x", k))
+    return out
+
+def _draws(deck, hand, times):
+    # 從牌堆抽 times 張 → [(機率, 牌堆, 手牌)]，同結果合併
+    out = {(deck, hand): 1.0}
+    for _ in range(times):
+        nxt = {}
+        for (d, h), p in out.items():
+            total = sum(d)
+            if not total: nxt[(d, h)] = nxt.get((d, h), 0) + p; continue
+            for k, c in enumerate(d):
+                if c:
+                    key = (_dec(d, k), _inc(h, k))
+                    nxt[key] = nxt.get(key, 0) + p * c / total
+        out = nxt
+    return [(p, d, h) for (d, h), p in out.items()]
+
+def _inc(t, k): return t[:k] + (t[k] + 1,) + t[k + 1:]
+def _dec(t, k): return t[:k] + (t[k] - 1,) + t[k + 1:]
+def _set(t, i, v): return t[:i] + (v,) + t[i + 1:]
+
+def outcomes(st: State, mv, mode, mode_val) -> List[Tuple[float, object]]:
+    """行動後的 [(機率, 下一個狀態 或 終局分數 tuple)]；下一個狀態已替下一位抽好牌。"""
+    me, n = st.turn, len(st.hands)
+    hands, h, op = st.hands, st.hands[me], mv[0]
+    plates, skip, deck = st.plates, st.skip, st.deck
+    res = []                                              # [(機率, hands, plates, deck, skip)]
+    if op == "n": res.append((1.0, hands, plates, deck, skip))
+    elif op == "x": res.append((1.0, _set(hands, me, _dec(h, mv[1])), plates, deck, skip))
+    elif op == "p":
+        k = mv[1]
+        res.append((1.0, _set(hands, me, _dec(h, k)), _set(plates, me, _inc(plates[me], k)), deck, skip))
+    else:
+        k, h = mv[1], _dec(h, mv[1])
+        if k in DRAWS:
+            res += [(p, _set(hands, me, h2), plates, d2, skip) for p, d2, h2 in _draws(deck, h, DRAW_N[k])]
+        elif k == STEAL:
+            targets = [j for j in range(n) if j != me and sum(hands[j])]
+            if not targets: res.append((1.0, _set(hands, me, h), plates, deck, skip))
+            for j in targets:
+                th, total = hands[j], sum(hands[j])
+                for c, m in enumerate(th):
+                    if m: res.append((m / total / len(targets), _set(_set(hands, me, _inc(h, c)), j, _dec(th, c)), plates, deck, skip))
+        elif k == SWAP:
+            hs = list(_set(hands, me, h))
+            res.append((1.0, tuple(hs[-1:] + hs[:-1]), plates, deck, skip))
+        elif k == DROP:
+            j, base = mv[2], _set(hands, me, h)
+            th = base[j] if j is not None else None
+            total = sum(th) if th else 0
+            if not total: res.append((1.0, base, plates, deck, skip))
+            for c, m in enumerate(th or ()):
+                if m: res.append((m / total, _set(base, j, _dec(th, c)), plates, deck, skip))
+        elif k == PAUSE: res.append((1.0, _set(hands, me, h), plates, deck, _set(skip, mv[2], True)))
+    out = []
+    for p, hs, pl, dk, sk in res:
+        for q, nxt in _end_turn(st, hs, pl, dk, sk, mode, mode_val):
+            out.append((p * q, nxt))
+    return out
+
+def _end_turn(st, hands, plates, deck, skip, mode, mode_val):
+    me, n = st.turn, len(hands)
+    countdown, last_starter, rounds = st.countdown, st.last_starter, st.rounds
+    if mode == "first_plate" and countdown is None and _balanced(plates[me]) and not _balanced(st.plates[me]):
+        countdown = mode_val * n + 1
+    if not sum(hands[me]) and last_starter is None and countdown is None: last_starter = me
+    if countdown is not None: countdown -= 1
+    nxt = (me + 1) % n
+    if ((countdown is not None and countdown <= 0) or (last_starter is not None and nxt == last_starter)
+            or (mode == "allcards" and not sum(deck)) or (mode == "rounds" and rounds >= mode_val * n)
+            or (mode == "score" and (max(map(plate_score, plates)) >= mode_val or (not sum(deck) and not any(map(sum, hands)))))):
+        return [(1.0, tuple(map(plate_score, plates)))]
+    if rounds is not None: rounds += 1
+    if skip[nxt]:
+        skip = _set(skip, nxt, False)
+        if countdown is not None: countdown -= 1
+        nxt = (nxt + 1) % n
+    if ((countdown is not None and countdown <= 1) or (rounds is not None and rounds >= mode_val * n)
+            or (last_starter is not None and (nxt + 1) % n == last_starter) or (mode == "allcards" and sum(deck) <= 1)):
+        # 下一位是最後一手：不論做什麼都會結束，只有放牌會改分數，直接取最好的放法
+        return [(1.0, _final_expect(plates, hands[nxt], deck, nxt))]
+    return [(p, State(_set(hands, nxt, h2), plates, d2, skip, nxt, rounds, countdown, last_starter))
+            for p, d2, h2 in _draws(deck, hands[nxt], 1)]
+
+def _balanced(cnt): return all(any(cnt[k] for k in g) for g in GROUPS)
+
+@lru_cache(maxsize=1 << 16)
+def _final_expect(plates, hand, deck, me):
+    # 最後一手的期望分數：抽一張（牌堆空則不抽）後放最好的食物，或不放
+    scores = list(map(plate_score, plates))
+    base, mine = scores[me], plates[me]
+    gain = [plate_score(_inc(mine, k)) for k in range(NF)]
+    held = max([base] + [gain[k] for k in range(NF) if hand[k]])
+    total = sum(deck)
+    if total:
+        held = sum(c * (max(held, gain[k]) if k < NF else held) for k, c in enumerate(deck) if c) / total
+    scores[me] = held
+    return tuple(scores)
+
+# ══════════════════════════════════════════════════════════════════
+#  求解器
+# ══════════════════════════════════════════════════════════════════
+class Solver:
+    def __init__(self, mode, mode_val, tt_size=TT_SIZE):
+        self.mode, self.mode_val, self.tt_size = mode, mode_val, tt_size
+        self._budget, self._deadline = NODE_LIMIT, None
+        self.tt: "OrderedDict[State, tuple]" = OrderedDict()
+        self.nodes = self.hits = 0
+        self.lock = threading.Lock()            # value / rank 會改轉置表與預算，跨執行緒使用時由呼叫端持有
+
+    def value(self, st: State, limit=NODE_LIMIT, deadline=None) -> tuple:
+        """各玩家的期望最終分數。"""
+        self._budget, self._deadline = limit, deadline
+        return self._value(st)
+
+    def _value(self, st):
+        tt = self.tt
+        v = tt.get(st)
+        if v is not None:
+            self.hits += 1; tt.move_to_end(st)
+            return v
+        self.nodes += 1; self._budget -= 1
+        if self._budget < 0 or (self._deadline and time.perf_counter() > self._deadline): raise TooBig
+        me = st.turn
+        v = max((self._expect(st, m) for m in moves(st)), key=lambda v: (v[me], v[me] - max(x for i, x in enumerate(v) if i != me)))
+        tt[st] = v
+        if len(tt) > self.tt_size: tt.popitem(last=False)
+        return v
+
+    def _expect(self, st, mv):
+        acc = None
+        for p, nxt in outcomes(st, mv, self.mode, self.mode_val):
+            v = nxt if nxt.__class__ is tuple else self._value(nxt)
+            acc = [p * x for x in v] if acc is None else [a + p * x for a, x in zip(acc, v)]
+        return tuple(acc)
+
+    def rank(self, st: State, limit=NODE_LIMIT, deadline=None) -> List[Tuple[tuple, tuple]]:
+        """[(行動, 各玩家期望分數)]，最好的在前。"""
+        self._budget, self._deadline, me = limit, deadline, st.turn
+        rows = [(m, self._expect(st, m)) for m in moves(st)]
+        rows.sort(key=lambda r: (r[1][me], r[1][me] - max(x for i, x in enumerate(r[1]) if i != me)), reverse=True)
+        return rows
+
+_SOLVERS: Dict[tuple, Solver] = {}
+_hints: "OrderedDict[tuple, Optional[tuple]]" = OrderedDict()     # 局面 → 提示（算不完為 None）
+_lock = threading.Lock()                                          # 保護 _SOLVERS 與 _hints
+_BUSY = object()
+
+def solver_for(mode, mode_val) -> Solver:
+    # 每種模式設定一個求解器（轉置表跨次呼叫共用）
+    key = (mode, mode_val, engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY)
+    with _lock:
+        if key not in _SOLVERS: _SOLVERS[key] = Solver(mode, mode_val)
+        return _SOLVERS[key]
+
+def hint(gs, samples=HINT_SAMPLES, rng=None, budget=HINT_SEC) -> Optional[Tuple[tuple, float]]:
+    """殘局最佳行動提示 → ((op, 手牌索引[, 目標]), 期望最終分數)；不是殘局或太大時回傳 None。
+    只用輪到的人看得到的資訊：對手手牌從未現身的牌中抽樣，在 budget 秒內算完幾次就平均幾次。
+    未指定 rng 時結果依局面快取：同一局面只在第一次呼叫時求解，之後的重跑直接取用。"""
+    if not applicable(gs): return None
+    if rng is not None:
+        found = _hint(gs, samples, rng, budget)
+        return None if found is _BUSY else found
+    import replay
+    key = (replay.state_key(gs), len(gs["log"]), engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY)
+    with _lock:
+        if key in _hints:
+            _hints.move_to_end(key)
+            return _hints[key]
+    found = _hint(gs, samples, random.Random(len(gs["log"])), budget)
+    if found is _BUSY: return None          # 求解器正被別的工作階段使用，不快取，下次重跑再試
+    with _lock:
+        _hints[key] = found
+        if len(_hints) > HINT_CACHE: _hints.popitem(last=False)
+    return found
+
+def _hint(gs, samples, rng, budget):
+    import mcts
+    seat = gs["turn"]
+    solver, pool, total = solver_for(gs["mode"], gs["mode_val"]), mcts.unseen_pool(gs, seat), {}
+    deadline, done = time.perf_counter() + budget, 0
+    if not solver.lock.acquire(timeout=budget): return _BUSY
+    try:
+        for _ in range(samples):
+            s = mcts.determinize(gs, seat, pool, rng)
+            try: rows = solver.rank(state_of_sim(s), deadline=deadline)
+            except TooBig: break            # 已算完的子樹留在轉置表，同模式的下一個局面可直接取用
+            for m, v in rows: total[m] = total.get(m, 0.0) + v[seat]
+            done += 1
+    finally:
+        solver.lock.release()
+    if not done: return None
+    total = {m: v / done for m, v in total.items()}
+    best = max(total, key=lambda m: (round(total[m], 6), PREFER[m[0]]))     # 同分時優先提示放牌
+    hand = sim_codes(gs["players"][seat].hand)
+    move = ("n",) if best[0] == "n" else (best[0], hand.index(best[1]), *best[2:])
+    return move, total[best]
+
+# ══════════════════════════════════════════════════════════════════
+#  --check / --bench
+# ══════════════════════════════════════════════════════════════════
+def _endgames(count, seed=0):
+    # 以規則式電腦打到殘局為止，回傳 gs
+    import bots
+    out, g = [], 0
+    while len(out) < count:
+        mode, mode_val = (("allcards", 0), ("first_plate", 1))[g % 2]
+        gs = engine.init_game([f"P{i+1}" for i in range(2 + g % 2)], mode, mode_val, seed=seed + g)
+        players = {s: bots.make_bot("heuristic", random.Random(g)) for s in range(len(gs["players"]))}
+        while not gs["over"] and not applicable(gs):
+            engine.apply_move(gs, players[gs["turn"]].choose(gs, gs["turn"]))
+        if not gs["over"]: out.append(gs)
+        g += 1
+    return out
+
+def check(count, playouts=400, seed=0):
+    import mcts
+    ok = 0
+    for gs in _endgames(count, seed):
+        solver, rng = Solver(gs["mode"], gs["mode_val"]), random.Random(seed)
+        try: want = solver.value(state_of(gs), limit=10 ** 6)
+        except TooBig: continue
+        solver._budget = 10 ** 9
+        # 所有人都照求解器的最佳策略、以真實隨機抽牌打完，平均應收斂到求解值
+        acc = [0.0] * len(want)
+        for _ in range(playouts):
+            deck = sim_codes(gs["deck"])
+            rng.shuffle(deck)
+            s = mcts.Sim.from_gs(gs, [sim_codes(p.hand) for p in gs["players"]], deck)
+            while not s.over:
+                st = state_of_sim(s)
+                s.step(max(moves(st), key=lambda m: _pick(solver, st, m)), rng)
+            acc = [a + x / playouts for a, x in zip(acc, s.scores)]
+        if max(abs(a - b) for a, b in zip(acc, want)) > 1.5:
+            raise AssertionError(f"seed {gs['seed']} {gs['mode']}：求解 {want} vs. 模擬 {acc}")
+        ok += 1
+    return ok
+
+def _pick(solver, st, m):
+    v, me = solver._expect(st, m), st.turn
+    return v[me], v[me] - max(x for i, x in enumerate(v) if i != me)
+
+def bench(count, seed=0):
+    rows = []
+    for gs in _endgames(count, seed):
+        solver = Solver(gs["mode"], gs["mode_val"])
+        t0 = time.perf_counter()
+        try: solver.rank(state_of(gs), limit=10 ** 6)
+        except TooBig: continue
+        rows.append((gs["mode"], len(gs["deck"]), solver.nodes, solver.hits, time.perf_counter() - t0))
+    return rows
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if "--bench" in argv:
+        rows = bench(int(argv[argv.index("--bench") + 1]))
+        for mode in ("allcards", "first_plate"):
+            r = [x for x in rows if x[0] == mode]
+            if not r: continue
+            nodes = sorted(x[2] for x in r)
+            ms = sorted(x[4] * 1000 for x in r)
+            hit = sum(x[3] for x in r) / max(sum(x[2] + x[3] for x in r), 1)
+            print(f"{mode:<12} {len(r)} 個殘局：節點 中位 {nodes[len(r) // 2]:,} / 最多 {nodes[-1]:,}；"
+                  f"時間 中位 {ms[len(r) // 2]:.0f} ms / 最多 {ms[-1]:.0f} ms；轉置表命中 {hit:.0%}")
+        return
+    n = int(argv[argv.index("--check") + 1]) if "--check" in argv else 40
+    print(f"✅ {check(n)} 個殘局：求解值與依最佳策略的蒙地卡羅平均一致")
+
+if __name__ == "__main__":
+    sys.exit(main())
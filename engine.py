@@ -0,0 +1,546 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 規則引擎（不依賴 Streamlit，可獨立模擬）
+"""
+import json
+import os
+import random
+from dataclasses import dataclass, field
+from types import MappingProxyType
+from typing import List, Optional
+
+# ══════════════════════════════════════════════════════════════════
+#  常數
+# ══════════════════════════════════════════════════════════════════
+# 卡牌登錄表：類別、分數、顏色、功能牌效果與規則組都寫在 cards.json（INSPECTOR_CARDS 可換成其他檔案），
+# 新增同效果的卡或調整數值不必改程式；卡牌 id 即類別編號
+CARDS_FILE = os.environ.get("INSPECTOR_CARDS") or os.path.join(os.path.dirname(os.path.abspath(__file__)), "cards.json")
+
+def load_cards(path) -> dict:
+    """讀入卡牌登錄表並檢查：id 為 0..n-1 依序、食物排在功能牌前、均衡分類與規則組只引用已定義的項目。"""
+    with open(path, encoding="utf-8") as f: reg = json.load(f)
+    cards, groups = reg["cards"], reg["groups"]
+    if [c["id"] for c in cards] != list(range(len(cards))): raise ValueError(f"{path}：卡牌 id 須為 0..{len(cards) - 1} 依序排列")
+    kinds = [c["kind"] for c in cards]
+    if set(kinds) - {"food", "func"} or kinds != sorted(kinds): raise ValueError(f"{path}：kind 只能是 food / func，且食物排在前")
+    for c in cards:
+        if c["kind"] == "food" and c.get("group") not in groups + [None]: raise ValueError(f"{path}：{c['name']} 的均衡分類 {c['group']!r} 未定義")
+    funcs = {c["name"] for c in cards if c["kind"] == "func"}
+    for name, rs in reg["rulesets"].items():
+        if set(rs) - funcs: raise ValueError(f"{path}：規則組 {name} 含未定義的功能牌 {sorted(set(rs) - funcs)}")
+    return reg
+
+_REG = load_cards(CARDS_FILE)
+
+FOOD_CATS  = {c["name"]: {k: c[k] for k in ("pts", "emoji", "bg", "border")} for c in _REG["cards"] if c["kind"] == "food"}
+FUNC_CARDS = {c["name"]: {k: c[k] for k in ("emoji", "bg", "border", "desc")} for c in _REG["cards"] if c["kind"] == "func"}
+
+# 規則組：牌堆裡放哪些功能牌（卡牌編號與 cid 各規則組一致，只是不放進牌堆）
+RULESETS = {name: tuple(rs) for name, rs in _REG["rulesets"].items()}
+
+INIT_HAND         = 5
+FOOD_PER_CAT      = 6
+FUNC_PER_TYPE     = 5
+BALANCED_BONUS    =  10
+IMBALANCE_PENALTY = -10
+
+P_COLORS = [
+    {"header": "#FF6B6B", "light": "#fff5f5", "text": "#7d2020"},
+    {"header": "#4ECDC4", "light": "#f0fffe", "text": "#004d47"},
+    {"header": "#f5c842", "light": "#fffdf0", "text": "#7a6000"},
+    {"header": "#A29BFE", "light": "#f5f4ff", "text": "#3a2e8c"},
+]
+
+# 行動後回傳給 UI 的提示：要寫回 session_state 的鍵值（唯讀，所有行動共用同一份）
+CLEAR_SEL = MappingProxyType({"sel": None})
+
+# ══════════════════════════════════════════════════════════════════
+#  資料模型
+# ══════════════════════════════════════════════════════════════════
+# 類別編號（登錄表 id）0..8 食物、9.. 功能牌；各屬性預先攤平成 tuple，依編號直接取值
+_INFO     = _REG["cards"]
+CATS      = tuple(info["name"]   for info in _INFO)
+CAT_ID    = {cat: i for i, cat in enumerate(CATS)}
+KINDS     = tuple(info["kind"]   for info in _INFO)
+EMOJIS    = tuple(info["emoji"]  for info in _INFO)
+BGS       = tuple(info["bg"]     for info in _INFO)
+BORDERS   = tuple(info["border"] for info in _INFO)
+PTS       = tuple(info.get("pts", 0) for info in _INFO)
+DESCS     = tuple(f"+{info['pts']} 分" if k == "food" else info["desc"] for k, info in zip(KINDS, _INFO))
+
+class Card:
+    __slots__ = ("code", "cid", "img")
+
+    def __init__(self, kind: str, cat: str, cid: int, img: Optional[str] = None):
+        self.code, self.cid, self.img = CAT_ID[cat], cid, img
+
+    @classmethod
+    def from_code(cls, code: int, cid: int, img: Optional[str] = None):
+        c = cls.__new__(cls)
+        c.code, c.cid, c.img = code, cid, img
+        return c
+
+    def __eq__(self, other):
+        if other.__class__ is not Card: return NotImplemented
+        return self.code == other.code and self.cid == other.cid and self.img == other.img
+
+    __hash__ = None
+
+    def __repr__(self):
+        return f"Card(kind={self.kind!r}, cat={self.cat!r}, cid={self.cid!r}, img={self.img!r})"
+
+    def __getstate__(self): return (self.code, self.cid, self.img)
+    def __setstate__(self, st): self.code, self.cid, self.img = st
+
+    @property
+    def kind(self): return KINDS[self.code]
+    @property
+    def cat(self): return CATS[self.code]
+    @property
+    def emoji(self): return EMOJIS[self.code]
+    @property
+    def bg(self): return BGS[self.code]
+    @property
+    def border(self): return BORDERS[self.code]
+    @property
+    def pts(self): return PTS[self.code]
+    @property
+    def desc(self): return DESCS[self.code]
+
+# 均衡餐盤：每個均衡分類（預設蔬果、蛋白質、澱粉）至少一張
+BALANCE_GROUPS = tuple({info["name"] for info in _INFO if info.get("group") == g} for g in _REG["groups"])
+GROUP_OF = tuple(_REG["groups"].index(info["group"]) if info.get("group") else None for info in _INFO)
+
+@dataclass
+class Player:
+    name:  str
+    color: dict
+    hand:  List[Card] = field(default_factory=list)
+    plate: List[Card] = field(default_factory=list)
+    skip_next: bool   = False
+    # 餐盤的增量統計：放入 / 移出時 O(1) 更新，plate_score、is_balanced 只需讀取
+    _cats:   dict = field(default_factory=dict, init=False, repr=False, compare=False)
+    _groups: list = field(default_factory=lambda: [0] * len(BALANCE_GROUPS), init=False, repr=False, compare=False)
+    _raw:    int  = field(default=0, init=False, repr=False, compare=False)
+    _over:   int  = field(default=0, init=False, repr=False, compare=False)
+
+    def __post_init__(self):
+        for c in self.plate: self._count(c, 1)
+
+    def _count(self, card, d):
+        code = card.code
+        cnt = self._cats.get(code, 0) + d
+        self._cats[code] = cnt
+        self._raw += d * PTS[code]
+        if (d > 0 and cnt == 3) or (d < 0 and cnt == 2): self._over += d
+        gi = GROUP_OF[code]
+        if gi is not None: self._groups[gi] += d
+
+    def add_to_plate(self, card):
+        self.plate.append(card); self._count(card, 1)
+
+    def remove_from_plate(self, idx):
+        card = self.plate.pop(idx); self._count(card, -1)
+        return card
+
+    def plate_count(self, cat):
+        return self._cats.get(CAT_ID[cat], 0)
+
+    def plate_score(self):
+        return self._raw + (BALANCED_BONUS if self.is_balanced() else 0) + IMBALANCE_PENALTY * self._over
+
+    def is_balanced(self):
+        return 0 not in self._groups
+
+# ══════════════════════════════════════════════════════════════════
+#  遊戲引擎
+# ══════════════════════════════════════════════════════════════════
+def deck_counts(ruleset="full") -> List[int]:
+    """各類別放進牌堆的張數（依類別編號）。"""
+    funcs = RULESETS[ruleset]
+    return [FOOD_PER_CAT if kind == "food" else FUNC_PER_TYPE if CATS[code] in funcs else 0
+            for code, kind in enumerate(KINDS)]
+
+def build_deck(rng=random, ruleset="full"):
+    # cid 依完整牌組編號，未採用的功能牌跳過（codec 的 cid 對照表各規則組共用）
+    cards, cid = [], 0
+    for code, (kind, k) in enumerate(zip(KINDS, deck_counts(ruleset))):
+        for i in range(FOOD_PER_CAT if kind == "food" else FUNC_PER_TYPE):
+            if i < k: cards.append(Card.from_code(code, cid))
+            cid += 1
+    rng.shuffle(cards)
+    return cards
+
+def init_game(names: List[str], mode: str, mode_val: int, rng: Optional[random.Random] = None,
+              seed: Optional[int] = None, ruleset: str = "full"):
+    # 每局一條獨立的亂數流（洗牌、偷牌、隨機棄牌皆由此取）；由 seed 建立時可用 replay.py 重播
+    if rng is None:
+        seed = random.getrandbits(64) if seed is None else seed
+        rng  = random.Random(seed)
+    deck = build_deck(rng, ruleset)
+    players = [Player(n, P_COLORS[i]) for i, n in enumerate(names)]
+    for p in players:
+        for _ in range(INIT_HAND):
+            if deck: p.hand.append(deck.pop())
+    return dict(
+        players=players, deck=deck, discard=[],
+        turn=0, phase="draw_screen", over=False,
+        mode=mode, mode_val=mode_val, ruleset=ruleset,
+        last_round=False, last_starter=None, countdown_turns=None,
+        msg="", msg_type="info", events=[], round_count=0,
+        pending_hand_idx=None, showing_transition=True, transition_to=0,
+        last_drawn_card=None, alert_msg="", end_code=None, rng=rng,
+        seed=seed, log=[], checkpoint=None,
+    )
+
+def check_emperor(gs, player_idx):
+    p = gs["players"][player_idx]
+    if len(p.hand) == 0 and not gs.get("last_round") and gs.get("countdown_turns") is None:
+        gs["last_round"] = True
+        gs["last_starter"] = player_idx
+        gs["events"].append(f"👑 帝王條款發動！{p.name} 打出了最後一張手牌，進入最後一輪！")
+
+# 回傳 (結束代碼, 說明)；未結束時代碼為 None
+def end_state(gs) -> tuple:
+    players = gs["players"]
+    mode    = gs["mode"]
+
+    if gs.get("countdown_turns") is not None:
+        if gs["countdown_turns"] <= 0:
+            return "countdown", "最後倒數結束，結算最高分數！"
+
+    if gs.get("last_round"):
+        nxt = (gs["turn"] + 1) % len(players)
+        if nxt == gs["last_starter"]:
+            return "last_round", "帝王條款 / 最後一輪結束，結算分數！"
+
+    if mode == "allcards" and not gs["deck"]:
+        return "deck_empty", "牌堆已抽完，結算最高分數！"
+
+    if mode == "rounds":
+        if gs["round_count"] >= gs["mode_val"] * len(players):
+            return "rounds", f"已完成 {gs['mode_val']} 回合！"
+
+    if mode == "score":
+        for p in players:
+            if p.plate_score() >= gs["mode_val"]:
+                return "score", f"🎉 {p.name} 率先達到 {gs['mode_val']} 分！"
+        if not gs["deck"] and all(len(p.hand) == 0 for p in players):
+            return "exhausted", "牌堆與手牌皆空，但無人達標，以目前最高分結算！"
+
+    return None, ""
+
+def check_end(gs) -> tuple:
+    code, reason = end_state(gs)
+    return code is not None, reason
+
+def advance_turn(gs):
+    if gs.get("countdown_turns") is not None:
+        gs["countdown_turns"] -= 1
+
+    code, reason = end_state(gs)
+    if code is not None:
+        gs["over"], gs["msg"], gs["msg_type"], gs["phase"] = True, reason, "success", "over"
+        gs["end_code"] = code
+        if gs.get("checkpoint"): gs["checkpoint"](gs)
+        return
+
+    players = gs["players"]
+    n = len(players)
+    gs["round_count"] += 1
+
+    nxt = (gs["turn"] + 1) % n
+    if players[nxt].skip_next:
+        players[nxt].skip_next = False
+        gs["events"].append(f"⏸️ {players[nxt].name} 被暫停，跳過本回合！")
+        if gs.get("countdown_turns") is not None:
+            gs["countdown_turns"] -= 1
+        nxt = (nxt + 1) % n
+
+    gs["turn"]  = nxt
+    gs["phase"] = "draw_screen"
+    gs["pending_hand_idx"] = None
+    gs["last_drawn_card"]  = None
+    gs["showing_transition"] = True
+    gs["transition_to"]      = nxt
+    gs["msg"]                = ""
+    # 換人時的存檔點（如 codec.encode 後寫入儲存後端），未設定時為 None
+    if gs.get("checkpoint"): gs["checkpoint"](gs)
+
+# ── 對局紀錄：只增不改的 (op, *args)；亂數結果另記 "r" 供重播比對（見 replay.py）──
+def _log(gs, *entry): gs["log"].append(entry)
+
+# ── 行動函式（回傳 UI 提示，不碰 session_state）────────────────────
+def action_draw(gs):
+    _log(gs, "d")
+    p = gs["players"][gs["turn"]]
+    if gs["deck"]:
+        c = gs["deck"].pop()
+        p.hand.append(c)
+        gs["last_drawn_card"] = len(p.hand) - 1
+        gs["msg"], gs["msg_type"] = f"🃏 抽到了 {c.emoji} {c.cat}", "info"
+    else:
+        gs["last_drawn_card"] = None
+        gs["msg"], gs["msg_type"] = "牌堆已空，請直接進行行動！", "warning"
+    gs["phase"] = "action"
+    return CLEAR_SEL
+
+def skip_draw(gs):
+    _log(gs, "s")
+    gs["phase"] = "action"
+    return {}
+
+def action_place(gs, hand_idx):
+    _log(gs, "p", hand_idx)
+    p = gs["players"][gs["turn"]]
+    card = p.hand.pop(hand_idx)
+    p.add_to_plate(card)
+    gs["msg"], gs["msg_type"] = f"🍽️ 將 {card.emoji} {card.cat} 放入餐盤（+{card.pts}分）", "success"
+
+    should_alert = False
+    if p.is_balanced():
+        if gs["mode"] == "first_plate" and gs.get("countdown_turns") is None:
+            # ⭐ 核心修正：+1 保證換人時不會吃到贏家未來的回合扣打，讓每個人都有完整 N 輪
+            gs["countdown_turns"] = (gs["mode_val"] * len(gs["players"])) + 1
+            gs["events"].append(f"🚨 {p.name} 首位達成均衡餐盤！進入最後 {gs['mode_val']} 輪倒數！")
+            gs["alert_msg"] = f"玩家 {p.name} 率先完成了均衡餐盤！遊戲正式進入最後 {gs['mode_val']} 輪倒數！"
+            gs["phase"] = "alert_first_plate"
+            should_alert = True
+        else:
+            gs["events"].append(f"🌟 {p.name} 達成均衡餐盤！額外 +{BALANCED_BONUS} 分！")
+
+    if p.plate_count(card.cat) == 3:
+        gs["events"].append(f"⚠️ {p.name} 的 {card.cat} 達到 3 張，扣 {-IMBALANCE_PENALTY} 分！")
+
+    if should_alert:
+        return CLEAR_SEL
+
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return CLEAR_SEL
+
+def ack_first_plate(gs):
+    _log(gs, "a")
+    gs["phase"] = "action"
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return {}
+
+def action_discard(gs, hand_idx):
+    _log(gs, "x", hand_idx)
+    p = gs["players"][gs["turn"]]
+    card = p.hand.pop(hand_idx)
+    gs["discard"].append(card)
+    gs["msg"], gs["msg_type"] = f"🗑️ 棄置 {card.emoji} {card.cat}", "info"
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return CLEAR_SEL
+
+def action_pass(gs):
+    # 牌堆已空且手牌為空時，只能跳過本回合
+    _log(gs, "n")
+    gs["msg"], gs["msg_type"] = "手牌已空，跳過本回合", "info"
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return CLEAR_SEL
+
+# ── 功能牌效果：cards.json 的 effect → 處理函式 (gs, 使用者, 卡, 手牌位置) ──
+def _fizzle(gs, p, card, hand_idx, why):
+    # 卡片失效：照樣打出並結束回合
+    p.hand.pop(hand_idx)
+    gs["discard"].append(card)
+    gs["msg"], gs["msg_type"] = f"{card.emoji} {card.cat}！{why}，卡片失效！", "error"
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+
+def _fx_draw(gs, p, card, hand_idx):
+    if not gs["deck"]: return _fizzle(gs, p, card, hand_idx, "但牌堆已空無牌可抽")
+    p.hand.pop(hand_idx)
+    gs["discard"].append(card)
+    drawn = []
+    for _ in range(DRAW_N[card.code]):
+        if gs["deck"]:
+            c = gs["deck"].pop()
+            p.hand.append(c)
+            drawn.append(f"{c.emoji}{c.cat}")
+    gs["msg"], gs["msg_type"] = f"{card.emoji} {card.cat}！抽到：{'、'.join(drawn)}", "success"
+    gs["phase"] = "confirm_draw"
+    check_emperor(gs, gs["turn"])
+
+def _fx_steal(gs, p, card, hand_idx):
+    players = gs["players"]
+    targets = [(i, pl) for i, pl in enumerate(players) if i != gs["turn"] and pl.hand]
+    if not targets: return _fizzle(gs, p, card, hand_idx, "但對手皆無手牌")
+    p.hand.pop(hand_idx)
+    gs["discard"].append(card)
+    ti, tp    = gs["rng"].choice(targets)
+    stolen    = gs["rng"].choice(tp.hand)
+    _log(gs, "r", ti, tp.hand.index(stolen))
+    tp.hand.remove(stolen)
+    p.hand.append(stolen)
+    gs["msg"], gs["msg_type"] = f"{card.emoji} 隨機偷到 {tp.name} 的 {stolen.emoji}{stolen.cat}！", "success"
+    gs["events"].append(f"😱 {p.name} 偷了 {tp.name} 的牌！")
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+
+def _fx_swap(gs, p, card, hand_idx):
+    players = gs["players"]
+    p.hand.pop(hand_idx)
+    gs["discard"].append(card)
+    saved = [pl.hand[:] for pl in players]
+    for i, pl in enumerate(players): pl.hand = saved[(i - 1) % len(players)]
+    gs["msg"], gs["msg_type"] = f"{card.emoji} 所有玩家手牌順時針交換！", "warning"
+    gs["events"].append(f"{card.emoji} 手牌大輪轉！")
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+
+def _fx_drop(gs, p, card, hand_idx):
+    if not (any(pl.hand for i, pl in enumerate(gs["players"]) if i != gs["turn"]) or len(p.hand) > 1):
+        return _fizzle(gs, p, card, hand_idx, "全場已無牌可丟")
+    gs["phase"]            = "pending_discard_hand"
+    gs["pending_hand_idx"] = hand_idx
+    gs["msg"], gs["msg_type"] = f"{card.emoji} 請選擇一位玩家，隨機棄置其 1 張手牌", "warning"
+
+def _fx_pause(gs, p, card, hand_idx):
+    gs["phase"]            = "pending_pause"
+    gs["pending_hand_idx"] = hand_idx
+    gs["msg"], gs["msg_type"] = f"{card.emoji} 請選擇要暫停的玩家", "warning"
+
+EFFECTS = {"draw": _fx_draw, "steal": _fx_steal, "swap": _fx_swap, "drop": _fx_drop, "pause": _fx_pause}
+
+def _effect(info):
+    if info["kind"] == "food": return None
+    if info.get("effect") not in EFFECTS: raise ValueError(f"{CARDS_FILE}：{info['name']} 的效果 {info.get('effect')!r} 未定義（可用 {', '.join(EFFECTS)}）")
+    return EFFECTS[info["effect"]]
+
+# 依類別編號直接取處理函式；效果名稱與抽牌張數另外攤平，供整數模擬器依效果（而非卡名）歸類
+FX        = tuple(_effect(info) for info in _INFO)
+EFFECT_OF = tuple(info.get("effect") for info in _INFO)
+DRAW_N    = tuple(info.get("n", 0) for info in _INFO)
+
+def action_use_func(gs, hand_idx):
+    _log(gs, "f", hand_idx)
+    p    = gs["players"][gs["turn"]]
+    card = p.hand[hand_idx]
+    FX[card.code](gs, p, card, hand_idx)
+    return CLEAR_SEL
+
+def resolve_discard_hand(gs, target_idx):
+    _log(gs, "t", target_idx)
+    p         = gs["players"][gs["turn"]]
+    func_card = p.hand.pop(gs["pending_hand_idx"])
+    gs["discard"].append(func_card)
+
+    target    = gs["players"][target_idx]
+    if target.hand:
+        discarded = gs["rng"].choice(target.hand)
+        _log(gs, "r", target_idx, target.hand.index(discarded))
+        target.hand.remove(discarded)
+        gs["discard"].append(discarded)
+        gs["msg"] = f"💥 成功隨機棄置了 {target.name} 的 1 張手牌！"
+        gs["events"].append(f"💥 {p.name} 棄置了 {target.name} 的手牌！")
+    else:
+        gs["msg"] = f"💥 {target.name} 手上已經沒有牌可以棄置了！"
+
+    gs["msg_type"] = "success"
+    gs["pending_hand_idx"] = None
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return CLEAR_SEL
+
+def resolve_pause(gs, target_idx):
+    _log(gs, "z", target_idx)
+    p         = gs["players"][gs["turn"]]
+    func_card = p.hand.pop(gs["pending_hand_idx"])
+    gs["discard"].append(func_card)
+    target             = gs["players"][target_idx]
+    target.skip_next   = True
+    gs["msg"], gs["msg_type"] = f"⛔ {target.name} 下回合將被暫停！", "warning"
+    gs["events"].append(f"⛔ {target.name} 下回合被暫停！")
+    gs["pending_hand_idx"] = None
+    check_emperor(gs, gs["turn"])
+    advance_turn(gs)
+    return CLEAR_SEL
+
+def cancel_pending(gs):
+    _log(gs, "c")
+    gs["phase"] = "action"; gs["pending_hand_idx"] = None
+    return {}
+
+def confirm_draw(gs):
+    _log(gs, "k")
+    advance_turn(gs)
+    return {}
+
+def end_transition(gs):
+    _log(gs, "e")
+    gs["showing_transition"] = False
+    return {}
+
+# ── 行動代號（同對局紀錄）→ (函式, 參數個數)，供重播、連線服務與電腦玩家共用 ──
+ACTIONS = {
+    "d": (action_draw, 0),          "s": (skip_draw, 0),
+    "p": (action_place, 1),         "x": (action_discard, 1),
+    "n": (action_pass, 0),          "f": (action_use_func, 1),
+    "t": (resolve_discard_hand, 1), "z": (resolve_pause, 1),
+    "c": (cancel_pending, 0),       "k": (confirm_draw, 0),
+    "a": (ack_first_plate, 0),      "e": (end_transition, 0),
+}
+
+def legal_moves(gs) -> List[tuple]:
+    """目前輪到的玩家可做的行動 (op, *args)，與 UI 上可按的按鈕一致。"""
+    if gs["over"]: return []
+    if gs["showing_transition"]: return [("e",)]
+    phase, ci, players = gs["phase"], gs["turn"], gs["players"]
+    if phase == "draw_screen":          return [("d",) if gs["deck"] else ("s",)]
+    if phase == "alert_first_plate":    return [("a",)]
+    if phase == "confirm_draw":         return [("k",)]
+    if phase == "pending_discard_hand": return [("t", i) for i, p in enumerate(players) if p.hand] + [("c",)]
+    if phase == "pending_pause":        return [("z", i) for i in range(len(players)) if i != ci]
+    hand = players[ci].hand
+    if not hand: return [("n",)]
+    return [("p" if c.kind == "food" else "f", i) for i, c in enumerate(hand)] + [("x", i) for i in range(len(hand))]
+
+def apply_move(gs, move):
+    fn, argc = ACTIONS[move[0]]
+    return fn(gs, *move[1:1 + argc])
+
+# ══════════════════════════════════════════════════════════════════
+#  無頭引擎：對外的入口，擁有 gs，方法即行動，回傳 UI 提示
+#  （只是轉呼叫上面的函式；app / server / 模擬器直接用函式與 gs 較省一層呼叫）
+# ══════════════════════════════════════════════════════════════════
+class GameEngine:
+    def __init__(self, gs: dict):
+        self.gs = gs
+
+    @classmethod
+    def new(cls, names: List[str], mode: str, mode_val: int, rng: Optional[random.Random] = None,
+            seed: Optional[int] = None, ruleset: str = "full"):
+        return cls(init_game(names, mode, mode_val, rng, seed, ruleset))
+
+    @property
+    def players(self): return self.gs["players"]
+    @property
+    def current(self): return self.gs["players"][self.gs["turn"]]
+    @property
+    def phase(self): return self.gs["phase"]
+    @property
+    def over(self): return self.gs["over"]
+
+    def scores(self): return [p.plate_score() for p in self.gs["players"]]
+    def legal_moves(self):                  return legal_moves(self.gs)
+    def apply(self, move):                  return apply_move(self.gs, move)
+
+    def draw(self):                         return action_draw(self.gs)
+    def skip_draw(self):                    return skip_draw(self.gs)
+    def place(self, hand_idx):              return action_place(self.gs, hand_idx)
+    def discard(self, hand_idx):            return action_discard(self.gs, hand_idx)
+    def pass_turn(self):                    return action_pass(self.gs)
+    def use_func(self, hand_idx):           return action_use_func(self.gs, hand_idx)
+    def resolve_discard_hand(self, target): return resolve_discard_hand(self.gs, target)
+    def resolve_pause(self, target):        return resolve_pause(self.gs, target)
+    def cancel_pending(self):               return cancel_pending(self.gs)
+    def confirm_draw(self):                 return confirm_draw(self.gs)
+    def ack_first_plate(self):              return ack_first_plate(self.gs)
+    def end_transition(self):               return end_transition(self.gs)
@@ -0,0 +1,162 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 版本快照 / 復原
+
+每個行動後 commit(gs) 產生一個不可變的版本 Snap，與上一版共用沒變的部分：
+  * 牌堆只從尾端抽 → 只存長度，牌序共用開局時的一份 tuple
+  * 棄牌堆只會追加 → 以 (card, prev) 串列存，新版只多新棄的幾張
+  * 各玩家手牌 / 餐盤 → 沒變就沿用上一版的 tuple
+  * 亂數狀態 → 只在紀錄出現 "r"（用到亂數）時重新存
+因此等待選擇的階段（pending_discard_hand / pending_pause / confirm_draw / alert_first_plate）
+只多一組純量欄位，幾乎不佔記憶體。restore() 就地把 gs 改回任一版本，可用於復原、
+假設分支（restore 後照常行動，後續版本自動截斷）與當機復原。
+"""
+from array import array
+from typing import NamedTuple, Optional, Tuple
+
+from engine import Player
+
+PENDING = ("pending_discard_hand", "pending_pause", "confirm_draw", "alert_first_plate")
+
+# 行動會改動的純量欄位
+SCALARS = ("turn", "phase", "over", "mode", "mode_val", "last_round", "last_starter", "countdown_turns",
+           "msg", "msg_type", "round_count", "pending_hand_idx", "showing_transition", "transition_to",
+           "last_drawn_card", "alert_msg", "end_code")
+
+class Snap(NamedTuple):
+    players: Tuple[tuple, ...]      # 每位 (hand, plate, skip_next)
+    deck:    int                    # 牌堆長度
+    discard: tuple                  # (card, prev) 串列頭，空為 ()
+    n_disc:  int
+    events:  tuple
+    log:     int                    # gs["log"] 長度
+    rng:     object                 # 壓成 bytes 的 rng 狀態，可能與上一版共用
+    scalars: tuple
+
+def _same(prev, cur):
+    return len(prev) == len(cur) and all(a is b for a, b in zip(prev, cur))
+
+class History:
+    def __init__(self, gs):
+        self.deck = tuple(gs["deck"])                       # 之後只會從尾端 pop
+        self.names = tuple((p.name, p.color) for p in gs["players"])
+        self.versions = []
+        self.commit(gs)
+
+    def __len__(self): return len(self.versions)
+
+    @property
+    def head(self) -> Snap: return self.versions[-1]
+
+    def commit(self, gs) -> int:
+        prev = self.versions[-1] if self.versions else None
+        players = []
+        for i, p in enumerate(gs["players"]):
+            if prev:
+                ph, pp, ps = prev.players[i]
+                players.append((ph if _same(ph, p.hand) else tuple(p.hand),
+                                pp if _same(pp, p.plate) else tuple(p.plate), p.skip_next))
+            else:
+                players.append((tuple(p.hand), tuple(p.plate), p.skip_next))
+
+        players = prev.players if prev and all(a == b for a, b in zip(players, prev.players)) else tuple(players)
+
+        disc, n_disc = (prev.discard, prev.n_disc) if prev else ((), 0)
+        for c in gs["discard"][n_disc:]: disc = (c, disc)
+
+        log = gs["log"]
+        rng = prev.rng if prev and not any(e[0] == "r" for e in log[prev.log:]) else _rng_state(gs)
+        events = prev.events if prev and _same(prev.events, gs["events"]) else tuple(gs["events"])
+
+        scalars = tuple(gs[k] for k in SCALARS)
+        if prev and prev.scalars == scalars: scalars = prev.scalars
+        self.versions.append(Snap(players, len(gs["deck"]), disc, len(gs["discard"]), events, len(log), rng, scalars))
+        return len(self.versions) - 1
+
+    def restore(self, gs, ver: int):
+        """就地把 gs 改回第 ver 版，並截斷之後的版本（之後的行動成為新分支）。"""
+        s = self.versions[ver]
+        del self.versions[ver + 1:]
+        gs["players"] = [Player(n, c, list(h), list(pl), sk) for (n, c), (h, pl, sk) in zip(self.names, s.players)]
+        gs["deck"] = list(self.deck[:s.deck])
+        disc, node = [], s.discard
+        while node: disc.append(node[0]); node = node[1]
+        gs["discard"] = disc[::-1]
+        gs["events"] = list(s.events)
+        del gs["log"][s.log:]
+        if s.rng is not None:
+            ver, words, gauss = s.rng
+            gs["rng"].setstate((ver, tuple(array("I", words)), gauss))
+        gs.update(zip(SCALARS, s.scalars))
+        return gs
+
+    def undo(self, gs, steps: int = 1):
+        return self.restore(gs, max(0, len(self.versions) - 1 - steps))
+
+    def last(self, pred, before: Optional[int] = None) -> Optional[int]:
+        # 由新到舊找第一個符合條件的版本號
+        end = len(self.versions) if before is None else before
+        for v in range(end - 1, -1, -1):
+            if pred(self.versions[v]): return v
+        return None
+
+    def rollback_points(self):
+        ph = SCALARS.index("phase")
+        return [v for v, s in enumerate(self.versions) if s.scalars[ph] in PENDING]
+
+def _rng_state(gs):
+    # MT19937 狀態 625 個 32 位元整數：存成 bytes 約 2.5 KB（原 tuple of int 約 25 KB）
+    rng = gs.get("rng")
+    if not hasattr(rng, "getstate"): return None
+    ver, words, gauss = rng.getstate()
+    return ver, array("I", words).tobytes(), gauss
+
+def field(snap: Snap, name: str):
+    return snap.scalars[SCALARS.index(name)]
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：隨機對局每步 commit，再跳回任意版本比對，並從該處分支續玩
+# ══════════════════════════════════════════════════════════════════
+def check(games, n=3, seed=0):
+    import copy, random, tracemalloc
+    import engine, replay
+    def key(gs): return replay.state_key(gs), hash(gs["rng"].getstate())
+    modes = ("rounds", "allcards", "score", "first_plate")
+    vals  = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}
+    versions, snap_bytes, copy_bytes = 0, 0, 0
+    for g in range(games):
+        mode = modes[g % len(modes)]
+        gs, rng = engine.init_game([f"P{i+1}" for i in range(n)], mode, vals[mode], seed=seed + g), random.Random(~(seed + g))
+        tracemalloc.start()
+        hist, keys = History(gs), [key(gs)]
+        while not gs["over"]:
+            replay.random_step(gs, rng)
+            t0 = tracemalloc.get_traced_memory()[0]
+            hist.commit(gs)
+            snap_bytes += tracemalloc.get_traced_memory()[0] - t0
+            keys.append(key(gs))
+        t0 = tracemalloc.get_traced_memory()[0]
+        deep = copy.deepcopy({k: v for k, v in gs.items() if k != "log"})
+        copy_bytes += (tracemalloc.get_traced_memory()[0] - t0) * len(hist)
+        del deep
+        tracemalloc.stop()
+        versions += len(hist)
+        for _ in range(5):
+            v = rng.randrange(len(hist))
+            hist.restore(gs, v)
+            if key(gs) != keys[v]: raise AssertionError(f"game {seed + g}: 版本 {v} 還原不一致")
+            # 分支續玩：新分支必須能由紀錄重播出同一狀態
+            del keys[v + 1:]
+            while not gs["over"] and rng.random() < 0.95:
+                replay.random_step(gs, rng); hist.commit(gs); keys.append(key(gs))
+            hdr, log = replay.loads(replay.dumps(gs))
+            if replay.state_key(replay.replay(hdr, log)) != keys[-1][0]:
+                raise AssertionError(f"game {seed + g}: 分支後與重播不一致")
+    return versions, snap_bytes / versions, copy_bytes / versions
+
+if __name__ == "__main__":
+    import sys
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+    v, snap, deep = check(n)
+    print(f"✅ {n} 局 / {v:,} 個版本還原與分支一致；每版平均 {snap:,.0f} B（deepcopy 約 {deep:,.0f} B）")
@@ -0,0 +1,313 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 資訊集蒙地卡羅樹搜尋（IS-MCTS）電腦玩家
+
+每次迭代先「決定化」：把看不到的牌（對手手牌與牌堆）從未現身的牌中隨機發回，張數與畫面一致；
+再在一棵共用的樹上選擇 / 展開（UCB 以「該行動可用的次數」取代父節點次數），
+以整數模擬器 Sim 快速打完（規則式 + 少量隨機），依勝負回傳。
+行動以類別去重：放 / 丟某類食物、使用功能牌（丟1張、暫停連同目標一起選）。
+
+    python mcts.py --check 300          # Sim 與 engine 逐步比對規則
+    python mcts.py --bench 2            # 每秒模擬局數與每步迭代數
+    python bots.py --arena 100 --bots mcts greedy --budget 0.2
+"""
+import math
+import random
+import sys
+import time
+from functools import lru_cache
+
+import engine
+from simulate import DRAW_N, DRAWS, DROP, GROUPS, NF, PAUSE, PTS, SIM_CODE, STEAL, SWAP, delta_table, is_balanced, sim_codes
+
+BUDGET  = 0.2                   # 每步思考秒數
+UCB_C   = 0.7
+EPSILON = 0.15                  # 模擬時隨機行動的比例
+
+BALANCE_CHASE = 4               # 缺兩類時，補上其中一類的額外價值（bots.HeuristicBot 共用）
+
+@lru_cache(maxsize=1 << 12)
+def chase_table(cnt):
+    # 放牌分數變化，缺兩類以上時補上其中一類另加 BALANCE_CHASE
+    d = list(delta_table(cnt, engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY))
+    missing = [g for g in GROUPS if not any(cnt[k] for k in g)]
+    if len(missing) >= 2:
+        for g in missing:
+            for k in g:
+                if cnt[k] < 2: d[k] += BALANCE_CHASE
+    return d
+
+# ══════════════════════════════════════════════════════════════════
+#  整數模擬器：從任一行動決策點（已抽牌）續跑，規則同 simulate.play
+# ══════════════════════════════════════════════════════════════════
+class Sim:
+    __slots__ = ("n", "deck", "hands", "counts", "scores", "bal", "skip", "turn", "round_count", "countdown",
+                 "last_round", "last_starter", "mode", "mode_val", "over")
+
+    @classmethod
+    def from_gs(cls, gs, hands, deck):
+        s, players = cls(), gs["players"]
+        s.n, s.deck, s.hands = len(players), deck, hands
+        s.counts = [[0] * NF for _ in players]
+        for cnt, p in zip(s.counts, players):
+            for c in p.plate: cnt[c.code] += 1
+        s.scores = [p.plate_score() for p in players]
+        s.bal = [p.is_balanced() for p in players]
+        s.skip = [p.skip_next for p in players]
+        s.turn, s.round_count, s.countdown = gs["turn"], gs["round_count"], gs["countdown_turns"]
+        s.last_round, s.last_starter, s.mode, s.mode_val = gs["last_round"], gs["last_starter"], gs["mode"], gs["mode_val"]
+        s.over = gs["over"]
+        return s
+
+    def moves(self):
+        me, h = self.turn, self.hands[self.turn]
+        if not h: return [("n",)]
+        out = []
+        for k in sorted(set(h)):
+            if k < NF: out.append(("p", k))
+            elif k == DROP:
+                live = [j for j in range(self.n) if self.hands[j] and (j != me or len(h) > 1)]
+                out += [("f", k, j) for j in live] or [("f", k, None)]
+            elif k == PAUSE: out += [("f", k, j) for j in range(self.n) if j != me]
+            else: out.append(("f", k))
+            out.append(("x", k))
+        return out
+
+    def step(self, mv, rng):
+        me, hands = self.turn, self.hands
+        h, op, k = hands[me], mv[0], mv[1] if len(mv) > 1 else None
+        if op == "p":
+            h.remove(k); cnt = self.counts[me]
+            cnt[k] += 1
+            self.scores[me] += PTS[k] + (engine.IMBALANCE_PENALTY if cnt[k] == 3 else 0)
+            if not self.bal[me] and is_balanced(cnt):
+                self.bal[me] = True; self.scores[me] += engine.BALANCED_BONUS
+                if self.mode == "first_plate" and self.countdown is None: self.countdown = self.mode_val * self.n + 1
+        elif op == "x": h.remove(k)
+        elif op == "f":
+            h.remove(k)
+            if k in DRAWS:
+                for _ in range(DRAW_N[k]):
+                    if self.deck: h.append(self.deck.pop())
+            elif k == STEAL:
+                targets = [j for j in range(self.n) if j != me and hands[j]]
+                if targets:
+                    th = hands[targets[rng.randrange(len(targets))]]
+                    h.append(th.pop(rng.randrange(len(th))))
+            elif k == SWAP:
+                hands[:] = hands[-1:] + hands[:-1]
+                h = hands[me]
+            elif k == DROP:
+                th = hands[mv[2]] if mv[2] is not None else None
+                if th: th.pop(rng.randrange(len(th)))
+            elif k == PAUSE: self.skip[mv[2]] = True
+        self.end_turn(me, h)
+
+    def end_turn(self, me, h):
+        n = self.n
+        if not h and not self.last_round and self.countdown is None: self.last_round, self.last_starter = True, me
+        if self.countdown is not None: self.countdown -= 1
+        nxt, mode = (me + 1) % n, self.mode
+        if ((self.countdown is not None and self.countdown <= 0) or (self.last_round and nxt == self.last_starter)
+                or (mode == "allcards" and not self.deck) or (mode == "rounds" and self.round_count >= self.mode_val * n)
+                or (mode == "score" and (max(self.scores) >= self.mode_val or (not self.deck and not any(self.hands))))):
+            self.over = True; return
+        self.round_count += 1
+        if self.skip[nxt]:
+            self.skip[nxt] = False
+            if self.countdown is not None: self.countdown -= 1
+            nxt = (nxt + 1) % n
+        self.turn = nxt
+        if self.deck: self.hands[nxt].append(self.deck.pop())
+
+    def rollout_move(self, rng):
+        # 同 bots.HeuristicBot 的順序（補缺的類別、暫停領先者），加少量隨機
+        me, h = self.turn, self.hands[self.turn]
+        if not h: return ("n",)
+        if rng.random() < EPSILON:
+            mv = self.moves()
+            return mv[rng.randrange(len(mv))]
+        d = chase_table(tuple(self.counts[me]))
+        best = worst = None
+        for k in h:
+            if k < NF:
+                if best is None or d[k] > d[best]: best = k
+                if worst is None or d[k] < d[worst]: worst = k
+        b = d[best] if best is not None else None
+        others = [j for j in range(self.n) if j != me]
+        if b is not None and b >= engine.BALANCED_BONUS: return ("p", best)
+        draw = next((k for k in DRAWS if k in h), None)
+        if draw is not None and len(self.deck) >= 2 and (b is None or b <= 3): return ("f", draw)
+        if PAUSE in h and max(self.scores[j] for j in others) >= self.scores[me]:
+            return ("f", PAUSE, max(others, key=lambda j: (not self.skip[j], self.scores[j])))
+        if b is not None and b > 0: return ("p", best)
+        live = [j for j in others if self.hands[j]]
+        if STEAL in h and live: return ("f", STEAL)
+        if DROP in h and live: return ("f", DROP, max(live, key=lambda j: (len(self.hands[j]), self.scores[j])))
+        if SWAP in h and len(self.hands[(me - 1) % self.n]) >= len(h): return ("f", SWAP)
+        if PAUSE in h: return ("f", PAUSE, max(others, key=lambda j: (not self.skip[j], self.scores[j])))
+        if draw is not None and self.deck: return ("f", draw)
+        if b is not None and b >= 0: return ("p", best)
+        return ("x", worst if worst is not None else h[0])
+
+    def rewards(self):
+        # 勝者平分 1 分，另以分差微調（分數越接近第一名越好）
+        top = max(self.scores)
+        win = [s == top for s in self.scores]
+        share = 1 / sum(win)
+        return [(share if w else 0.0) + (s - top) / 400 for w, s in zip(win, self.scores)]
+
+# ══════════════════════════════════════════════════════════════════
+#  決定化：看不到的牌從未現身的牌中隨機發回
+# ══════════════════════════════════════════════════════════════════
+def unseen_pool(gs, seat):
+    # seat 為 None 時是旁觀者視角（所有手牌都看不到）
+    left = engine.deck_counts(gs.get("ruleset", "full"))
+    seen = (list(gs["players"][seat].hand) if seat is not None else []) + list(gs["discard"])
+    for p in gs["players"]: seen += p.plate
+    for c in seen: left[c.code] -= 1
+    return [SIM_CODE[k] for k, m in enumerate(left) for _ in range(m)]
+
+def determinize(gs, seat, pool, rng):
+    pool = pool[:]
+    rng.shuffle(pool)
+    hands, at = [], 0
+    for i, p in enumerate(gs["players"]):
+        if i == seat: hands.append(sim_codes(p.hand)); continue
+        hands.append(pool[at:at + len(p.hand)]); at += len(p.hand)
+    return Sim.from_gs(gs, hands, pool[at:])
+
+# ══════════════════════════════════════════════════════════════════
+#  搜尋樹
+# ══════════════════════════════════════════════════════════════════
+class Node:
+    __slots__ = ("who", "kids", "n", "w", "avail")
+
+    def __init__(self, who):
+        self.who, self.kids, self.n, self.w, self.avail = who, {}, 0, 0.0, 0
+
+def search(gs, seat, budget=BUDGET, iters=None, rng=None, root_moves=None):
+    """回傳 ({行動: (次數, 平均回報)}, 迭代數)；root_moves 限制根節點可選的行動。"""
+    rng = rng or random.Random()
+    pool, root = unseen_pool(gs, seat), Node(seat)
+    deadline, it = time.perf_counter() + budget, 0
+    while (it < iters) if iters is not None else (time.perf_counter() < deadline or it < 8):
+        it += 1
+        s = determinize(gs, seat, pool, rng)
+        node, path = root, []
+        # 選擇 / 展開
+        while not s.over:
+            moves = s.moves() if node is not root or root_moves is None else root_moves
+            for m in moves:
+                kid = node.kids.get(m)
+                if kid is not None: kid.avail += 1
+            fresh = [m for m in moves if m not in node.kids]
+            if fresh:
+                m = fresh[rng.randrange(len(fresh))]
+                node.kids[m] = kid = Node(s.turn); kid.avail = 1
+                path.append(kid); s.step(m, rng)
+                break
+            m = max(moves, key=lambda m: _ucb(node.kids[m]))
+            node = node.kids[m]; path.append(node); s.step(m, rng)
+        # 模擬
+        while not s.over: s.step(s.rollout_move(rng), rng)
+        r = s.rewards()
+        for nd in path: nd.n += 1; nd.w += r[nd.who]
+    return {m: (k.n, k.w / k.n if k.n else 0.0) for m, k in root.kids.items()}, it
+
+def _ucb(k):
+    return k.w / k.n + UCB_C * math.sqrt(math.log(k.avail) / k.n)
+
+# ══════════════════════════════════════════════════════════════════
+#  電腦玩家
+# ══════════════════════════════════════════════════════════════════
+class MCTSBot:
+    name, label = "mcts", "🧠 強電腦"
+
+    def __init__(self, rng=None, budget=BUDGET):
+        self.rng, self.budget, self.plan, self.last_iters = rng or random.Random(), budget, None, 0
+
+    def choose(self, gs, seat):
+        legal = engine.legal_moves(gs)
+        if len(legal) == 1: return legal[0]
+        phase = gs["phase"]
+        if phase in ("pending_discard_hand", "pending_pause"):
+            if self.plan in legal: return self.plan
+            # 不是自己規劃的（例如真人中途交棒）：只在目標間搜尋
+            k = SIM_CODE[gs["players"][seat].hand[gs["pending_hand_idx"]].code]
+            root = [("f", k, m[1]) for m in legal if m[0] in "tz" and (m[1] != seat or len(gs["players"][seat].hand) > 1)]
+            if not root: return legal[0]
+            best = self._best(gs, seat, root)
+            return ("t" if k == DROP else "z", best[2])
+        best = self._best(gs, seat)
+        hand = sim_codes(gs["players"][seat].hand)
+        if best[0] == "n": return ("n",)
+        i = hand.index(best[1])
+        if best[0] == "f" and len(best) == 3:
+            self.plan = ("t" if best[1] == DROP else "z", best[2]) if best[2] is not None else None
+        return (best[0], i)
+
+    def _best(self, gs, seat, root_moves=None):
+        stats, self.last_iters = search(gs, seat, self.budget, rng=self.rng, root_moves=root_moves)
+        return max(stats, key=lambda m: stats[m][0])
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：Sim 與 engine 逐步比對（用真實手牌與牌堆，不決定化）
+# ══════════════════════════════════════════════════════════════════
+def _to_action_point(gs):
+    while not gs["over"] and (gs["showing_transition"] or gs["phase"] != "action"):
+        engine.apply_move(gs, engine.legal_moves(gs)[0])
+
+def _sim_of(gs):
+    return Sim.from_gs(gs, [sim_codes(p.hand) for p in gs["players"]], sim_codes(gs["deck"]))
+
+def _key(s):
+    return (s.over, s.over or s.turn, [sorted(h) for h in s.hands], s.deck, s.scores, s.skip, s.countdown, s.last_round)
+
+def check(games, seed=0):
+    modes, steps = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}, 0
+    for g in range(games):
+        mode, rng = list(modes)[g % 4], random.Random(~(seed + g))
+        gs = engine.init_game([f"P{i+1}" for i in range(2 + g % 3)], mode, modes[mode], seed=seed + g)
+        _to_action_point(gs)
+        while not gs["over"]:
+            s = _sim_of(gs)
+            mv = rng.choice(s.moves())
+            hand = sim_codes(gs["players"][gs["turn"]].hand)
+            if mv[0] == "n": engine.apply_move(gs, ("n",))
+            else:
+                engine.apply_move(gs, (mv[0], hand.index(mv[1])))
+                if gs["phase"] in ("pending_discard_hand", "pending_pause"):
+                    engine.apply_move(gs, ("t" if mv[1] == DROP else "z", mv[2]))
+            _to_action_point(gs)
+            if mv[:2] not in (("f", STEAL), ("f", DROP)):       # 隨機結果不同，其餘須完全一致
+                s.step(mv, rng)
+                if _key(s) != _key(_sim_of(gs)):
+                    raise AssertionError(f"game {seed + g} {mode} 第 {steps} 步 {mv}：Sim 與 engine 不一致")
+            steps += 1
+    return steps
+
+# ══════════════════════════════════════════════════════════════════
+#  --bench：模擬速度
+# ══════════════════════════════════════════════════════════════════
+def bench(secs=2.0, n=2, seed=0):
+    rng = random.Random(seed)
+    gs = engine.init_game([f"P{i+1}" for i in range(n)], "rounds", 5, seed=seed)
+    _to_action_point(gs)
+    pool, games, t0 = unseen_pool(gs, 0), 0, time.perf_counter()
+    while time.perf_counter() - t0 < secs:
+        s = determinize(gs, 0, pool, rng)
+        while not s.over: s.step(s.rollout_move(rng), rng)
+        games += 1
+    rollouts = games / (time.perf_counter() - t0)
+    _, iters = search(gs, 0, BUDGET, rng=rng)
+    return rollouts, iters
+
+if __name__ == "__main__":
+    if "--check" in sys.argv:
+        n = int(sys.argv[sys.argv.index("--check") + 1])
+        print(f"✅ {n} 局 / {check(n):,} 步：Sim 與 engine 逐步一致"); sys.exit()
+    secs = float(sys.argv[sys.argv.index("--bench") + 1]) if "--bench" in sys.argv else 2.0
+    rollouts, iters = bench(secs)
+    print(f"2 人回合模式開局：每秒約 {rollouts:,.0f} 局模擬；{BUDGET * 1000:.0f} ms 預算約 {iters:,} 次迭代")
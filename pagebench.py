@@ -0,0 +1,174 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 頁面重跑成本（AppTest）
+
+以 Streamlit 測試 API 無頭執行 app.py 的 main()，照劇本走完整局：設定 → 過場 → 抽牌 → 行動 → 結算，
+每頁記錄重跑耗時（含 / 不含 AppTest 開銷）、送出的元素數、ForwardMsg 位元組數與其中 style="…" 行內樣式的位元組數；
+點擊（含換頁）與原地重畫分開記。另外把 2 / 3 / 4 人的餐盤塞滿（每人 FULL_PLATE 張）後量行動頁，這是最重的畫面。
+
+    python pagebench.py                          # 2–4 人各 2 局 + 滿餐盤行動頁
+    python pagebench.py --games 5 --repeat 20
+    python pagebench.py --out pages.json         # 另存 JSON（每頁中位數）
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import sys
+import time
+
+import engine
+from bots import make_bot
+
+FULL_PLATE = 10                 # 兩排各 5 張
+REPEAT     = 10
+STYLE_RE   = re.compile(r'style="[^"]*"')
+APP        = os.path.join(os.path.dirname(os.path.abspath(__file__)), "app.py")   # 不受工作目錄影響
+
+UI_BUTTONS = {"e": "✅ 我是", "d": "🃏  抽  一  張  牌", "s": "⚡ 直接行動", "p": "🍽️ 放入餐盤", "f": "✨ 使用功能牌",
+              "x": "🗑️ 丟掉不用", "n": "⏭️ 跳過本回合", "c": "取消", "k": "✅ 我確認完畢，換下一位", "a": "✅ 收到！全軍備戰，繼續遊戲！"}
+
+# ══════════════════════════════════════════════════════════════════
+#  計數：所有元素訊息都經過 ScriptRunContext.enqueue
+# ══════════════════════════════════════════════════════════════════
+class Meter:
+    def __init__(self):
+        from streamlit.runtime.scriptrunner_utils.script_run_context import ScriptRunContext
+        self.elements = self.bytes = self.style = 0
+        orig = ScriptRunContext.enqueue
+        def counting(ctx, msg):
+            orig(ctx, msg)
+            self.bytes += msg.ByteSize()
+            if msg.WhichOneof("type") != "delta": return
+            self.elements += 1
+            body = msg.delta.new_element.markdown.body
+            if body: self.style += sum(len(m) for m in STYLE_RE.findall(body))
+        ScriptRunContext.enqueue = counting
+
+    def measure(self, at, fn):
+        # ms 含 AppTest 本身的開銷；script_ms 取 app.main() 自己記的整頁重跑耗時（點擊換頁會有兩次重跑）
+        log = _perf(at)
+        e0, b0, s0 = self.elements, self.bytes, self.style
+        t0 = time.perf_counter()
+        fn()
+        ms, log = (time.perf_counter() - t0) * 1000, _perf(at)
+        return dict(ms=ms, script_ms=sum(log), elements=self.elements - e0,
+                    bytes=self.bytes - b0, style=self.style - s0)
+
+def _perf(at):
+    log = at.session_state.perf["full"] if "perf" in at.session_state else []
+    out = list(log)
+    if out: log.clear()
+    return out
+
+def page_of(at) -> str:
+    # 與 app.route() 相同的判斷順序
+    if at.session_state.page == "setup": return "setup"
+    gs = at.session_state.gs
+    if gs["over"]: return "result"
+    if gs["showing_transition"]: return "transition"
+    if gs["phase"] == "alert_first_plate": return "alert_first_plate"
+    return "draw" if gs["phase"] == "draw_screen" else "action"
+
+def _check(at):
+    if at.exception: raise AssertionError(at.exception[0].message)
+
+def click(at, move):
+    """在 AppTest 上按下 move 對應的按鈕並重跑（選牌須先另外點；delta.py --bench 共用）。"""
+    op = move[0]
+    if op == "t":   at.button(key=f"dh_{move[1]}").click().run()
+    elif op == "z": at.button(key=f"pause_{move[1]}").click().run()
+    else:
+        btn = next((b for b in at.button if b.label.startswith(UI_BUTTONS[op])), None)
+        if btn is None: raise AssertionError(f"找不到 {move} 的按鈕：{[b.label for b in at.button]}")
+        btn.click().run()
+    _check(at)
+
+def _start(n):
+    from streamlit.testing.v1 import AppTest
+    at = AppTest.from_file(APP, default_timeout=60).run()
+    _check(at)
+    at.slider(key="setup_num").set_value(n).run()
+    return at
+
+# ══════════════════════════════════════════════════════════════════
+#  整局劇本：電腦決定走哪一步，實際點擊對應按鈕
+#  每次點擊記為 click.<點擊時的頁面>（含 st.rerun() 前的半頁與換頁後的整頁），
+#  再原地重跑一次記為 <頁面>（單純重畫這一頁的成本）
+# ══════════════════════════════════════════════════════════════════
+def play(meter, n, rows, seed=0):
+    at = _start(n)
+    rows.append(dict(page="setup", players=n, **meter.measure(at, lambda: at.run())))
+    r = meter.measure(at, lambda: next(b for b in at.button if "開始遊戲" in b.label).click().run()); _check(at)
+    rows.append(dict(page="click.setup", players=n, **r))
+    bot, gs = make_bot("greedy", random.Random(seed)), at.session_state.gs
+    while True:
+        page = page_of(at)
+        r = meter.measure(at, lambda: at.run()); _check(at)
+        rows.append(dict(page=page, players=n, **r))
+        if gs["over"]: return
+        move = bot.choose(gs, gs["turn"])
+        # 選牌在瀏覽器是片段重跑，AppTest 卻會整頁重跑，不計入
+        if move[0] in "pfx" and at.session_state.sel != move[1]: at.button(key=f"hsel_{move[1]}").click().run()
+        r = meter.measure(at, lambda: click(at, move))
+        gs = at.session_state.gs
+        rows.append(dict(page=f"click.{page}", players=n, **r))
+
+def fill_plates(gs, size=FULL_PLATE):
+    # 從牌堆（不夠再從棄牌堆）取食物牌放進各人餐盤，牌的編號維持唯一；經 add_to_plate 才會更新分數與均衡徽章
+    pool = [c for c in gs["deck"] + gs["discard"] if c.kind == "food"]
+    taken = set()
+    for p in gs["players"]:
+        while len(p.plate) < size and pool:
+            c = pool.pop(); p.add_to_plate(c); taken.add(c.cid)
+    gs["deck"] = [c for c in gs["deck"] if c.cid not in taken]
+    gs["discard"] = [c for c in gs["discard"] if c.cid not in taken]
+
+def full_plates(meter, n, rows, repeat=REPEAT):
+    at = _start(n)
+    next(b for b in at.button if "開始遊戲" in b.label).click().run()
+    while page_of(at) != "action":              # 過場 → 抽牌 → 行動
+        click(at, engine.legal_moves(at.session_state.gs)[0])
+    gs = at.session_state.gs
+    fill_plates(gs)
+    at.session_state.gs = gs
+    for _ in range(repeat):
+        r = meter.measure(at, lambda: at.run()); _check(at)
+        rows.append(dict(page="action.full", players=n, **r))
+
+def summarize(rows):
+    groups = {}
+    for r in rows: groups.setdefault((r["page"], r["players"]), []).append(r)
+    med = lambda rs, k: statistics.median(r[k] for r in rs)
+    return {f"{page}.{n}p": dict(reruns=len(rs), ms=med(rs, "ms"), script_ms=med(rs, "script_ms"), elements=med(rs, "elements"),
+                                   bytes=med(rs, "bytes"), style=med(rs, "style"))
+            for (page, n), rs in sorted(groups.items())}
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 頁面重跑成本（AppTest）")
+    ap.add_argument("--games", type=int, default=2, help="每種人數走幾局完整劇本")
+    ap.add_argument("--repeat", type=int, default=REPEAT, help="滿餐盤行動頁重跑次數")
+    ap.add_argument("--players", type=int, nargs="+", default=[2, 3, 4], choices=[2, 3, 4])
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", help="另存各頁中位數 JSON")
+    args = ap.parse_args(argv)
+    import logging
+    logging.disable(logging.WARNING)            # 無頭執行時 Streamlit 各處的警告（AppTest 會依設定重設各 logger 層級）
+    os.environ.setdefault("INSPECTOR_STORE", "none")
+    meter, rows = Meter(), []
+    for n in args.players:
+        for g in range(args.games): play(meter, n, rows, args.seed + g)
+        full_plates(meter, n, rows, args.repeat)
+    result = summarize(rows)
+    print(f"{'頁面':<24}{'次數':>6}{'中位 ms':>10}{'腳本 ms':>10}{'元素':>8}{'位元組':>10}{'行內樣式':>10}")
+    for name, d in result.items():
+        print(f"{name:<26}{d['reruns']:>6}{d['ms']:>10.1f}{d['script_ms']:>10.1f}{d['elements']:>8.0f}{d['bytes']:>10,.0f}{d['style']:>10,.0f}")
+    if args.out:
+        with open(args.out, "w", encoding="utf-8") as f: json.dump(result, f, ensure_ascii=False, indent=1)
+        print(f"已存：{args.out}")
+
+if __name__ == "__main__":
+    sys.exit(main())
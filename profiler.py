@@ -0,0 +1,149 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 重跑剖析器（選用）
+
+設定環境變數 INSPECTOR_PROFILE=1 後啟動，才會包裝各 page_* / render_* / 引擎行動；
+未開啟時 timed() 直接回傳原函式，沒有任何額外成本。
+
+每次重跑（整頁或片段）記錄：總耗時、送出的元素數與位元組數，以及各區段的
+呼叫次數 / 耗時 / 元素數（含巢狀）。
+  * 每個工作階段的時間軸存在 st.session_state["profile"]，網址加 ?profile=1 可檢視與下載
+  * 全行程最慢的 TOP_N 次重跑與各區段累計，定期寫入 INSPECTOR_PROFILE_OUT（預設 profile.json）
+
+    INSPECTOR_PROFILE=1 streamlit run app.py
+    INSPECTOR_PROFILE=1 INSPECTOR_PROFILE_OUT=/var/log/inspector.json streamlit run app.py
+"""
+import atexit
+import functools
+import heapq
+import json
+import os
+import threading
+import time
+from collections import deque
+
+import streamlit as st
+
+ENABLED  = os.environ.get("INSPECTOR_PROFILE", "") not in ("", "0")
+OUT      = os.environ.get("INSPECTOR_PROFILE_OUT", "profile.json")
+TOP_N    = 20
+TIMELINE = 500        # 每個工作階段保留的重跑筆數
+DUMP_SEC = 5.0        # 寫檔節流
+
+# ══════════════════════════════════════════════════════════════════
+#  單次重跑紀錄
+# ══════════════════════════════════════════════════════════════════
+class Rerun:
+    __slots__ = ("root", "t", "ms", "elements", "bytes", "spans")
+
+    def __init__(self, root):
+        self.root, self.t = root, time.time()
+        self.ms, self.elements, self.bytes = 0.0, 0, 0
+        self.spans = {}                         # name -> [calls, ms, elements]
+
+    def span(self, name, ms, elements):
+        s = self.spans.setdefault(name, [0, 0.0, 0])
+        s[0] += 1; s[1] += ms; s[2] += elements
+
+    def as_dict(self):
+        return dict(root=self.root, t=round(self.t, 3), ms=round(self.ms, 3), elements=self.elements,
+                    bytes=self.bytes, spans={k: dict(calls=c, ms=round(m, 3), elements=e)
+                                             for k, (c, m, e) in sorted(self.spans.items(), key=lambda kv: -kv[1][1])})
+
+# Streamlit 每個工作階段在自己的執行緒跑腳本
+_local = threading.local()
+_lock = threading.Lock()
+_slowest = []                                   # min-heap of (ms, seq, dict)
+_totals = {}                                    # name -> [calls, ms, elements]
+_state = {"seq": 0, "reruns": 0, "dumped": 0.0}
+
+def _ctx():
+    try:
+        from streamlit.runtime.scriptrunner import get_script_run_ctx
+        return get_script_run_ctx(suppress_warning=True)
+    except Exception:
+        return None
+
+def _start(root):
+    rec = _local.rec = Rerun(root)
+    ctx = _ctx()
+    if ctx is not None:
+        # 計算真正送往前端的 delta 訊息（已扣除快取參照）
+        send = ctx._enqueue
+        def counting(msg):
+            if msg.WhichOneof("type") == "delta": rec.elements += 1
+            rec.bytes += msg.ByteSize()
+            send(msg)
+        ctx._enqueue = counting
+        _local.restore = (ctx, send)
+    return rec
+
+def _finish(rec):
+    ctx, send = getattr(_local, "restore", (None, None))
+    if ctx is not None: ctx._enqueue = send
+    _local.rec = _local.restore = None
+    d = rec.as_dict()
+    try:
+        st.session_state.setdefault("profile", deque(maxlen=TIMELINE)).append(d)
+    except Exception:
+        pass
+    with _lock:
+        _state["seq"] += 1; _state["reruns"] += 1
+        item = (rec.ms, _state["seq"], d)
+        if len(_slowest) < TOP_N: heapq.heappush(_slowest, item)
+        elif rec.ms > _slowest[0][0]: heapq.heapreplace(_slowest, item)
+        for name, (c, m, e) in rec.spans.items():
+            t = _totals.setdefault(name, [0, 0.0, 0])
+            t[0] += c; t[1] += m; t[2] += e
+        due = time.time() - _state["dumped"] >= DUMP_SEC
+        if due: _state["dumped"] = time.time()
+    if due and OUT: dump(OUT)
+
+# ══════════════════════════════════════════════════════════════════
+#  對外介面
+# ══════════════════════════════════════════════════════════════════
+def timed(name):
+    """包裝函式：在重跑內記為區段；若目前沒有重跑紀錄（如片段單獨重跑），自成一筆。"""
+    def deco(fn):
+        if not ENABLED: return fn
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            rec = getattr(_local, "rec", None)
+            root = rec is None
+            if root: rec = _start(name)
+            e0, t0 = rec.elements, time.perf_counter()
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                ms = (time.perf_counter() - t0) * 1000
+                rec.span(name, ms, rec.elements - e0)
+                if root: rec.ms = ms; _finish(rec)
+        return wrapper
+    return deco
+
+def summary():
+    with _lock:
+        slow = [d for _, _, d in sorted(_slowest, reverse=True)]
+        totals = {k: dict(calls=c, ms=round(m, 3), elements=e, avg_ms=round(m / c, 4))
+                  for k, (c, m, e) in sorted(_totals.items(), key=lambda kv: -kv[1][1])}
+        return dict(pid=os.getpid(), reruns=_state["reruns"], slowest=slow, totals=totals)
+
+def dump(path):
+    tmp = f"{path}.{os.getpid()}.tmp"
+    with open(tmp, "w", encoding="utf-8") as f:
+        json.dump(summary(), f, ensure_ascii=False, indent=1)
+    os.replace(tmp, path)
+
+if ENABLED and OUT: atexit.register(lambda: _state["reruns"] and dump(OUT))
+
+def panel():
+    """?profile=1 時在頁尾顯示本工作階段最近的重跑與下載鈕。"""
+    if not ENABLED or not st.query_params.get("profile"): return
+    timeline = list(st.session_state.get("profile", ()))
+    with st.expander(f"⏱️ 剖析（本工作階段 {len(timeline)} 次重跑）"):
+        for d in timeline[-10:][::-1]:
+            top = "、".join(f"{k} {v['ms']:.1f}ms×{v['calls']}" for k, v in list(d["spans"].items())[1:4])
+            st.caption(f"{d['root']} {d['ms']:.1f} ms ／ {d['elements']} 元素 ／ {d['bytes']:,} B — {top}")
+        st.download_button("下載時間軸 JSON", json.dumps(timeline, ensure_ascii=False), "timeline.json", "application/json")
@@ -0,0 +1,164 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 對局紀錄與重播
+
+engine.py 的每個行動都會在 gs["log"] 追加一筆 (op, *args)，亂數結果（偷牌、隨機棄牌）
+另記 ("r", 目標, 手牌位置)。紀錄加上 seed 與規則常數即可在無 UI 的情況下重建任一時點的 gs：
+洗牌由 seed 重現，其餘亂數直接套用紀錄中的結果，因此不受亂數流交錯影響。
+
+    python replay.py game.log               # 重播到終局並列出分數
+    python replay.py game.log --upto 40     # 只重播前 40 筆
+    python replay.py --check 500            # 隨機對局 → 紀錄 → 重播，逐局比對並測速
+"""
+import argparse
+import json
+import random
+import sys
+import time
+
+import engine
+
+LOG_VERSION = 1
+
+# op → (engine 函式, 參數個數)
+OPS = engine.ACTIONS
+
+def rules():
+    return [engine.FOOD_PER_CAT, engine.FUNC_PER_TYPE, engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY, engine.INIT_HAND]
+
+# ══════════════════════════════════════════════════════════════════
+#  序列化：第一行 JSON 標頭，第二行以空白分隔的紀錄（p2、r1.3 …）
+# ══════════════════════════════════════════════════════════════════
+def header(gs):
+    if gs.get("seed") is None: raise ValueError("此局以外部 rng 建立，沒有 seed，無法重播")
+    return dict(v=LOG_VERSION, seed=gs["seed"], mode=gs["mode"], mode_val=gs["mode_val"],
+                names=[p.name for p in gs["players"]], rules=rules(), ruleset=gs.get("ruleset", "full"))
+
+def dumps(gs) -> str:
+    ops = " ".join(e[0] + ".".join(map(str, e[1:])) for e in gs["log"])
+    return json.dumps(header(gs), ensure_ascii=False) + "\n" + ops + "\n"
+
+def loads(text: str):
+    head, _, body = text.partition("\n")
+    hdr = json.loads(head)
+    if hdr.get("v") != LOG_VERSION: raise ValueError(f"不支援的紀錄版本 {hdr.get('v')}")
+    log = [(tok[0], *map(int, tok[1:].split("."))) if len(tok) > 1 else (tok,) for tok in body.split()]
+    return hdr, log
+
+# ══════════════════════════════════════════════════════════════════
+#  重播
+# ══════════════════════════════════════════════════════════════════
+class _Scripted:
+    # 以紀錄中的亂數結果取代 rng.choice
+    __slots__ = ("queue",)
+    def __init__(self): self.queue = []
+    def choice(self, seq): return self.queue.pop(0)(seq)
+
+def states(hdr, log):
+    """先 yield (0, 初始 gs)，之後每個行動後 yield (已套用筆數, gs)；gs 為同一物件，需要保留請自行複製。"""
+    if hdr["rules"] != rules():
+        raise ValueError(f"規則常數不同：紀錄 {hdr['rules']}，目前 {rules()}")
+    gs = engine.init_game(hdr["names"], hdr["mode"], hdr["mode_val"], seed=hdr["seed"], ruleset=hdr.get("ruleset", "full"))
+    scripted = gs["rng"] = _Scripted()
+    yield 0, gs
+    for k, entry in enumerate(log):
+        op = entry[0]
+        if op == "r": continue
+        fn, argc = OPS[op]
+        nxt = log[k + 1] if k + 1 < len(log) else ()
+        if nxt and nxt[0] == "r":
+            ti, idx = nxt[1], nxt[2]
+            scripted.queue = ([lambda s: next(x for x in s if x[0] == ti)] if op == "f" else []) + [lambda s: s[idx]]
+        fn(gs, *entry[1:1 + argc])
+        done = k + 2 if nxt and nxt[0] == "r" else k + 1
+        if gs["log"][k:] != log[k:done]:
+            raise ValueError(f"重播在第 {k} 筆 {entry} 分歧：{gs['log'][k:]} ≠ {log[k:done]}")
+        yield done, gs
+
+def replay(hdr, log, upto=None):
+    """重建套用前 upto 筆紀錄後的 gs（預設全部）。"""
+    if upto is not None and upto < len(log) and log[upto][0] == "r": upto += 1   # 亂數結果跟著行動走
+    for _, gs in states(hdr, log if upto is None else log[:upto]): pass
+    return gs
+
+def state_key(gs):
+    # 比對用指紋：牌的位置與所有回合狀態
+    return (tuple((tuple(c.cid for c in p.hand), tuple(c.cid for c in p.plate), p.skip_next) for p in gs["players"]),
+            tuple(c.cid for c in gs["deck"]), tuple(c.cid for c in gs["discard"]),
+            gs["turn"], gs["phase"], gs["over"], gs["end_code"], gs["round_count"], gs["countdown_turns"],
+            gs["last_round"], gs["last_starter"], gs["pending_hand_idx"], gs["showing_transition"], gs["msg"])
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：隨機合法行動跑完整局，再由紀錄重播比對
+# ══════════════════════════════════════════════════════════════════
+def random_step(gs, rng):
+    ci, phase, players = gs["turn"], gs["phase"], gs["players"]
+    me = players[ci]
+    if gs["showing_transition"]:        return engine.end_transition(gs)
+    if phase == "draw_screen":          return engine.action_draw(gs) if gs["deck"] else engine.skip_draw(gs)
+    if phase == "alert_first_plate":    return engine.ack_first_plate(gs)
+    if phase == "confirm_draw":         return engine.confirm_draw(gs)
+    if phase == "pending_discard_hand":
+        if rng.random() < 0.1: return engine.cancel_pending(gs)
+        return engine.resolve_discard_hand(gs, rng.choice([i for i, p in enumerate(players) if p.hand]))
+    if phase == "pending_pause":
+        if rng.random() < 0.1: return engine.cancel_pending(gs)
+        return engine.resolve_pause(gs, rng.choice([i for i in range(len(players)) if i != ci]))
+    if not me.hand:                     return engine.action_pass(gs)
+    i = rng.randrange(len(me.hand))
+    if rng.random() < 0.2:              return engine.action_discard(gs, i)
+    return (engine.action_place if me.hand[i].kind == "food" else engine.action_use_func)(gs, i)
+
+def check(games, n=3, seed=0):
+    names = [f"P{i+1}" for i in range(n)]
+    modes = ("rounds", "allcards", "score", "first_plate")
+    vals  = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}
+    entries, t_replay = 0, 0.0
+    for g in range(games):
+        mode = modes[g % len(modes)]
+        # 策略用另一條亂數流，與局內亂數交錯也不影響重播
+        rulesets = tuple(engine.RULESETS)
+        gs = engine.init_game(names, mode, vals[mode], seed=seed + g, ruleset=rulesets[g % len(rulesets)])
+        rng = random.Random(~(seed + g))
+        keys = [state_key(gs)]
+        while not gs["over"]:
+            random_step(gs, rng)
+            keys.append(state_key(gs))
+        hdr, log = loads(dumps(gs))
+        got = [state_key(s) for _, s in states(hdr, log)]
+        if got != keys:
+            k = next((i for i, (a, b) in enumerate(zip(got, keys)) if a != b), min(len(got), len(keys)))
+            raise AssertionError(f"game {seed + g}: 重播第 {k} 步狀態不同")
+        t0 = time.perf_counter()
+        replay(hdr, log)
+        t_replay += time.perf_counter() - t0
+        entries += len(log)
+    return entries, t_replay
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 對局重播")
+    ap.add_argument("log", nargs="?", help="replay.dumps() 產生的紀錄檔")
+    ap.add_argument("--upto", type=int, help="只套用前 N 筆紀錄")
+    ap.add_argument("-p", "--players", type=int, default=3, choices=(2, 3, 4))
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", type=int, metavar="GAMES", help="隨機對局重播比對後結束")
+    args = ap.parse_args(argv)
+
+    if args.check:
+        t0 = time.perf_counter()
+        entries, t_replay = check(args.check, args.players, args.seed)
+        print(f"✅ {args.check} 局 / {entries:,} 筆紀錄重播一致"
+              f"（重播 {entries / t_replay:,.0f} 筆/秒，總耗時 {time.perf_counter() - t0:.1f} 秒）")
+        return
+    if not args.log: ap.error("請指定紀錄檔或 --check")
+    with open(args.log, encoding="utf-8") as f:
+        hdr, log = loads(f.read())
+    gs = replay(hdr, log, args.upto)
+    print(f"seed={hdr['seed']} {hdr['mode']}({hdr['mode_val']}) 規則組 {gs['ruleset']}  已套用 {len(log) if args.upto is None else min(args.upto, len(log))}/{len(log)} 筆"
+          f"  階段={gs['phase']}  輪到={gs['players'][gs['turn']].name}")
+    for p in gs["players"]:
+        print(f"  {p.name}: {p.plate_score():>3} 分  手牌 {len(p.hand)}  餐盤 {' '.join(c.emoji for c in p.plate)}")
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,300 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — WebSocket 對局服務（asyncio）
+
+與 Streamlit 版並存的另一個前端入口：一個行程以 tables.Registry 開多張牌桌，客戶端以 JSON
+訊息行動，伺服器驗證後套用 engine 行動，再對同桌每個連線推送該座位看得到的行動差異（delta.py）。
+
+  → {"op": "create", "names": [...], "mode": "rounds", "mode_val": 5, "ruleset": "full"}  ← {"t": "created", "table": key}
+  → {"op": "join", "table": key, "seat": 0, "me": 選填}               ← {"t": "welcome", "seat", "me", "cards", "v", "board", "events"}
+  → {"op": "act", "move": ["p", 2], "v": 目前版本}                     ← 同桌每個連線 {"t": "delta", "v", "ops": [...]}
+  ← {"t": "error", "msg": ...}
+
+move 的代號同對局紀錄（engine.ACTIONS）；牌以 cid 表示，cards[cid] 為類別編號（engine.CATS）；
+board 與 ops 的格式見 delta.py。
+
+    python server.py --port 8765
+    python server.py --bench 200        # 行程內客戶端同時跑 200 桌，量測每步延遲
+"""
+import argparse
+import asyncio
+import json
+import random
+import secrets
+import sys
+import time
+from typing import Dict, Set
+
+from websockets.asyncio.client import connect
+from websockets.asyncio.server import serve
+from websockets.exceptions import ConnectionClosed
+
+import codec
+import delta
+import engine
+import tables
+
+def _dumps(msg): return json.dumps(msg, ensure_ascii=False, separators=(",", ":"))
+
+# ══════════════════════════════════════════════════════════════════
+#  服務
+# ══════════════════════════════════════════════════════════════════
+CARDS = [c.code for c in codec.card_table(engine.FOOD_PER_CAT, engine.FUNC_PER_TYPE)]
+MODE_VAL_MAX = dict(rounds=0xFFFF, score=0xFFFF, first_plate=0x7FFF - 1, allcards=0)
+
+class ServiceError(Exception):
+    pass
+
+class Conn:
+    __slots__ = ("ws", "table", "seat", "me")
+    def __init__(self, ws): self.ws, self.table, self.seat, self.me = ws, None, None, None
+
+class Server:
+    def __init__(self, registry=None):
+        self.registry = registry or tables.Registry()
+        self.conns: Dict[str, Set[Conn]] = {}
+        self.moves, self.bytes_out, self.busy = 0, 0, 0.0
+
+    async def handler(self, ws):
+        conn = Conn(ws)
+        try:
+            async for raw in ws:
+                try:
+                    msg = json.loads(raw)
+                    if not isinstance(msg, dict): raise ServiceError(f"訊息須為 JSON 物件：{raw[:40]!r}")
+                    reply = getattr(self, "on_" + str(msg.get("op")), None)
+                    if reply is None: raise ServiceError(f"未知的 op {msg.get('op')!r}")
+                    await reply(conn, msg)
+                except (ServiceError, ValueError, KeyError, TypeError, IndexError) as e:
+                    await self.send(conn, {"t": "error", "msg": str(e)})
+        except ConnectionClosed:
+            pass
+        finally:
+            if conn.table: self.conns.get(conn.table, set()).discard(conn)
+
+    async def send(self, conn, msg):
+        data = _dumps(msg)
+        self.bytes_out += len(data.encode())
+        try: await conn.ws.send(data)
+        except ConnectionClosed: pass
+
+    async def on_create(self, conn, msg):
+        names, mode = [str(n) for n in msg["names"]], msg.get("mode", "rounds")
+        if not 2 <= len(names) <= 4 or len(set(names)) < len(names): raise ServiceError("需要 2~4 位不重複的玩家")
+        if mode not in codec.MODES: raise ServiceError(f"未知的模式 {mode!r}")
+        ruleset = msg.get("ruleset", "full")
+        if ruleset not in engine.RULESETS: raise ServiceError(f"未知的規則組 {ruleset!r}")
+        mode_val = msg.get("mode_val", 0)
+        if type(mode_val) is not int: raise ServiceError(f"mode_val 須為整數：{mode_val!r}")
+        # 除了 allcards，mode_val 是回合數 / 目標分數 / 倒數輪數，0 或負數會讓對局一開始就結束（或永不結束）；
+        # 上限依 codec 欄位寬度：rounds 的 round_count 會數到 mode_val·n（uint16），first_plate 的倒數為 mode_val·n+1（int16）
+        top = MODE_VAL_MAX[mode] // (1 if mode == "score" else len(names))
+        if mode != "allcards" and not 0 < mode_val <= top: raise ServiceError(f"{mode} 的 mode_val 須為 1~{top}：{mode_val}")
+        t = self.registry.create(names, mode, mode_val if mode != "allcards" else 0, ruleset=ruleset)
+        with t.lock:
+            if t.gs["showing_transition"]: t.act(engine.end_transition)
+        await self.send(conn, {"t": "created", "table": t.key})
+
+    async def on_join(self, conn, msg):
+        t = self.registry.get(str(msg["table"]))
+        if t is None: raise ServiceError("找不到牌桌")
+        seat, me = int(msg["seat"]), str(msg.get("me") or secrets.token_urlsafe(6))
+        with t.lock:
+            if not 0 <= seat < len(t.gs["players"]): raise ServiceError(f"沒有座位 {seat}")
+            if not t.claim(seat, me): raise ServiceError("座位已有人")
+            if conn.table: self.conns.get(conn.table, set()).discard(conn)
+            conn.table, conn.seat, conn.me = t.key, seat, me
+            welcome = {"t": "welcome", "seat": seat, "me": me, "cards": CARDS, "v": t.version,
+                       "board": delta.board(t.gs, seat), "events": t.news + t.gs["events"]}
+        self.conns.setdefault(t.key, set()).add(conn)
+        await self.send(conn, welcome)
+
+    async def on_act(self, conn, msg):
+        t = conn.table and self.registry.get(conn.table)
+        if t is None: raise ServiceError("尚未加入牌桌")
+        move, t0 = msg["move"], time.perf_counter()
+        # 先檢查型別再比對 legal_moves：2.0 == 2 會通過比對，卻在寫入紀錄後才於執行時出錯
+        if (type(move) is not list or not move or move[0] not in engine.ACTIONS
+                or any(type(a) is not int for a in move[1:])):
+            raise ServiceError(f"行動格式錯誤 {move!r}")
+        move = tuple(move)
+        with t.lock:
+            gs = t.gs
+            if "v" in msg and msg["v"] != t.version: raise ServiceError(f"畫面已過期（v{msg['v']} ≠ v{t.version}）")
+            if gs["turn"] != conn.seat or gs["over"]: raise ServiceError("還沒輪到你")
+            if move not in engine.legal_moves(gs): raise ServiceError(f"不合法的行動 {list(move)}")
+            before = delta.snapshot(gs)
+            t.act(engine.apply_move, move)
+            ops = delta.diff(before, gs)
+            if gs["showing_transition"] and not gs["over"]:
+                # 各自看自己的畫面，換人時直接結束過場（同 app 的多裝置同桌）
+                t.news = list(gs["events"]); gs["events"].clear()
+                t.act(engine.end_transition)
+            self.moves += 1
+            out = [(c, {"t": "delta", "v": t.version, "ops": delta.for_seat(ops, c.seat)}) for c in self.conns.get(t.key, ())]
+        self.busy += time.perf_counter() - t0
+        await asyncio.gather(*(self.send(c, m) for c, m in out))
+
+async def start(host="127.0.0.1", port=0, registry=None):
+    """啟動服務，回傳 (Server, websockets 伺服器)；port=0 由系統指定。"""
+    srv = Server(registry)
+    ws = await serve(srv.handler, host, port, compression=None)
+    return srv, ws
+
+# ══════════════════════════════════════════════════════════════════
+#  行程內客戶端（測試 / 基準用）
+# ══════════════════════════════════════════════════════════════════
+class Client:
+    def __init__(self, ws):
+        self.ws, self.seat, self.me, self.cards, self.board, self.v = ws, None, None, None, None, -1
+        self.events = []
+
+    @classmethod
+    async def connect(cls, url): return cls(await connect(url, compression=None))
+
+    async def recv(self):
+        msg = json.loads(await self.ws.recv())
+        if msg["t"] == "error": raise ServiceError(msg["msg"])
+        if msg["t"] == "welcome":
+            self.seat, self.me, self.cards, self.board, self.v = msg["seat"], msg["me"], msg["cards"], msg["board"], msg["v"]
+            self.events = msg["events"]
+        elif msg["t"] == "delta":
+            delta.apply(self.board, msg["ops"]); self.v = msg["v"]
+            self.events += [op[1] for op in msg["ops"] if op[0] == "e"]
+        return msg
+
+    async def call(self, **msg):
+        await self.ws.send(_dumps(msg))
+        return await self.recv()
+
+    async def create(self, names, mode="rounds", mode_val=5):
+        return (await self.call(op="create", names=names, mode=mode, mode_val=mode_val))["table"]
+
+    async def join(self, table, seat): return await self.call(op="join", table=table, seat=seat, me=self.me)
+    async def act(self, *move): return await self.call(op="act", move=list(move), v=self.v)
+
+    async def close(self): await self.ws.close()
+
+    @property
+    def f(self): return self.board["f"]
+    @property
+    def my_turn(self): return self.f["turn"] == self.seat and not self.f["over"]
+
+def board_move(b, seat, cards, rng):
+    # 只看客戶端畫面就能決定的隨機合法行動（基準用，與 replay.random_step 同分布）
+    phase, z, n = b["f"]["phase"], b["zones"], len(b["players"])
+    if phase == "draw_screen":          return ("d",) if z["d"] else ("s",)
+    if phase == "alert_first_plate":    return ("a",)
+    if phase == "confirm_draw":         return ("k",)
+    if phase == "pending_discard_hand":
+        if rng.random() < 0.1: return ("c",)
+        return ("t", rng.choice([i for i in range(n) if z[f"h{i}"]]))
+    if phase == "pending_pause":
+        return ("z", rng.choice([i for i in range(n) if i != seat]))
+    hand = z[f"h{seat}"]
+    if not hand: return ("n",)
+    i = rng.randrange(len(hand))
+    if rng.random() < 0.2: return ("x", i)
+    return ("p" if engine.KINDS[cards[hand[i]]] == "food" else "f", i)
+
+# ══════════════════════════════════════════════════════════════════
+#  --bench / --check：行程內伺服器 + 客戶端同時跑多桌
+# ══════════════════════════════════════════════════════════════════
+async def _play_table(url, n, seed, lat):
+    rng = random.Random(seed)
+    host = await Client.connect(url)
+    key = await host.create([f"P{i+1}" for i in range(n)])
+    clients = [host] + [await Client.connect(url) for _ in range(n - 1)]
+    for seat, c in enumerate(clients): await c.join(key, seat)
+    # 其他座位的推送在對方回合結束後才讀，保持每個連線依序處理
+    while not host.f["over"]:
+        cur = next(c for c in clients if c.my_turn)
+        t0 = time.perf_counter()
+        await cur.act(*board_move(cur.board, cur.seat, cur.cards, rng))
+        lat.append(time.perf_counter() - t0)
+        for c in clients:
+            while c is not cur and c.v < cur.v: await c.recv()
+    for c in clients: await c.close()
+    return key, clients
+
+async def bench(n_tables, n=2, seed=0, check=False):
+    srv, ws = await start()
+    url = f"ws://127.0.0.1:{ws.sockets[0].getsockname()[1]}"
+    lat = []
+    t0 = time.perf_counter()
+    results = await asyncio.gather(*(_play_table(url, n, seed + i, lat) for i in range(n_tables)))
+    elapsed = time.perf_counter() - t0
+    if check:
+        import replay
+        for key, clients in results:
+            t = srv.registry.get(key)
+            with t.lock:
+                for c in clients:
+                    if c.board != delta.board(t.gs, c.seat): raise AssertionError(f"牌桌 {key} 座位 {c.seat}: 差異套用後與伺服器畫面不同")
+                hdr, log = replay.loads(replay.dumps(t.gs))
+                if replay.state_key(replay.replay(hdr, log)) != replay.state_key(t.gs): raise AssertionError(f"牌桌 {key}: 與紀錄重播不一致")
+        await _check_errors(url)
+    ws.close(); await ws.wait_closed()
+    lat.sort()
+    return dict(moves=srv.moves, elapsed=elapsed, p50=lat[len(lat) // 2] * 1e3, p99=lat[int(len(lat) * 0.99)] * 1e3,
+                busy=srv.busy / max(srv.moves, 1) * 1e3, bytes_per_move=srv.bytes_out / max(srv.moves, 1))
+
+async def _check_errors(url):
+    a, b, c = [await Client.connect(url) for _ in range(3)]
+    key = await a.create(["甲", "乙"])
+    await a.join(key, 0); await b.join(key, 1)
+    for who, move, want in ((b, ("d",), "還沒輪到"), (a, ("p", 0), "不合法"), (a, ("q",), "格式錯誤"),
+                            (a, ("p", 2.0), "格式錯誤"), (a, ("p", True), "格式錯誤")):
+        try: await who.act(*move)
+        except ServiceError as e:
+            if want not in str(e): raise AssertionError(f"{move}: 錯誤訊息不符 {e}")
+        else: raise AssertionError(f"{move} 應被拒絕")
+    for bad, want in ((dict(op="join", table=key, seat=1), "座位已有人"), (dict(op="join", table="nope", seat=0), "找不到"),
+                      (dict(op="create", names=["x"]), "2~4"), (dict(op="fly"), "未知的 op"),
+                      (dict(op="create", names=["x", "y"], mode="score", mode_val=0), "1~65535"),
+                      (dict(op="create", names=["x", "y"], mode="first_plate", mode_val=20000), "1~16383"),
+                      (dict(op="create", names=["x", "y", "z"], mode="rounds", mode_val=30000), "1~21845"),
+                      (dict(op="create", names=["x", "y"], mode="rounds", mode_val="5"), "整數")):
+        try: await c.call(**bad)
+        except ServiceError as e:
+            if want not in str(e): raise AssertionError(f"{bad}: 錯誤訊息不符 {e}")
+        else: raise AssertionError(f"{bad} 應被拒絕")
+    await c.ws.send("[]")
+    try: await c.recv()
+    except ServiceError as e:
+        if "JSON 物件" not in str(e): raise
+    else: raise AssertionError("非物件訊息應被拒絕")
+    a.v -= 1
+    try: await a.act("d")
+    except ServiceError as e:
+        if "過期" not in str(e): raise
+    else: raise AssertionError("過期版本應被拒絕")
+    for x in (a, b, c): await x.close()
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 WebSocket 對局服務")
+    ap.add_argument("--host", default="127.0.0.1")
+    ap.add_argument("--port", type=int, default=8765)
+    ap.add_argument("--bench", type=int, metavar="TABLES", help="行程內客戶端同時跑多桌後結束")
+    ap.add_argument("--check", action="store_true", help="同 --bench，並驗證畫面差異、重播與錯誤處理")
+    ap.add_argument("-p", "--players", type=int, default=2, choices=(2, 3, 4))
+    args = ap.parse_args(argv)
+
+    if args.bench or args.check:
+        n = args.bench or 50
+        r = asyncio.run(bench(n, args.players, check=args.check))
+        print(f"{'✅ ' if args.check else ''}{n} 桌 × {args.players} 人：{r['moves']:,} 步 / {r['elapsed']:.2f} 秒"
+              f"（{r['moves'] / r['elapsed']:,.0f} 步/秒，客戶端同行程），每步來回 p50 {r['p50']:.2f} ms、p99 {r['p99']:.2f} ms，"
+              f"伺服器處理 {r['busy']:.3f} ms，每步推送 {r['bytes_per_move']:,.0f} B")
+        return
+
+    async def forever():
+        srv, ws = await start(args.host, args.port)
+        print(f"🥗 最強糾察員對局服務 ws://{args.host}:{args.port}")
+        await ws.serve_forever()
+    try: asyncio.run(forever())
+    except KeyboardInterrupt: pass
+
+if __name__ == "__main__":
+    sys.exit(main())
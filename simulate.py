@@ -0,0 +1,463 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 蒙地卡羅平衡模擬器
+
+以整數編碼的精簡核心跑完整局（規則與 engine.py 一致，可用 --check 逐局比對），
+供 FOOD_PER_CAT / FUNC_PER_TYPE / BALANCED_BONUS / IMBALANCE_PENALTY 調參。
+
+    python simulate.py -n 100000 --players 3 --mode allcards
+    python simulate.py --sweep BALANCED_BONUS=5,10,15 --mode score --mode-val 30
+    python simulate.py --check 2000
+    python simulate.py -n 100000 -p 3 --batch           # 交給 batch.py 的 NumPy 引擎（catgreedy）
+
+純量核心每秒約 4 千局（3 人 allcards，一局約 54 次行動）到 1 萬局以上（其他模式）；
+要在單核心上每種模式都達每秒 1 萬局以上，請用 --batch（策略限 catgreedy / catgreedy-rand）。
+"""
+import argparse
+import random
+import sys
+import time
+from collections import Counter
+from functools import lru_cache
+from typing import List, NamedTuple
+
+import engine
+
+# ══════════════════════════════════════════════════════════════════
+#  整數編碼：0..8 食物，9.. 功能牌（依 FOOD_CATS / FUNC_CARDS 順序）
+# ══════════════════════════════════════════════════════════════════
+CAT_NAMES = engine.CATS
+CAT_ID    = engine.CAT_ID
+NF        = len(engine.FOOD_CATS)
+PTS       = list(engine.PTS[:NF])
+
+# 均衡分類：依登錄表的 group，每組為該組食物的類別編號
+GROUPS = tuple(tuple(k for k in range(NF) if engine.GROUP_OF[k] == g) for g in range(len(engine.BALANCE_GROUPS)))
+
+# 功能牌依登錄表的 effect 歸類：效果相同（抽牌再看張數）的牌在模擬裡沒有差別，
+# 模擬器一律改用該類第一張的編號（SIM_CODE），牌堆、手牌從 engine 讀進來時先換過
+def _effect_key(k): return engine.EFFECT_OF[k], engine.DRAW_N[k]
+SIM_CODE = tuple(k if k < NF else next(j for j in range(NF, len(CAT_NAMES)) if _effect_key(j) == _effect_key(k))
+                 for k in range(len(CAT_NAMES)))
+DRAW_N   = engine.DRAW_N
+
+def _sim_codes(effect):
+    return tuple(k for k in range(NF, len(CAT_NAMES)) if SIM_CODE[k] == k and engine.EFFECT_OF[k] == effect)
+
+# 抽牌可有多種張數（各一類）；其餘效果至多一類，登錄表沒有這種牌時為 None
+DRAWS = _sim_codes("draw")
+STEAL, DROP, SWAP, PAUSE = (next(iter(_sim_codes(e)), None) for e in ("steal", "drop", "swap", "pause"))
+
+def sim_codes(cards):
+    """engine 的牌 → 模擬器用的類別編號清單。"""
+    return [SIM_CODE[c.code] for c in cards]
+
+PLACE, DISCARD, FUNC, PASS = range(4)
+MODES = ("rounds", "allcards", "score", "first_plate")
+DEFAULT_MODE_VAL = {"rounds": 5, "allcards": 0, "score": 30, "first_plate": 1}
+
+class Rules(NamedTuple):
+    food_per_cat:  int = engine.FOOD_PER_CAT
+    func_per_type: int = engine.FUNC_PER_TYPE
+    bonus:         int = engine.BALANCED_BONUS
+    penalty:       int = engine.IMBALANCE_PENALTY
+    init_hand:     int = engine.INIT_HAND
+
+    @classmethod
+    def current(cls):
+        return cls(engine.FOOD_PER_CAT, engine.FUNC_PER_TYPE, engine.BALANCED_BONUS,
+                   engine.IMBALANCE_PENALTY, engine.INIT_HAND)
+
+    def base_deck(self):
+        # 與 build_deck 相同的未洗牌順序
+        return ([k for k in range(NF) for _ in range(self.food_per_cat)] +
+                [SIM_CODE[k] for k in range(NF, len(CAT_NAMES)) for _ in range(self.func_per_type)])
+
+    def apply(self):
+        # 寫回 engine 全域常數（--check 時讓參考引擎使用相同規則）
+        engine.FOOD_PER_CAT, engine.FUNC_PER_TYPE = self.food_per_cat, self.func_per_type
+        engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY = self.bonus, self.penalty
+        engine.INIT_HAND = self.init_hand
+
+def is_balanced(cnt):
+    # 每個均衡分類至少一張（逐類跑 for/else，比 all(any(...)) 少建產生器）
+    for g in GROUPS:
+        for k in g:
+            if cnt[k]: break
+        else: return False
+    return True
+
+@lru_cache(maxsize=1 << 16)
+def delta_table(cnt, bonus, penalty):
+    # 每種食物放入後的分數變化；cnt 為餐盤各類張數的 tuple，結果快取重用
+    d = [PTS[k] + (penalty if cnt[k] == 2 else 0) for k in range(NF)]
+    missing = [g for g in GROUPS if not any(cnt[k] for k in g)]
+    if len(missing) == 1:
+        for k in missing[0]: d[k] += bonus
+    return tuple(d)
+
+NO_FOOD = float("-inf")
+
+@lru_cache(maxsize=1 << 16)
+def hand_deltas(cnt, bonus, penalty):
+    # delta_table 補上功能牌（NO_FOOD），可直接以手牌類別索引；只在餐盤變動時重算
+    return delta_table(cnt, bonus, penalty) + (NO_FOOD,) * (len(CAT_NAMES) - NF)
+
+def fast_deck(rules, rng):
+    # 以 C 層級排序取代逐張 random.shuffle，洗一副牌只需數微秒
+    base = rules.base_deck()
+    keys = memoryview(rng.randbytes(4 * len(base))).cast("I")
+    return [base[i] for i in sorted(range(len(base)), key=keys.__getitem__)]
+
+# ══════════════════════════════════════════════════════════════════
+#  策略：act 回傳 (PLACE|DISCARD|FUNC|PASS, 手牌索引)，target 回傳目標玩家
+# ══════════════════════════════════════════════════════════════════
+class Table:
+    __slots__ = ("n", "deck", "hands", "counts", "scores", "skip", "deltas")
+
+    def __init__(self, n, deck, hands, counts, scores, skip, deltas):
+        self.n, self.deck, self.hands, self.counts, self.scores, self.skip = n, deck, hands, counts, scores, skip
+        self.deltas = deltas        # 各玩家的 hand_deltas，放牌時更新
+
+class RandomPolicy:
+    name = "random"
+
+    def __init__(self, rules, rng):
+        self.rules, self.rng = rules, rng
+
+    def act(self, t, me):
+        h = t.hands[me]
+        i = self.rng.randrange(len(h))
+        return (PLACE if h[i] < NF else FUNC), i
+
+    def target(self, t, me, func):
+        if func == DROP:
+            cands = [i for i in range(t.n) if t.hands[i]]
+        else:
+            cands = [i for i in range(t.n) if i != me]
+        return cands[self.rng.randrange(len(cands))]
+
+class GreedyPolicy:
+    name = "greedy"
+
+    def __init__(self, rules, rng):
+        self.rules, self.rng = rules, rng
+
+    def act(self, t, me):
+        # 同分取手牌中較前者；逐張比較改為 C 層級的 max / index
+        h = t.hands[me]
+        if t.deck:
+            for k in DRAWS:
+                if k in h: return FUNC, h.index(k)
+        d = t.deltas[me]
+        vals = [d[k] for k in h]
+        best = max(vals)
+        if best > 0: return PLACE, vals.index(best)
+        for k in (STEAL, PAUSE, DROP):
+            if k in h: return FUNC, h.index(k)
+        if SWAP in h and len(t.hands[(me - 1) % t.n]) >= len(h): return FUNC, h.index(SWAP)
+        if best == NO_FOOD: return DISCARD, 0
+        return DISCARD, vals.index(min(v for v in vals if v != NO_FOOD))
+
+    def target(self, t, me, func):
+        others = [i for i in range(t.n) if i != me]
+        if func == DROP:
+            live = [i for i in others if t.hands[i]] or [me]
+            return max(live, key=lambda i: len(t.hands[i]))
+        return max(others, key=lambda i: (not t.skip[i], t.scores[i]))
+
+class CategoryGreedyPolicy(GreedyPolicy):
+    # 與 GreedyPolicy 相同的優先順序，但只依類別決策（同分取編號小者），
+    # 與手牌順序無關，batch.py 的向量化引擎可逐局重現；預設不打隨機牌（偷1張/丟1張）
+    name = "catgreedy"
+    func_order = (PAUSE,)
+
+    def act(self, t, me):
+        h = t.hands[me]
+        d = t.deltas[me]
+        foods = [k for k in range(NF) if k in h]
+        if t.deck:
+            for k in DRAWS:
+                if k in h: return FUNC, h.index(k)
+        if foods:
+            best = max(foods, key=lambda k: (d[k], -k))
+            if d[best] > 0: return PLACE, h.index(best)
+        for k in self.func_order:
+            if k in h: return FUNC, h.index(k)
+        if SWAP in h and len(t.hands[(me - 1) % t.n]) >= len(h): return FUNC, h.index(SWAP)
+        if foods: return DISCARD, h.index(min(foods, key=lambda k: (d[k], k)))
+        return DISCARD, h.index(min(h))
+
+class CategoryGreedyRandPolicy(CategoryGreedyPolicy):
+    name = "catgreedy-rand"
+    func_order = (STEAL, PAUSE, DROP)
+
+POLICIES = {p.name: p for p in (RandomPolicy, GreedyPolicy, CategoryGreedyPolicy, CategoryGreedyRandPolicy)}
+
+# ══════════════════════════════════════════════════════════════════
+#  核心：跑完一整局
+# ══════════════════════════════════════════════════════════════════
+class Result(NamedTuple):
+    scores: List[int]
+    end:    str
+    rounds: int
+    turns:  int
+
+def play(deck, n, mode, mode_val, policies, rng, rules) -> Result:
+    hands  = [[] for _ in range(n)]
+    for h in hands:
+        for _ in range(rules.init_hand):
+            if deck: h.append(deck.pop())
+    counts = [[0] * NF for _ in range(n)]
+    scores = [0] * n
+    bal    = [False] * n
+    skip   = [False] * n
+    bonus, penalty = rules.bonus, rules.penalty
+    deltas = [hand_deltas((0,) * NF, bonus, penalty)] * n
+    t = Table(n, deck, hands, counts, scores, skip, deltas)
+    acts = [p.act for p in policies]
+    # 結束條件在迴圈外先判好模式，每回合只做整數比較
+    by_deck, by_score, first_plate = mode == "allcards", mode == "score", mode == "first_plate"
+    max_rounds = mode_val * n if mode == "rounds" else None
+
+    turn, round_count, turns = 0, 0, 0
+    countdown, last_round, last_starter = None, False, None
+    while True:
+        turns += 1
+        me, h = turn, hands[turn]
+        if deck: h.append(deck.pop())
+        op, i = acts[me](t, me) if h else (PASS, 0)
+
+        if op == PLACE:
+            k = h.pop(i); cnt = counts[me]
+            cnt[k] += 1
+            scores[me] += PTS[k] + (penalty if cnt[k] == 3 else 0)
+            if not bal[me] and is_balanced(cnt):
+                bal[me] = True; scores[me] += bonus
+            deltas[me] = hand_deltas(tuple(cnt), bonus, penalty)
+            if first_plate and bal[me] and countdown is None:
+                countdown = mode_val * n + 1
+        elif op == DISCARD:
+            h.pop(i)
+        elif op == FUNC:
+            k = h[i]
+            if k in DRAWS:
+                h.pop(i)
+                for _ in range(DRAW_N[k]):
+                    if deck: h.append(deck.pop())
+            elif k == STEAL:
+                targets = [j for j in range(n) if j != me and hands[j]]
+                h.pop(i)
+                if targets:
+                    th = hands[targets[rng.randrange(len(targets))]]
+                    h.append(th.pop(rng.randrange(len(th))))
+            elif k == SWAP:
+                h.pop(i)
+                hands[:] = hands[-1:] + hands[:-1]
+                h = hands[me]
+            elif k == DROP:
+                if any(hands[j] for j in range(n) if j != me) or len(h) > 1:
+                    th = hands[policies[me].target(t, me, DROP)]
+                    h.pop(i)
+                    if th: th.pop(rng.randrange(len(th)))
+                else:
+                    h.pop(i)
+            elif k == PAUSE:
+                ti = policies[me].target(t, me, PAUSE)
+                h.pop(i)
+                skip[ti] = True
+
+        # check_emperor
+        if not h and not last_round and countdown is None:
+            last_round, last_starter = True, me
+
+        # advance_turn
+        if countdown is not None: countdown -= 1
+        nxt = me + 1 if me + 1 < n else 0
+        end = None
+        if countdown is not None and countdown <= 0:     end = "countdown"
+        elif last_round and nxt == last_starter:         end = "last_round"
+        elif by_deck:
+            if not deck:                                 end = "deck_empty"
+        elif max_rounds is not None:
+            if round_count >= max_rounds:                end = "rounds"
+        elif by_score:
+            if max(scores) >= mode_val:                  end = "score"
+            elif not deck and not any(hands):            end = "exhausted"
+        if end: return Result(scores, end, round_count, turns)
+
+        round_count += 1
+        if skip[nxt]:
+            skip[nxt] = False
+            if countdown is not None: countdown -= 1
+            nxt = (nxt + 1) % n
+        turn = nxt
+
+# ══════════════════════════════════════════════════════════════════
+#  參考引擎：以 engine.py 原函式跑同一局（--check 用）
+# ══════════════════════════════════════════════════════════════════
+def table_from_gs(gs):
+    players = gs["players"]
+    hands  = [sim_codes(p.hand) for p in players]
+    counts = [[0] * NF for _ in players]
+    for cnt, p in zip(counts, players):
+        for c in p.plate: cnt[c.code] += 1
+    return Table(len(players), gs["deck"], hands, counts,
+                 [p.plate_score() for p in players], [p.skip_next for p in players],
+                 [hand_deltas(tuple(cnt), engine.BALANCED_BONUS, engine.IMBALANCE_PENALTY) for cnt in counts])
+
+def play_engine(gs, policies) -> Result:
+    n, turns = len(gs["players"]), 0
+    while not gs["over"]:
+        gs["showing_transition"] = False
+        phase, me = gs["phase"], gs["turn"]
+        if phase == "draw_screen":
+            turns += 1
+            engine.action_draw(gs) if gs["deck"] else engine.skip_draw(gs)
+            continue
+        if phase == "alert_first_plate": engine.ack_first_plate(gs); continue
+        if phase == "confirm_draw":      engine.confirm_draw(gs); continue
+        t = table_from_gs(gs)
+        if phase == "pending_discard_hand":
+            engine.resolve_discard_hand(gs, policies[me].target(t, me, DROP)); continue
+        if phase == "pending_pause":
+            engine.resolve_pause(gs, policies[me].target(t, me, PAUSE)); continue
+        if not t.hands[me]: engine.action_pass(gs); continue
+        op, i = policies[me].act(t, me)
+        (engine.action_place if op == PLACE else engine.action_discard if op == DISCARD
+         else engine.action_use_func)(gs, i)
+    return Result([p.plate_score() for p in gs["players"]], gs["end_code"], gs["round_count"], turns)
+
+def check(games, n, mode, mode_val, policy_names, rules, seed=0):
+    # 同一 seed 下核心與 engine.py 的終局必須逐局一致
+    rules.apply()
+    names = [f"P{i+1}" for i in range(n)]
+    for g in range(games):
+        rng  = random.Random(seed + g)
+        deck = sim_codes(engine.build_deck(rng))
+        fast = play(deck, n, mode, mode_val, make_policies(policy_names, n, rules, rng), rng, rules)
+        rng  = random.Random(seed + g)
+        gs   = engine.init_game(names, mode, mode_val, rng)
+        ref  = play_engine(gs, make_policies(policy_names, n, rules, rng))
+        if fast != ref:
+            raise AssertionError(f"game {seed + g}: fast={fast} engine={ref}")
+    return games
+
+# ══════════════════════════════════════════════════════════════════
+#  批次統計
+# ══════════════════════════════════════════════════════════════════
+def make_policies(policy_names, n, rules, rng):
+    return [POLICIES[policy_names[i % len(policy_names)]](rules, rng) for i in range(n)]
+
+class Stats:
+    # 逐局累加勝率（平手均分）、分數、長度與結束條件
+    def __init__(self, n):
+        self.n, self.games = n, 0
+        self.wins, self.score_sum = [0.0] * n, [0] * n
+        self.ends, self.rounds, self.turns = Counter(), 0, 0
+
+    def add(self, r: Result):
+        top = max(r.scores)
+        winners = [i for i, s in enumerate(r.scores) if s == top]
+        for i in winners: self.wins[i] += 1 / len(winners)
+        for i, s in enumerate(r.scores): self.score_sum[i] += s
+        self.ends[r.end] += 1; self.rounds += r.rounds; self.turns += r.turns
+        self.games += 1
+
+    def merge(self, other):
+        for i in range(self.n):
+            self.wins[i] += other.wins[i]; self.score_sum[i] += other.score_sum[i]
+        self.ends.update(other.ends); self.rounds += other.rounds; self.turns += other.turns
+        self.games += other.games
+        return self
+
+    def summary(self, **meta):
+        g = self.games or 1
+        return dict(
+            meta, games=self.games,
+            win_rate=[w / g for w in self.wins], avg_score=[s / g for s in self.score_sum],
+            avg_rounds=self.rounds / g, avg_turns=self.turns / g,
+            end_codes={k: v / g for k, v in self.ends.most_common()},
+        )
+
+def run(games, n, mode, mode_val, policy_names, rules=None, seed=0):
+    rules = rules or Rules.current()
+    rng = random.Random(seed)
+    policies = make_policies(policy_names, n, rules, rng)
+    stats = Stats(n)
+    t0 = time.perf_counter()
+    for _ in range(games):
+        stats.add(play(fast_deck(rules, rng), n, mode, mode_val, policies, rng, rules))
+    elapsed = time.perf_counter() - t0
+    return stats.summary(
+        players=n, mode=mode, mode_val=mode_val, rules=rules._asdict(),
+        policies=[p.name for p in policies],
+        seconds=elapsed, games_per_sec=games / elapsed if elapsed else float("inf"),
+    )
+
+def format_report(r):
+    lines = [f"── {r['mode']}({r['mode_val']}) × {r['players']} 人 × {r['games']} 局  "
+             f"{r['rules']}  [{r['games_per_sec']:,.0f} 局/秒]"]
+    for i, pol in enumerate(r["policies"]):
+        lines.append(f"  P{i+1} {pol:<7} 勝率 {r['win_rate'][i]:6.1%}   平均 {r['avg_score'][i]:6.2f} 分")
+    lines.append(f"  平均回合 {r['avg_rounds']:.1f}（行動 {r['avg_turns']:.1f} 次）")
+    lines.append("  結束條件 " + "  ".join(f"{k} {v:.1%}" for k, v in r["end_codes"].items()))
+    return "\n".join(lines)
+
+def parse_sweep(specs):
+    # "BALANCED_BONUS=5,10,15" → [("bonus", [5, 10, 15])]
+    fields = {"FOOD_PER_CAT": "food_per_cat", "FUNC_PER_TYPE": "func_per_type",
+              "BALANCED_BONUS": "bonus", "IMBALANCE_PENALTY": "penalty", "INIT_HAND": "init_hand"}
+    out = []
+    for spec in specs:
+        key, _, vals = spec.partition("=")
+        if key not in fields: raise SystemExit(f"未知常數 {key}，可用：{', '.join(fields)}")
+        out.append((fields[key], [int(v) for v in vals.split(",")]))
+    return out
+
+def sweep_rules(base, specs):
+    combos = [base]
+    for fld, vals in specs:
+        combos = [c._replace(**{fld: v}) for c in combos for v in vals]
+    return combos
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 平衡模擬器")
+    ap.add_argument("-n", "--games", type=int, default=10000)
+    ap.add_argument("-p", "--players", type=int, default=2, choices=(2, 3, 4))
+    ap.add_argument("-m", "--mode", choices=MODES + ("all",), default="all")
+    ap.add_argument("--mode-val", type=int, help="回合數 / 目標分數 / 倒數輪數（預設依模式）")
+    ap.add_argument("--policy", action="append", choices=list(POLICIES),
+                    help="依座位輪流指定策略，可重複（預設 greedy）")
+    ap.add_argument("--sweep", action="append", default=[], metavar="CONST=V1,V2",
+                    help="掃描規則常數，可重複（笛卡兒積）")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--check", type=int, metavar="GAMES", help="與 engine.py 逐局比對後結束")
+    ap.add_argument("--batch", action="store_true", help="改用 batch.py 的 NumPy 向量化引擎")
+    args = ap.parse_args(argv)
+
+    policy_names = args.policy or (["catgreedy"] if args.batch else ["greedy"])
+    if args.batch:
+        import batch
+        if len(set(policy_names)) > 1 or policy_names[0] not in batch.BATCH_POLICIES:
+            raise SystemExit(f"--batch 只支援單一策略：{', '.join(batch.BATCH_POLICIES)}")
+    modes = MODES if args.mode == "all" else (args.mode,)
+    for rules in sweep_rules(Rules.current(), parse_sweep(args.sweep)):
+        for mode in modes:
+            mode_val = args.mode_val if args.mode_val is not None else DEFAULT_MODE_VAL[mode]
+            if args.check:
+                saved = Rules.current()
+                try:
+                    check(args.check, args.players, mode, mode_val, policy_names, rules, args.seed)
+                finally:
+                    saved.apply()
+                print(f"✅ {mode}({mode_val}) {rules}: {args.check} 局與 engine.py 一致")
+                continue
+            if args.batch:
+                print(format_report(batch.run(args.games, args.players, mode, mode_val, policy_names[0], rules, args.seed)))
+                continue
+            print(format_report(run(args.games, args.players, mode, mode_val, policy_names, rules, args.seed)))
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 牌桌存檔（SQLite / 記憶體映射檔）與背景寫入
+
+WriteBehind 把 put() 放進以牌桌 key 合併的待寫表後立即返回，由背景執行緒批次寫入後端，
+按鈕點擊不會等磁碟。後端：
+  * SQLiteStore：單一 tables 表（key 主鍵），WAL 模式，一批一個交易
+  * MmapStore：固定大小槽位的映射檔，每張牌桌兩個槽輪流寫（序號 + CRC），
+    寫到一半當機仍保有上一版；開檔時只掃描槽位標頭建立索引。
+    資料放不下時把槽位加倍、重建整個檔（只搬各牌桌最新版）；超過 MM_SLOT_MAX 的單筆記錄錯誤後略過，
+    不影響同一批的其他牌桌
+
+    INSPECTOR_STORE=sqlite:tables.db | mmap:tables.mm | none
+    python storage.py --bench 5000 --backend mmap
+"""
+import atexit
+import logging
+import mmap
+import os
+import sqlite3
+import struct
+import threading
+import zlib
+
+log = logging.getLogger(__name__)
+
+class Store:
+    # 後端介面：write_many 只由寫入執行緒呼叫；data 為 None 代表刪除
+    def get(self, key: str): raise NotImplementedError
+    def write_many(self, items: dict): raise NotImplementedError
+    def keys(self): raise NotImplementedError
+    def close(self): pass
+
+# ══════════════════════════════════════════════════════════════════
+#  SQLite
+# ══════════════════════════════════════════════════════════════════
+class SQLiteStore(Store):
+    def __init__(self, path):
+        self.lock = threading.Lock()
+        self.db = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self.db.execute("PRAGMA journal_mode=WAL")
+        self.db.execute("PRAGMA synchronous=NORMAL")
+        self.db.execute("CREATE TABLE IF NOT EXISTS tables (key TEXT PRIMARY KEY, data BLOB NOT NULL, "
+                        "updated REAL NOT NULL DEFAULT (julianday('now')))")
+
+    def get(self, key):
+        with self.lock:
+            row = self.db.execute("SELECT data FROM tables WHERE key = ?", (key,)).fetchone()
+        return row and bytes(row[0])
+
+    def write_many(self, items):
+        puts = [(k, v) for k, v in items.items() if v is not None]
+        dels = [(k,) for k, v in items.items() if v is None]
+        with self.lock:
+            self.db.execute("BEGIN")
+            try:
+                if puts: self.db.executemany("INSERT INTO tables (key, data) VALUES (?, ?) ON CONFLICT(key) DO UPDATE "
+                                             "SET data = excluded.data, updated = julianday('now')", puts)
+                if dels: self.db.executemany("DELETE FROM tables WHERE key = ?", dels)
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK"); raise
+
+    def keys(self):
+        with self.lock:
+            return [k for (k,) in self.db.execute("SELECT key FROM tables")]
+
+    def close(self):
+        with self.lock: self.db.close()
+
+# ══════════════════════════════════════════════════════════════════
+#  記憶體映射檔
+# ══════════════════════════════════════════════════════════════════
+FILE_HEAD = struct.Struct("<4sBI")          # magic, 版本, 槽位大小
+SLOT_HEAD = struct.Struct("<IQBI")          # crc32(其後全部), 序號, key 長度, 資料長度
+MM_MAGIC, MM_GROW = b"SIMM", 1024           # 每次擴充的槽位數
+MM_SLOT_MAX = 1 << 20                       # 槽位大小上限；單筆超過就拒絕該筆
+KEY_MAX = 64
+
+class MmapStore(Store):
+    def __init__(self, path, slot_size=2048):
+        self.lock = threading.Lock()
+        self._open(path, slot_size)
+
+    def _open(self, path, slot_size):
+        self.path, self.mm = path, None
+        new = not os.path.exists(path) or os.path.getsize(path) < FILE_HEAD.size
+        self.f = open(path, "w+b" if new else "r+b")
+        if new:
+            self.f.write(FILE_HEAD.pack(MM_MAGIC, 1, slot_size)); self.f.flush(); self.f.seek(0)
+        magic, ver, self.slot = FILE_HEAD.unpack(self.f.read(FILE_HEAD.size))
+        if magic != MM_MAGIC or ver != 1: raise ValueError(f"{path} 不是牌桌映射檔")
+        self.cap = (os.path.getsize(path) - FILE_HEAD.size) // self.slot
+        if self.cap == 0: self._grow()
+        else: self.mm = mmap.mmap(self.f.fileno(), 0)
+        self._scan()
+
+    def _off(self, i): return FILE_HEAD.size + i * self.slot
+
+    def _grow(self):
+        if self.mm: self.mm.close()
+        self.cap += MM_GROW
+        self.f.truncate(self._off(self.cap))
+        self.mm = mmap.mmap(self.f.fileno(), 0)
+
+    def _read(self, i):
+        # 回傳 (seq, key, data)；空槽或 CRC 不符回傳 None
+        o = self._off(i)
+        crc, seq, kl, dl = SLOT_HEAD.unpack_from(self.mm, o)
+        if kl == 0 or kl > KEY_MAX or SLOT_HEAD.size + kl + dl > self.slot: return None
+        body = self.mm[o + 4:o + SLOT_HEAD.size + kl + dl]
+        if zlib.crc32(body) != crc: return None
+        return seq, bytes(body[SLOT_HEAD.size - 4:SLOT_HEAD.size - 4 + kl]).decode(), bytes(body[SLOT_HEAD.size - 4 + kl:])
+
+    def _scan(self):
+        # index: key -> [最新版的槽, 下次要寫的槽, 最新序號]
+        self.index, self.free, seen = {}, [], {}
+        for i in range(self.cap):
+            r = self._read(i)
+            if r is None: self.free.append(i); continue
+            seen.setdefault(r[1], []).append((r[0], i))
+        for key, slots in seen.items():
+            slots.sort(reverse=True)
+            seq, cur = slots[0]
+            other = slots[1][1] if len(slots) > 1 else None
+            for _, extra in slots[2:]: self.free.append(extra)
+            if other is None: other = self._alloc()
+            self.index[key] = [cur, other, seq]
+        self.free.reverse()
+
+    def _alloc(self):
+        if not self.free:
+            start = self.cap; self._grow()
+            self.free = list(range(self.cap - 1, start - 1, -1))
+        return self.free.pop()
+
+    def get(self, key):
+        with self.lock:
+            ent = self.index.get(key)
+            if ent is None: return None
+            r = self._read(ent[0])
+            return r and r[2]
+
+    def _resize(self, need):
+        # 槽位放不下：以加倍後足夠的大小重建映射檔（寫到暫存檔再換名，中途當機仍是舊檔）
+        slot = self.slot
+        while slot < need: slot *= 2
+        live = {}
+        for key, ent in self.index.items():
+            r = self._read(ent[0])
+            if r: live[key] = r[2]
+        tmp = self.path + ".resize"
+        if os.path.exists(tmp): os.remove(tmp)
+        bigger = MmapStore(tmp, slot)
+        bigger.write_many(live); bigger.close()
+        self.mm.close(); self.f.close()
+        os.replace(tmp, self.path)
+        self._open(self.path, slot)
+        log.info("牌桌映射檔槽位放大為 %d B（%d 桌）", slot, len(live))
+
+    def write_many(self, items):
+        with self.lock:
+            for key, data in items.items():
+                if data is None:
+                    ent = self.index.pop(key, None)
+                    if ent:
+                        for i in ent[:2]: self.mm[self._off(i):self._off(i) + SLOT_HEAD.size] = bytes(SLOT_HEAD.size)
+                        self.free += ent[:2]
+                    continue
+                kb = key.encode()
+                need = SLOT_HEAD.size + len(kb) + len(data)
+                if len(kb) > KEY_MAX or need > MM_SLOT_MAX:
+                    # 只拒絕這一筆，同批其他牌桌照常寫入
+                    log.error("牌桌 %s 無法存檔：key %d B / 資料 %d B 超過上限", key, len(kb), len(data))
+                    continue
+                if need > self.slot: self._resize(need)
+                ent = self.index.get(key)
+                if ent is None: ent = self.index[key] = [self._alloc(), self._alloc(), 0]
+                # 寫入較舊的那個槽，完成後才換成最新；當機時另一槽仍是完整的上一版
+                target, seq = ent[1], ent[2] + 1
+                body = struct.pack("<QBI", seq, len(kb), len(data)) + kb + data
+                o = self._off(target)
+                self.mm[o:o + 4 + len(body)] = struct.pack("<I", zlib.crc32(body)) + body
+                ent[0], ent[1], ent[2] = target, ent[0], seq
+            self.mm.flush()
+
+    def keys(self):
+        with self.lock: return list(self.index)
+
+    def close(self):
+        with self.lock:
+            self.mm.flush(); self.mm.close(); self.f.close()
+
+# ══════════════════════════════════════════════════════════════════
+#  背景寫入
+# ══════════════════════════════════════════════════════════════════
+class WriteBehind:
+    def __init__(self, store: Store):
+        self.store = store
+        self._pending, self._busy, self._closed = {}, False, False
+        self._cv = threading.Condition()
+        self._thread = threading.Thread(target=self._run, name="inspector-store", daemon=True)
+        self._thread.start()
+
+    def put(self, key, data: bytes):
+        with self._cv:
+            self._pending[key] = data
+            self._cv.notify()
+
+    def delete(self, key): self.put(key, None)
+
+    def get(self, key):
+        with self._cv:
+            if key in self._pending: return self._pending[key]
+        return self.store.get(key)
+
+    def keys(self):
+        with self._cv: pending = dict(self._pending)
+        keys = set(self.store.keys()) | {k for k, v in pending.items() if v is not None}
+        return sorted(keys - {k for k, v in pending.items() if v is None})
+
+    def _run(self):
+        while True:
+            with self._cv:
+                while not self._pending and not self._closed: self._cv.wait()
+                if not self._pending and self._closed: return
+                batch, self._pending, self._busy = self._pending, {}, True
+            try:
+                self.store.write_many(batch)
+            except Exception:
+                # 整批失敗時逐筆重試，一張牌桌的問題不會讓同批其他牌桌的存檔遺失
+                log.exception("牌桌存檔失敗（%d 筆），改為逐筆寫入", len(batch))
+                for key, data in batch.items():
+                    try: self.store.write_many({key: data})
+                    except Exception: log.exception("牌桌 %s 存檔失敗", key)
+            with self._cv:
+                self._busy = False
+                self._cv.notify_all()
+
+    def flush(self, timeout=None):
+        with self._cv:
+            return self._cv.wait_for(lambda: not self._pending and not self._busy, timeout)
+
+    def close(self):
+        with self._cv:
+            if self._closed: return
+            self._closed = True
+            self._cv.notify_all()
+        self._thread.join()
+        self.store.close()
+
+def open_store(spec: str):
+    """'sqlite:路徑' / 'mmap:路徑' / 'none' → WriteBehind 或 None。"""
+    kind, _, path = spec.partition(":")
+    if kind in ("", "none"): return None
+    backends = {"sqlite": SQLiteStore, "mmap": MmapStore}
+    if kind not in backends: raise ValueError(f"未知的存檔後端 {kind!r}（可用 {', '.join(backends)}、none）")
+    wb = WriteBehind(backends[kind](path or f"tables.{'db' if kind == 'sqlite' else 'mm'}"))
+    atexit.register(wb.close)                   # 正常結束時把待寫的牌桌寫完
+    return wb
+
+# ══════════════════════════════════════════════════════════════════
+#  --bench：大量牌桌寫入、重開與還原時間
+# ══════════════════════════════════════════════════════════════════
+def bench(tables, backend, path, seed=0):
+    import random, time
+    import codec, engine, replay
+    rng = random.Random(seed)
+    datas = {}
+    for t in range(min(tables, 200)):
+        gs = engine.init_game(["玩家1", "玩家2", "玩家3"], "rounds", 5, seed=seed + t)
+        for _ in range(rng.randrange(120)):
+            if gs["over"]: break
+            replay.random_step(gs, rng)
+        gs["events"].clear()
+        datas[t] = codec.encode(gs)
+    if os.path.exists(path): os.remove(path)
+    wb = open_store(f"{backend}:{path}")
+    t0 = time.perf_counter()
+    for t in range(tables): wb.put(f"t{t:06d}", datas[t % len(datas)])
+    t_put = time.perf_counter() - t0
+    wb.flush(); t_flush = time.perf_counter() - t0
+    wb.close()
+
+    t0 = time.perf_counter()
+    wb = open_store(f"{backend}:{path}")
+    t_open = time.perf_counter() - t0
+    keys = [f"t{rng.randrange(tables):06d}" for _ in range(200)]
+    t0 = time.perf_counter()
+    for k in keys:
+        gs = codec.decode(wb.get(k))
+        if codec.encode(gs) != datas[int(k[1:]) % len(datas)]: raise AssertionError(f"{k} 還原不一致")
+    t_get = (time.perf_counter() - t0) / len(keys)
+    n_keys = len(wb.keys())
+    wb.close()
+    if n_keys != tables: raise AssertionError(f"存了 {tables} 桌，讀回 {n_keys} 桌")
+    return dict(put_us=t_put / tables * 1e6, flush_s=t_flush, open_ms=t_open * 1e3, restore_us=t_get * 1e6,
+                size_kb=os.path.getsize(path) / 1024)
+
+def check_sizes(path):
+    # 映射檔：超過槽位的牌桌讓檔案放大，超過上限的只拒絕那一筆；同一批其他牌桌都要寫入
+    if os.path.exists(path): os.remove(path)
+    wb = open_store(f"mmap:{path}")
+    wb.put("small", b"a" * 100); wb.flush()
+    batch = {"small": b"b" * 100, "big": b"c" * 10_000, "huge": b"d" * (MM_SLOT_MAX + 1), "other": b"e" * 100}
+    for k, v in batch.items(): wb.put(k, v)
+    wb.flush(); wb.close()
+    wb = open_store(f"mmap:{path}")
+    got = {k: wb.get(k) for k in batch}
+    slot = wb.store.slot
+    wb.close()
+    want = dict(batch, huge=None)
+    if got != want: raise AssertionError(f"同批寫入不一致：{ {k: v and len(v) for k, v in got.items()} }")
+    return slot
+
+def main(argv=None):
+    import argparse, tempfile
+    ap = argparse.ArgumentParser(description="最強糾察員 牌桌存檔基準")
+    ap.add_argument("--bench", type=int, default=5000, metavar="TABLES")
+    ap.add_argument("--backend", choices=("sqlite", "mmap", "all"), default="all")
+    args = ap.parse_args(argv)
+    with tempfile.TemporaryDirectory() as d:
+        for backend in (("sqlite", "mmap") if args.backend == "all" else (args.backend,)):
+            r = bench(args.bench, backend, os.path.join(d, f"bench.{backend}"))
+            print(f"✅ {backend:<6} {args.bench:,} 桌：put {r['put_us']:.1f} µs（不等磁碟），全部落盤 {r['flush_s']:.2f} 秒，"
+                  f"重開 {r['open_ms']:.1f} ms，還原一桌 {r['restore_us']:.0f} µs，檔案 {r['size_kb']:,.0f} KB")
+        if args.backend in ("mmap", "all"):
+            slot = check_sizes(os.path.join(d, "sizes.mm"))
+            print(f"✅ mmap   超過槽位的牌桌自動放大槽位（→ {slot:,} B），超過上限的只拒絕該筆")
+
+if __name__ == "__main__":
+    import sys
+    sys.exit(main())
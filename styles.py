@@ -0,0 +1,22 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 樣式傳送
+
+樣式表與字型（Fredoka One、Nunito，皆為 OFL）放在 static/，由 Streamlit 靜態檔服務提供（.streamlit/config.toml 開啟
+enableStaticServing，網址為 <baseUrlPath>/app/static/）。瀏覽器下載一次後即快取，每次重跑只送出一行 @import，
+不再重送整段 CSS，也不向外部字型服務請求。
+"""
+import streamlit as st
+
+def static_url():
+    # 絕對路徑並帶上 server.baseUrlPath：相對路徑會依頁面網址解析，部署在子路徑或多頁網址下就找不到
+    base = (st.get_option("server.baseUrlPath") or "").strip("/")
+    return f"/{base}/app/static/" if base else "/app/static/"
+
+def style_tag(*sheets):
+    static = static_url()
+    return "<style>" + "".join(f'@import url("{static}{s}");' for s in sheets) + "</style>"
+
+def inject(*sheets):
+    st.markdown(style_tag(*(sheets or ("style.css",))), unsafe_allow_html=True)
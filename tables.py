@@ -0,0 +1,183 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 多牌桌登錄表（同一行程共用）
+
+一張牌桌由多支裝置共用（每人一支手機，不必傳遞裝置）。所有行動都在牌桌的 RLock 內執行，
+同時按下的按鈕會依序套用，不會弄壞 gs；每次行動後 version 加一，其他裝置輪詢到新版本才重跑。
+閒置超過 idle_sec 的牌桌凍結成 codec bytes（幾百位元組；亂數流由 seed 與紀錄長度重新推導，
+不影響重播），下次存取時解凍。
+
+    python tables.py --check 50        # 多執行緒同時對多張牌桌行動，再以紀錄重播驗證
+"""
+import logging
+import secrets
+import threading
+import time
+from typing import Dict, List, Optional
+
+import codec
+import engine
+from bots import make_bot
+
+SWEEP_SEC = 60
+log = logging.getLogger(__name__)
+
+class Table:
+    __slots__ = ("key", "lock", "version", "seats", "bots", "news", "touched", "_gs", "_frozen", "_hook")
+
+    def __init__(self, key, gs, hook=None, bots=None):
+        self.key, self.lock, self.version = key, threading.RLock(), 0
+        self.seats: Dict[int, str] = {}                     # 座位 → 裝置（工作階段）識別
+        self.bots = bots or {}                              # 座位 → 電腦玩家（由存檔載回的牌桌沒有，改由真人操作）
+        self.news: List[str] = []                           # 最近一次換人時的事件，各裝置都顯示
+        self.touched, self._gs, self._frozen, self._hook = time.monotonic(), gs, None, hook
+        if hook: gs["checkpoint"] = hook
+
+    @property
+    def gs(self):
+        # 讀取可不持鎖；修改 gs 須持有 lock（或用 act）
+        with self.lock:
+            if self._gs is None:
+                self._gs = codec.decode(self._frozen); self._frozen = None
+                if self._hook: self._gs["checkpoint"] = self._hook
+            self.touched = time.monotonic()
+            return self._gs
+
+    @property
+    def frozen(self): return self._gs is None
+
+    def freeze(self):
+        with self.lock:
+            if self._gs is not None:
+                self._frozen, self._gs = codec.encode(self._gs), None
+
+    def bump(self):
+        self.version += 1; self.touched = time.monotonic()
+
+    def act(self, fn, *args):
+        """在牌桌鎖內執行 engine 行動並遞增版本，回傳 UI 提示。"""
+        with self.lock:
+            hint = fn(self.gs, *args)
+            self.bump()
+            return hint
+
+    def claim(self, seat, who) -> bool:
+        with self.lock:
+            if self.seats.get(seat, who) != who: return False
+            self.seats[seat] = who
+            return True
+
+class Registry:
+    def __init__(self, store=None, idle_sec=600.0):
+        self.store, self.idle_sec = store, idle_sec
+        self.tables: Dict[str, Table] = {}
+        self.lock = threading.Lock()
+        self._swept = time.monotonic()
+
+    def _hook(self, key):
+        if self.store is None: return None
+        store = self.store
+        return lambda g: store.put(key, codec.encode(g))
+
+    def create(self, names, mode, mode_val, bots=None, ruleset="full") -> Table:
+        """bots 為 {座位: 電腦玩家種類}（見 bots.BOTS）；ruleset 見 engine.RULESETS。"""
+        gs = engine.init_game(names, mode, mode_val, ruleset=ruleset)
+        with self.lock:
+            key = secrets.token_urlsafe(6)
+            while key in self.tables: key = secrets.token_urlsafe(6)
+            t = self.tables[key] = Table(key, gs, self._hook(key),
+                                         {s: make_bot(k) for s, k in (bots or {}).items()})
+        if t._hook: t._hook(gs)
+        self.sweep()
+        return t
+
+    def get(self, key) -> Optional[Table]:
+        with self.lock:
+            t = self.tables.get(key)
+            if t is None and self.store is not None:
+                # 伺服器重啟後由存檔載回（以凍結狀態放入，首次存取才解碼）
+                data = self.store.get(key)
+                if data:
+                    t = self.tables[key] = Table(key, None, self._hook(key))
+                    t._frozen = data
+        self.sweep()
+        return t
+
+    def drop(self, key):
+        with self.lock: self.tables.pop(key, None)
+        if self.store is not None: self.store.delete(key)
+
+    def sweep(self, force=False) -> int:
+        # 每分鐘最多掃一次，把閒置牌桌凍結
+        now = time.monotonic()
+        if not force and now - self._swept < SWEEP_SEC: return 0
+        self._swept = now
+        with self.lock: idle = [t for t in self.tables.values() if not t.frozen and now - t.touched > self.idle_sec]
+        n = 0
+        for t in idle:
+            # 某桌編碼失敗（欄位超出 codec 範圍）就留在記憶體，不影響其他牌桌的凍結
+            try: t.freeze(); n += 1
+            except codec.CodecError as e: log.error("牌桌 %s 無法凍結：%s", t.key, e)
+        return n
+
+    def stats(self):
+        with self.lock: tables = list(self.tables.values())
+        frozen = [t for t in tables if t.frozen]
+        return dict(tables=len(tables), live=len(tables) - len(frozen), frozen=len(frozen),
+                    frozen_bytes=sum(len(t._frozen) for t in frozen))
+
+# ══════════════════════════════════════════════════════════════════
+#  --check：多執行緒同時對多張牌桌行動，再以紀錄重播驗證沒有交錯損壞
+# ══════════════════════════════════════════════════════════════════
+def check(n_tables, threads=8, seed=0):
+    import random, tracemalloc
+    import replay
+    reg = Registry(idle_sec=0)
+    tables = [reg.create([f"P{i+1}" for i in range(3)], "rounds", 5) for _ in range(n_tables)]
+    errors = []
+
+    def worker(w):
+        rng = random.Random(seed * 1000 + w)
+        try:
+            while True:
+                live = [t for t in tables if not t.gs["over"]]
+                if not live: return
+                t = rng.choice(live)
+                with t.lock:
+                    if not t.gs["over"]: t.act(replay.random_step, rng)
+                if rng.random() < 0.01: t.freeze()            # 行動中途凍結 / 解凍也不能出錯
+        except Exception as e:
+            errors.append(e)
+
+    t0 = time.perf_counter()
+    pool = [threading.Thread(target=worker, args=(w,)) for w in range(threads)]
+    for th in pool: th.start()
+    for th in pool: th.join()
+    elapsed = time.perf_counter() - t0
+    if errors: raise errors[0]
+    actions = sum(t.version for t in tables)
+    for t in tables:
+        with t.lock:
+            hdr, log = replay.loads(replay.dumps(t.gs))
+            if replay.state_key(replay.replay(hdr, log)) != replay.state_key(t.gs):
+                raise AssertionError(f"牌桌 {t.key}: 狀態與紀錄重播不一致")
+            if t.version != sum(1 for e in log if e[0] != "r"): raise AssertionError(f"牌桌 {t.key}: 版本數與行動數不符")
+
+    # 閒置記憶體：凍結後每桌實際佔用
+    tracemalloc.start()
+    fresh = [Table(str(i), engine.init_game(["P1", "P2", "P3"], "rounds", 5)) for i in range(200)]
+    for t in fresh:
+        for _ in range(30): replay.random_step(t.gs, random.Random(0))
+    base = tracemalloc.get_traced_memory()[0]
+    for t in fresh: t.freeze()
+    frozen = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return actions, elapsed, base / len(fresh) / 1024, frozen / len(fresh) / 1024
+
+if __name__ == "__main__":
+    import sys
+    n = int(sys.argv[sys.argv.index("--check") + 1]) if "--check" in sys.argv else 50
+    actions, elapsed, live_kb, frozen_kb = check(n)
+    print(f"✅ {n} 張牌桌 / 8 執行緒 / {actions:,} 個行動與重播一致（{actions / elapsed:,.0f} 行動/秒）；"
+          f"每桌記憶體 使用中約 {live_kb:.1f} KB → 凍結後約 {frozen_kb:.1f} KB")
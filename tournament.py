@@ -0,0 +1,139 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 多行程錦標賽 / 參數掃描
+
+把大量對局切成固定大小的區塊分給行程池；每個區塊有自己的亂數流
+（由 seed、設定編號、區塊編號推導），因此結果與行程數無關、可完整重現。
+逐局結果以 CSV 分批寫入磁碟，各設定的彙總另存 <out>.json。
+
+    python tournament.py -n 1000000 -j 8 -p 2 -p 3 -p 4 --out results.csv
+    python tournament.py -n 200000 --sweep BALANCED_BONUS=5,10,15 -m score --out sweep.csv
+"""
+import argparse
+import json
+import multiprocessing as mp
+import os
+import random
+import sys
+import time
+from typing import NamedTuple, Tuple
+
+from simulate import (DEFAULT_MODE_VAL, MODES, POLICIES, Rules, Stats, fast_deck, format_report,
+                      make_policies, parse_sweep, play, sweep_rules)
+
+class Config(NamedTuple):
+    players:  int
+    mode:     str
+    mode_val: int
+    policies: Tuple[str, ...]
+    rules:    Rules
+
+class Task(NamedTuple):
+    cfg_idx: int
+    chunk:   int
+    start:   int
+    count:   int
+
+def chunk_rng(seed, cfg_idx, chunk):
+    # 字串 seed 經 SHA-512 展開，跨平台、跨版本穩定
+    return random.Random(f"{seed}/{cfg_idx}/{chunk}")
+
+# ══════════════════════════════════════════════════════════════════
+#  工作行程
+# ══════════════════════════════════════════════════════════════════
+_CONFIGS, _SEED = (), 0
+
+def _init_worker(configs, seed):
+    global _CONFIGS, _SEED
+    _CONFIGS, _SEED = configs, seed
+
+def run_chunk(task: Task):
+    cfg = _CONFIGS[task.cfg_idx]
+    rng = chunk_rng(_SEED, task.cfg_idx, task.chunk)
+    policies = make_policies(cfg.policies, cfg.players, cfg.rules, rng)
+    stats, rows = Stats(cfg.players), []
+    for g in range(task.start, task.start + task.count):
+        r = play(fast_deck(cfg.rules, rng), cfg.players, cfg.mode, cfg.mode_val, policies, rng, cfg.rules)
+        stats.add(r)
+        rows.append(f"{task.cfg_idx},{g},{r.end},{r.rounds},{r.turns},{';'.join(map(str, r.scores))}\n")
+    # 直接回傳 CSV 文字，主行程只需寫檔與合併統計
+    return task.cfg_idx, "".join(rows), stats
+
+# ══════════════════════════════════════════════════════════════════
+#  主行程
+# ══════════════════════════════════════════════════════════════════
+def plan(configs, games, chunk):
+    for ci in range(len(configs)):
+        for k, start in enumerate(range(0, games, chunk)):
+            yield Task(ci, k, start, min(chunk, games - start))
+
+def run_tournament(configs, games, out, jobs=None, chunk=2000, seed=0, progress=None):
+    jobs  = jobs or os.cpu_count() or 1
+    stats = [Stats(c.players) for c in configs]
+    tasks = list(plan(configs, games, chunk))
+    t0, done = time.perf_counter(), 0
+    with open(out, "w", encoding="utf-8", newline="") as f:
+        f.write("config,game,end,rounds,turns,scores\n")
+        if jobs == 1:
+            _init_worker(configs, seed)
+            results = map(run_chunk, tasks)
+            pool = None
+        else:
+            pool = mp.get_context().Pool(jobs, initializer=_init_worker, initargs=(configs, seed))
+            results = pool.imap(run_chunk, tasks)
+        try:
+            for ci, text, part in results:
+                f.write(text)
+                stats[ci].merge(part)
+                done += part.games
+                if progress: progress(done, len(configs) * games, time.perf_counter() - t0)
+        finally:
+            if pool: pool.close(); pool.join()
+    elapsed = time.perf_counter() - t0
+    summaries = [
+        st.summary(config=i, players=c.players, mode=c.mode, mode_val=c.mode_val,
+                   policies=list(c.policies), rules=c.rules._asdict())
+        for i, (c, st) in enumerate(zip(configs, stats))
+    ]
+    meta = dict(seed=seed, chunk=chunk, jobs=jobs, games_per_config=games, seconds=elapsed,
+                games_per_sec=done / elapsed if elapsed else float("inf"), configs=summaries)
+    with open(out + ".json", "w", encoding="utf-8") as f:
+        json.dump(meta, f, ensure_ascii=False, indent=1)
+    return meta
+
+def main(argv=None):
+    ap = argparse.ArgumentParser(description="最強糾察員 多行程錦標賽")
+    ap.add_argument("-n", "--games", type=int, default=100000, help="每個設定的局數")
+    ap.add_argument("-j", "--jobs", type=int, help="行程數（預設為 CPU 核心數）")
+    ap.add_argument("-p", "--players", type=int, action="append", choices=(2, 3, 4))
+    ap.add_argument("-m", "--mode", choices=MODES + ("all",), default="all")
+    ap.add_argument("--mode-val", type=int)
+    ap.add_argument("--policy", action="append", choices=list(POLICIES))
+    ap.add_argument("--sweep", action="append", default=[], metavar="CONST=V1,V2")
+    ap.add_argument("--chunk", type=int, default=2000, help="每個工作區塊的局數")
+    ap.add_argument("--seed", type=int, default=0)
+    ap.add_argument("--out", default="tournament.csv")
+    args = ap.parse_args(argv)
+
+    modes = MODES if args.mode == "all" else (args.mode,)
+    configs = tuple(
+        Config(n, mode, args.mode_val if args.mode_val is not None else DEFAULT_MODE_VAL[mode],
+               tuple(args.policy or ["greedy"]), rules)
+        for rules in sweep_rules(Rules.current(), parse_sweep(args.sweep))
+        for n in (args.players or [2])
+        for mode in modes
+    )
+
+    def progress(done, total, elapsed):
+        print(f"\r{done:,}/{total:,} 局  {done / elapsed:,.0f} 局/秒", end="", file=sys.stderr)
+
+    meta = run_tournament(configs, args.games, args.out, args.jobs, args.chunk, args.seed, progress)
+    print(file=sys.stderr)
+    for s in meta["configs"]:
+        print(format_report(dict(s, games_per_sec=meta["games_per_sec"])))
+    print(f"共 {sum(s['games'] for s in meta['configs']):,} 局，{meta['seconds']:.1f} 秒，"
+          f"{meta['games_per_sec']:,.0f} 局/秒（{meta['jobs']} 行程）→ {args.out}")
+
+if __name__ == "__main__":
+    sys.exit(main())
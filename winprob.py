@@ -0,0 +1,123 @@
+#遊戲發想者:胡文馨
+#編寫:HLH
+"""
+最強糾察員 — 即時勝率估計
+
+以旁觀者看得到的資訊（餐盤、棄牌、各人手牌張數、牌堆張數…）為鍵，把未現身的牌隨機發回手牌與牌堆，
+用 mcts.Sim 的規則式模擬快速打完，累計各人勝場（平手平分）。每次重跑只花 BUDGET_SEC 追加模擬，
+同一局面的結果留在快取裡越算越準；各人勝率的標準誤都低於 SE_TARGET（或達 MAX_ROLLOUTS）後視為收斂，
+之後的重跑直接讀快取、不再花時間。行動後局面改變就換新的鍵重新累計。
+不用背景執行緒：單核心上它會跟重跑搶 GIL，反而拖慢畫面。
+
+    python winprob.py --bench 20        # 2–4 人每次重跑的耗時、模擬局數與校準
+"""
+import random
+import sys
+import threading
+import time
+from collections import OrderedDict
+from typing import List, Optional
+
+import mcts
+
+BUDGET_SEC   = 0.01             # 每次重跑追加模擬的時間
+MIN_ROLLOUTS = 30               # 少於此數不顯示
+MAX_ROLLOUTS = 3000             # 累計到此數就不再追加
+SE_TARGET    = 0.03             # 各人勝率標準誤都低於此值也不再追加（勝率 50% 時約 280 局）
+CACHE_SIZE   = 512
+
+_cache: "OrderedDict[tuple, list]" = OrderedDict()     # 局面鍵 → [模擬局數, 各人勝場]
+_lock = threading.Lock()
+
+def public_key(gs) -> tuple:
+    players = gs["players"]
+    return (gs["mode"], gs["mode_val"], gs.get("ruleset", "full"), gs["turn"], gs["phase"], gs["round_count"], gs["countdown_turns"],
+            gs["last_starter"] if gs["last_round"] else None, len(gs["deck"]), tuple(sorted(c.code for c in gs["discard"])),
+            tuple((tuple(sorted(c.code for c in p.plate)), len(p.hand), p.skip_next) for p in players))
+
+def _start(gs, s):
+    # 把 Sim 推到「輪到的人已抽牌、待行動」；已行動完（確認抽牌、均衡警報）則先換人
+    phase, me = gs["phase"], gs["turn"]
+    if phase == "draw_screen":
+        if s.deck: s.hands[me].append(s.deck.pop())
+    elif phase in ("confirm_draw", "alert_first_plate"): s.end_turn(me, s.hands[me])
+    return s
+
+def _final(scores) -> List[float]:
+    top = max(scores)
+    win = [x == top for x in scores]
+    return [1 / sum(win) if w else 0.0 for w in win]
+
+def rollouts(gs, count=None, budget=None, rng=None):
+    """跑模擬直到 count 局或 budget 秒 → (局數, 各人勝場)。"""
+    rng = rng or random.Random()
+    pool, n, wins = mcts.unseen_pool(gs, None), 0, [0.0] * len(gs["players"])
+    deadline = time.perf_counter() + budget if budget is not None else None
+    while (count is None or n < count) and (deadline is None or time.perf_counter() < deadline):
+        s = _start(gs, mcts.determinize(gs, None, pool, rng))
+        while not s.over: s.step(s.rollout_move(rng), rng)
+        for i, w in enumerate(_final(s.scores)): wins[i] += w
+        n += 1
+    return n, wins
+
+def saturated(done, wins) -> bool:
+    """累計結果是否已夠準，不必再追加模擬。"""
+    if done >= MAX_ROLLOUTS: return True
+    if done < MIN_ROLLOUTS: return False
+    return max(w / done * (1 - w / done) for w in wins) / done < SE_TARGET ** 2
+
+def estimate(gs, budget=BUDGET_SEC) -> Optional[List[float]]:
+    """各人勝率；模擬不足 MIN_ROLLOUTS 時回傳 None。"""
+    if gs["over"]: return _final([p.plate_score() for p in gs["players"]])
+    key = public_key(gs)
+    with _lock:
+        entry = _cache.get(key)
+        if entry is not None: _cache.move_to_end(key)
+        done = entry[0] if entry else 0
+    if not (entry and saturated(done, entry[1])):             # 已收斂就只讀快取，不花 BUDGET_SEC
+        n, wins = rollouts(gs, MAX_ROLLOUTS - done, budget)
+        with _lock:
+            entry = _cache.setdefault(key, [0, [0.0] * len(wins)])
+            entry[0] += n; entry[1] = [a + b for a, b in zip(entry[1], wins)]
+            if len(_cache) > CACHE_SIZE: _cache.popitem(last=False)
+    if entry[0] < MIN_ROLLOUTS: return None
+    return [w / entry[0] for w in entry[1]]
+
+# ══════════════════════════════════════════════════════════════════
+#  --bench：每次重跑的耗時與模擬局數
+# ══════════════════════════════════════════════════════════════════
+def _rerun_pays(gs):
+    done = _cache.get(public_key(gs), [0])[0]
+    estimate(gs)
+    return _cache[public_key(gs)][0] > done
+
+def bench(games, seed=0):
+    import bots, engine
+    calib = [[0.0, 0.0, 0] for _ in range(5)]                # 依預測勝率分 5 組：預測總和、實際勝場、筆數
+    for n in (2, 3, 4):
+        times, counts, paid = [], [], []
+        for g in range(games):
+            gs, seen = engine.init_game([f"P{i+1}" for i in range(n)], "rounds", 5, seed=seed + g), []
+            players = {s: bots.make_bot("heuristic", random.Random(g)) for s in range(n)}
+            while not gs["over"]:
+                t0 = time.perf_counter()
+                before = _cache.get(public_key(gs), [0])[0]
+                estimate(gs)
+                times.append(time.perf_counter() - t0)
+                counts.append(_cache.get(public_key(gs), [0])[0] - before)
+                # 同一局面再重跑：收斂前每次都花 BUDGET_SEC，之後只讀快取
+                paid.append(next(k for k in range(1, 40) if not _rerun_pays(gs)))
+                seen.append(estimate(gs, 0))
+                engine.apply_move(gs, players[gs["turn"]].choose(gs, gs["turn"]))
+            won = _final([p.plate_score() for p in gs["players"]])
+            for est in filter(None, seen):
+                for p, w in zip(est, won):
+                    b = calib[min(int(p * 5), 4)]
+                    b[0] += p; b[1] += w; b[2] += 1
+        times.sort()
+        print(f"{n} 人：每次重跑 中位 {times[len(times) // 2] * 1000:.1f} ms / 最多 {times[-1] * 1000:.1f} ms，"
+              f"每次追加約 {sum(counts) / len(counts):.0f} 局模擬；同一局面平均重跑 {sum(paid) / len(paid) - 1:.1f} 次後收斂")
+    print("校準（預測 → 實際勝率）：" + "、".join(f"{p / k:.0%} → {w / k:.0%}" for p, w, k in calib if k))
+
+if __name__ == "__main__":
+    bench(int(sys.argv[sys.argv.index("--bench") + 1]) if "--bench" in sys.argv else 4)